@@ -0,0 +1,96 @@
+"""
+case-backends.py
+
+This script checks that the kernel backends of modules.cpop.backends agree
+with each other on integer inputs: every available backend solves the same
+random point sets (uniform, clustered, with duplicates, on a small grid and
+with coordinates too far apart for int64) with closest_pair_backend() and,
+as the default backend, with closest_pair_recursive() and brute_force().
+The distances they return must be the same float, bit for bit, and equal to
+the brute force answer on the smaller sets. The "numba" and "python"
+backends must also report the same pair. The script exits with status 1 on
+the first disagreement. When Numba is not installed, it says that the
+compiled kernels were skipped.
+
+Usage:
+    python src/case-backends.py [--trials 200] [--max-size 2000] [--seed 0]
+"""
+
+import sys
+import argparse
+
+import numpy as np
+
+from modules.cpop.algorithms import (BRUTE_FORCE_MAX, _brute_force_arrays, brute_force, closest_pair_backend,
+                                     closest_pair_recursive)
+from modules.cpop.backends import BACKENDS, available_backends, set_backend
+from modules.cpop.geometry import PointArray
+
+
+def random_points(rng, n):
+    """A random integer point set of one of several shapes."""
+    shape = rng.integers(5)
+    if shape == 0:
+        return PointArray(rng.integers(-10**9, 10**9, n), rng.integers(-10**9, 10**9, n))
+    if shape == 1:
+        centers = rng.integers(-10**6, 10**6, (4, 2))
+        around = centers[rng.integers(4, size=n)] + rng.integers(-50, 50, (n, 2))
+        return PointArray(around[:, 0], around[:, 1])
+    if shape == 2:
+        x = rng.integers(0, 10**4, n)
+        y = rng.integers(0, 10**4, n)
+        copies = rng.integers(n, size=max(1, n // 10))
+        x[copies[1:]] = x[copies[0]]
+        y[copies[1:]] = y[copies[0]]
+        return PointArray(x, y)
+    if shape == 3:
+        return PointArray(rng.integers(0, 20, n), rng.integers(0, 20, n))
+    # Beyond the int64 squared distances of the compiled kernels.
+    return PointArray(rng.integers(-2**60, 2**60, n), rng.integers(-2**40, 2**40, n))
+
+
+def check(points, backends):
+    """Runs every backend and returns a description of a disagreement, or None."""
+    results = {backend: closest_pair_backend(points, backend) for backend in backends}
+    distances = {backend: result.distance.hex() for backend, result in results.items()}
+    as_list = points.to_points()
+    small = len(points) <= BRUTE_FORCE_MAX * 4
+    for backend in backends:
+        set_backend(backend)
+        distances[f"{backend} (recursive)"] = closest_pair_recursive(as_list).hex()
+        if small:
+            distances[f"{backend} (brute_force)"] = brute_force(as_list).hex()
+    set_backend(None)
+    if len(set(distances.values())) > 1:
+        return f"distances differ: {distances}"
+    if small:
+        expected = _brute_force_arrays(points.x, points.y)[0].hex()
+        if expected not in distances.values():
+            return f"brute force found {expected}, the backends {distances}"
+    if 'numba' in results and results['numba'].engine == 'dc:numba':
+        pairs = {backend: (results[backend].i, results[backend].j) for backend in ('numba', 'python')}
+        if pairs['numba'] != pairs['python']:
+            return f"pairs differ: {pairs}"
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the kernel backends agree on integer inputs.")
+    parser.add_argument('--trials', type=int, default=200)
+    parser.add_argument('--max-size', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    print(f"Backends: {', '.join(backends)}")
+    for backend in BACKENDS:
+        if backend not in backends:
+            print(f"Skipped {backend}: it is not installed.")
+    rng = np.random.default_rng(args.seed)
+    for trial in range(args.trials):
+        points = random_points(rng, int(rng.integers(2, args.max_size + 1)))
+        problem = check(points, backends)
+        if problem is not None:
+            print(f"Trial {trial} ({len(points)} points): {problem}")
+            sys.exit(1)
+    print(f"{args.trials} trials: all backends agree.")
@@ -1,101 +1,156 @@
 """
 case_bigdataset.py
 
-This script evaluates the performance of the brute force and divide & conquer 
-methods on larger datasets. It generates random points, measures execution time,
-and plots the results. It demonstrates how the O(n^2) brute force approach 
-compares to the O(n log n) divide-and-conquer approach.
+This script benchmarks the closest pair engines on larger datasets with the
+suite in modules.benchmark. Every engine runs over several distributions
+(uniform, gaussian clusters, a line, many duplicates, an integer grid) with
+warmup and repeated runs, and the wall time, peak memory and number of
+distance evaluations are recorded. The quadratic engines are skipped on
+inputs they would take minutes on.
+
+Results can be written to JSON and compared with an earlier result file,
+which lists every case that got slower, used more memory, evaluated more
+distances or returned a different distance. With --stats, every case also
+records the statistics of one instrumented run (modules.cpop.instrument):
+strip sizes, early breaks in the strips and time per recursion depth.
+
+The imports command checks that importing the package modules stays within
+its time budget and does not load plotting or report dependencies.
+
+Usage:
+    python src/case-bigdataset.py run [--sizes 1000 10000 100000] [--output results.json] [--plot] [--stats]
+    python src/case-bigdataset.py compare baseline.json current.json [--threshold 0.1]
+    python src/case-bigdataset.py imports [--repeats 5]
 """
 
-import time
-import random
+import sys
+import argparse
+
 import pandas as pd
-import matplotlib.pyplot as plt
-from modules.cpop.geometry import Point
-from modules.cpop.algorithms import brute_force, closest_pair_distance
+
+from modules.benchmark.datasets import DISTRIBUTIONS
+from modules.benchmark.imports import check_import_budgets
+from modules.benchmark.suite import ENGINES, compare_results, load_results, run_suite, save_results
 
 pd.set_option('display.max_columns', None)
 pd.set_option('display.expand_frame_repr', False)
 
 
-def generate_points(n, x_range=(0, 10**6), y_range=(0, 10**6)):
-    """
-    Generate a list of random points within given ranges.
-
-    Parameters:
-    - n (int): Number of points to generate.
-    - x_range (tuple): Range of possible x-values.
-    - y_range (tuple): Range of possible y-values.
-
-    Returns:
-    - (List[Point]): List of generated points.
-    """
-    return [Point(random.randint(*x_range), random.randint(*y_range)) for _ in range(n)]
-
-
-def evaluate_performance(sizes):
+def summarize(records):
     """
-    Evaluate performance (execution time and found distances) for different dataset sizes.
+    Tabulate benchmark records.
 
     Parameters:
-    - sizes (List[int]): List of sizes for which to run the tests.
+    - records (List[dict]): Records from run_suite().
 
     Returns:
-    - (pd.DataFrame): DataFrame with performance results.
+    - (pd.DataFrame): One row per case.
     """
-    results = []
-    for n in sizes:
-        points = generate_points(n)
-
-        start = time.time()
-        bf_dist = brute_force(points)
-        bf_time = time.time() - start
-
-        start = time.time()
-        dc_dist = closest_pair_distance(points)
-        dc_time = time.time() - start
-
-        results.append({
-            "Number of Points": n,
-            "Brute Force Distance": round(bf_dist, 6),
-            "Brute Force Time (s)": round(bf_time, 6),
-            "Divide & Conquer Distance": round(dc_dist, 6),
-            "Divide & Conquer Time (s)": round(dc_time, 6)
-        })
-
-    results_df = pd.DataFrame(results)
-    print(results_df)
-    return results_df
+    return pd.DataFrame([{
+        "Distribution": r['distribution'],
+        "Number of Points": r['size'],
+        "Engine": r['engine'],
+        "Distance": round(r['distance'], 6),
+        "Median Time (s)": round(r['median_time'], 6),
+        "Min Time (s)": round(r['min_time'], 6),
+        "Peak (MiB)": round(r['peak_mib'], 1),
+        "Distance Evaluations": r['distance_evaluations'],
+    } for r in records])
 
 
 def plot_performance(results_df):
     """
-    Plot the performance of brute force and divide-and-conquer methods 
-    in terms of execution time as a function of dataset size.
+    Plot the median execution time of every engine as a function of dataset
+    size, one panel per distribution.
 
     Parameters:
-    - results_df (pd.DataFrame): DataFrame with performance results.
+    - results_df (pd.DataFrame): DataFrame from summarize().
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-
-    ax.plot(results_df["Number of Points"], results_df["Brute Force Time (s)"], 
-            label="Brute Force Time (s)", marker='o')
-    ax.plot(results_df["Number of Points"], results_df["Divide & Conquer Time (s)"], 
-            label="Divide & Conquer Time (s)", marker='o')
+    import matplotlib.pyplot as plt
+
+    distributions = results_df["Distribution"].unique()
+    fig, axes = plt.subplots(1, len(distributions), figsize=(5 * len(distributions), 5), squeeze=False)
+
+    for ax, distribution in zip(axes[0], distributions):
+        subset = results_df[results_df["Distribution"] == distribution]
+        for engine, rows in subset.groupby("Engine", sort=False):
+            ax.plot(rows["Number of Points"], rows["Median Time (s)"], label=engine, marker='o')
+        ax.set_title(distribution)
+        ax.set_xlabel("Number of Points")
+        ax.set_ylabel("Time (s)")
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.grid(True)
+        ax.legend()
+
+    fig.suptitle("Performance Comparison of Closest Pair Engines")
+    plt.show()
 
-    ax.set_xlabel("Number of Points")
-    ax.set_ylabel("Time (s)")
-    ax.set_title("Performance Comparison of Closest Pair Algorithms")
-    ax.legend()
-    ax.grid(True)
-    ax.set_xscale('log')
-    ax.set_yscale('log')
 
-    plt.show()
+def run(args):
+    """Run the suite, print the table and optionally save and plot it."""
+    records = run_suite(args.sizes, args.distributions, args.engines, args.repeats, args.warmup, args.seed,
+                        progress=lambda r: print(f"{r['distribution']:>10} {r['size']:>9} {r['engine']:>12} "
+                                                 f"{r['median_time']:.6f}s", file=sys.stderr),
+                        stats=args.stats)
+    results_df = summarize(records)
+    print(results_df)
+    if args.output:
+        save_results(args.output, records)
+    if args.plot:
+        plot_performance(results_df)
+
+
+def compare(args):
+    """Compare two result files; the exit status is 1 if anything regressed."""
+    regressions = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    if not regressions:
+        print("No regressions.")
+        return 0
+    print(pd.DataFrame(regressions))
+    return 1
+
+
+def imports(args):
+    """Check the import-time budgets; the exit status is 1 if one is exceeded."""
+    records = check_import_budgets(repeats=args.repeats)
+    print(pd.DataFrame([{
+        "Module": r['module'],
+        "Min (ms)": round(r['min_ms'], 1),
+        "Median (ms)": round(r['median_ms'], 1),
+        "Budget (ms)": r['max_ms'],
+        "Violations": "; ".join(r['violations']),
+    } for r in records]))
+    return 1 if any(r['violations'] for r in records) else 0
 
 
 if __name__ == "__main__":
-    dataset_sizes = [1000, 10000, 100000]
-    performance_results = evaluate_performance(dataset_sizes)
-    plot_performance(performance_results)
-
+    parser = argparse.ArgumentParser(description="Benchmark the closest pair engines.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the benchmark suite")
+    run_parser.add_argument('--sizes', type=lambda s: int(float(s)), nargs='+', default=[1000, 10000, 100000])
+    run_parser.add_argument('--distributions', nargs='+', choices=list(DISTRIBUTIONS))
+    run_parser.add_argument('--engines', nargs='+', choices=list(ENGINES))
+    run_parser.add_argument('--repeats', type=int, default=5)
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', help="write the results to this JSON file")
+    run_parser.add_argument('--plot', action='store_true', help="plot time against size")
+    run_parser.add_argument('--stats', action='store_true',
+                            help="record strip sizes, early breaks and per-depth timings in the results")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser('compare', help="compare two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="tolerated relative increase (default 0.10)")
+    compare_parser.set_defaults(func=compare)
+
+    imports_parser = commands.add_parser('imports', help="check the import-time budgets")
+    imports_parser.add_argument('--repeats', type=int, default=5)
+    imports_parser.set_defaults(func=imports)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
@@ -0,0 +1,141 @@
+"""
+case-checks.py
+
+This script runs correctness checks of the closest pair engines that are
+too slow or too random for a quick look, and exits with status 1 on the
+first failure:
+- exact: inputs whose coordinates neither int64 nor float64 holds exactly
+  (Python ints beyond int64, alone or mixed with floats) must give every
+  engine the same answer as brute_force() on the Point objects.
+- approximate: on every benchmark distribution and for several eps,
+  approximate_closest_pair() must return a real pair at distance d with
+  exact <= d <= (1 + eps) * exact.
+- dynamic: after every step of random insert/delete sequences,
+  DynamicClosestPair.current_closest() must match brute_force() on the
+  points present, and its heap must stay within twice their number.
+
+Usage:
+    python src/case-checks.py exact [--trials 200] [--seed 0]
+    python src/case-checks.py approximate [--trials 5] [--size 20000] [--seed 0]
+    python src/case-checks.py dynamic [--trials 50] [--steps 400] [--seed 0]
+"""
+
+import sys
+import math
+import argparse
+import random
+
+from modules.benchmark.datasets import DISTRIBUTIONS
+from modules.cpop.algorithms import ENGINES, brute_force, closest_pair, closest_pair_distance
+from modules.cpop.approximate import approximate_closest_pair
+from modules.cpop.dynamic import DynamicClosestPair
+from modules.cpop.geometry import Point
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+def check_exact(trials, seed):
+    """Engines against brute_force() on Python ints beyond int64 and mixed numbers."""
+    regressions = [
+        [Point(2**70, 0), Point(2**70 + 1, 0), Point(0, 5)],
+        [Point(2**62, 0), Point(2**62 + 1, 0), Point(0.5, 5)],
+    ]
+    rng = random.Random(seed)
+    cases = list(regressions)
+    for _ in range(trials):
+        n = rng.randint(2, 300)
+        base = rng.choice([2**62, 2**70, -2**80])
+        cases.append([Point(rng.choice([base + rng.randint(0, 40), rng.randint(-10**6, 10**6), rng.random() * 100]),
+                            rng.choice([rng.randint(-40, 40), rng.random()]))
+                      for _ in range(n)])
+
+    for k, points in enumerate(cases):
+        expected = brute_force(points)
+        for engine in ENGINES:
+            for check_duplicates in (False, True):
+                d = closest_pair_distance(points, engine, check_duplicates=check_duplicates)
+                if d != expected:
+                    fail(f"Case {k} ({len(points)} points), engine {engine!r}: {d} instead of {expected}")
+        pair = closest_pair(points)
+        if brute_force([pair.first, pair.second]) != expected:
+            fail(f"Case {k}: closest_pair() reported {pair}, at distance {expected}")
+    print(f"exact: {len(cases)} cases, every engine matches brute_force().")
+
+
+def check_approximate(trials, size, seed):
+    """approximate_closest_pair() against the exact distance, for every distribution and several eps."""
+    rng = random.Random(seed)
+    runs = 0
+    for name, generate in DISTRIBUTIONS.items():
+        for trial in range(trials):
+            n = rng.randint(2, size)
+            points = generate(n, seed + trial)
+            exact = closest_pair_distance(points, 'dc')
+            for eps in (0.0, 0.01, 0.1, 0.5, 1.0, 4.0):
+                pair = approximate_closest_pair(points, eps, seed=seed + trial)
+                runs += 1
+                if pair.i == pair.j or pair.distance != brute_force([pair.first, pair.second]):
+                    fail(f"{name}, {n} points, eps {eps}: {pair} is not a pair at its distance")
+                if not exact <= pair.distance <= (1 + eps) * exact:
+                    fail(f"{name}, {n} points, eps {eps}: {pair.distance} outside [{exact}, {(1 + eps) * exact}]")
+    print(f"approximate: {runs} runs, every pair within (1 + eps) of the exact distance.")
+
+
+def check_dynamic(trials, steps, seed):
+    """DynamicClosestPair against brute_force() after every insertion and deletion."""
+    rng = random.Random(seed)
+    for trial in range(trials):
+        # Small integer ranges give duplicates and ties; floats are compared to the last bits.
+        span = rng.choice([10, 1000, 10**9])
+        integers = rng.random() < 0.7
+        delete_share = rng.choice([0.2, 0.5, 0.8])
+        dynamic = DynamicClosestPair()
+        present = {}
+        for step in range(steps):
+            if present and rng.random() < delete_share:
+                handle = rng.choice(list(present))
+                dynamic.delete(handle)
+                del present[handle]
+            else:
+                point = (Point(rng.randint(0, span), rng.randint(0, span)) if integers
+                         else Point(rng.uniform(0, span), rng.uniform(0, span)))
+                present[dynamic.insert(point)] = point
+            if len(dynamic._heap) > 2 * len(present):
+                fail(f"Trial {trial}, step {step}: {len(dynamic._heap)} heap entries for {len(present)} points")
+            pair = dynamic.current_closest()
+            if len(present) < 2:
+                if pair is not None:
+                    fail(f"Trial {trial}, step {step}: {pair} with {len(present)} points")
+                continue
+            expected = brute_force(list(present.values()))
+            same = pair.distance == expected if integers else math.isclose(pair.distance, expected, rel_tol=1e-12)
+            if not same or pair.i not in present or pair.j not in present:
+                fail(f"Trial {trial}, step {step}: {pair} instead of distance {expected}")
+    print(f"dynamic: {trials} sequences of {steps} steps, every closest pair matches brute_force().")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run correctness checks of the closest pair engines.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    exact = commands.add_parser('exact', help="coordinates beyond int64 and float64")
+    exact.add_argument('--trials', type=int, default=200)
+    exact.add_argument('--seed', type=int, default=0)
+    approximate = commands.add_parser('approximate', help="the (1 + eps) bound of approximate_closest_pair()")
+    approximate.add_argument('--trials', type=int, default=5)
+    approximate.add_argument('--size', type=int, default=20000)
+    approximate.add_argument('--seed', type=int, default=0)
+    dynamic = commands.add_parser('dynamic', help="DynamicClosestPair under random insertions and deletions")
+    dynamic.add_argument('--trials', type=int, default=50)
+    dynamic.add_argument('--steps', type=int, default=400)
+    dynamic.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'exact':
+        check_exact(args.trials, args.seed)
+    elif args.command == 'approximate':
+        check_approximate(args.trials, args.size, args.seed)
+    elif args.command == 'dynamic':
+        check_dynamic(args.trials, args.steps, args.seed)
@@ -7,10 +7,13 @@ version of the case-plot.py script, showing the process of computing the
 closest pair distances and visualizing the points.
 """
 
+from datetime import datetime
 from typing import List
 
 from modules.cpopstep.algorithms import closest_pair_distance
 from modules.cpopstep.geometry import ColoredPoint
+from modules.cpopstep.report import ReportSink
+from modules.cpopstep.trace import ConsoleSink, Tracer
 from modules.utils import parse_data, group_by_color, plot_points
 
 
@@ -19,14 +22,19 @@ def compute_closest_distances(points: List[ColoredPoint], by_color: bool = True)
     Computes and prints the closest pair distances.
     - If by_color is True, computes per color.
     - If by_color is False, computes for all points together.
+    Every step is printed and written to a Word report with its figures, one
+    report per color under output/<timestamp>/<color> when by_color is True.
     """
+    output_dir = f"output/{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     if by_color:
         groups = group_by_color(points)
         for color, pts in groups.items():
-            dist = closest_pair_distance(pts)
+            tracer = Tracer([ConsoleSink(), ReportSink(f"{output_dir}/{color}")], record=False)
+            dist = closest_pair_distance(pts, tracer)
             print(f"Closest pair distance for color {color}: {dist}")
     else:
-        dist = closest_pair_distance(points)
+        tracer = Tracer([ConsoleSink(), ReportSink(output_dir)], record=False)
+        dist = closest_pair_distance(points, tracer)
         print(f"Closest pair distance (ignoring color): {dist}")
 
 if __name__ == "__main__":
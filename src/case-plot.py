@@ -8,7 +8,8 @@ from typing import List
 
 from modules.cpop.algorithms import closest_pair_distance
 from modules.cpop.geometry import ColoredPoint
-from modules.utils import parse_data, group_by_color, plot_points
+from modules.cpop.groups import closest_pair_by_group
+from modules.utils import parse_data, plot_points
 
 
 def compute_closest_distances(points: List[ColoredPoint], by_color: bool = True) -> None:
@@ -18,9 +19,9 @@ def compute_closest_distances(points: List[ColoredPoint], by_color: bool = True)
     - If by_color is False, computes for all points together.
     """
     if by_color:
-        groups = group_by_color(points)
-        for color, pts in groups.items():
-            dist = closest_pair_distance(pts)
+        pairs = closest_pair_by_group(points, key=lambda p: p.color)
+        for color, pair in pairs.items():
+            dist = pair.distance if pair is not None else float('inf')
             print(f"Closest pair distance for color {color}: {dist}")
     else:
         dist = closest_pair_distance(points)
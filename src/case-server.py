@@ -0,0 +1,31 @@
+"""
+case-server.py
+
+This script runs the closest pair server of modules.service, which keeps the
+engines warm for many short-lived clients. Requests and answers are JSON
+lines; see modules/service/server.py for the protocol.
+
+Usage:
+    python src/case-server.py [--host 127.0.0.1] [--port 8765] [--unix PATH]
+                              [--workers N] [--pool-min-points N] [--batch-window SECONDS]
+"""
+
+import argparse
+
+from modules.service.server import BATCH_MAX_POINTS, POOL_MIN_POINTS, serve
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve closest pair queries over a local socket.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, help="processes for large requests (default: CPU count)")
+    parser.add_argument('--pool-min-points', type=int, default=POOL_MIN_POINTS,
+                        help="requests with more points run in the process pool")
+    parser.add_argument('--batch-window', type=float, default=0.0,
+                        help="seconds a batch waits for more small requests (default 0)")
+    parser.add_argument('--batch-max-points', type=int, default=BATCH_MAX_POINTS)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.unix, workers=args.workers, pool_min_points=args.pool_min_points,
+          batch_window=args.batch_window, batch_max_points=args.batch_max_points)
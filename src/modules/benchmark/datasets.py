@@ -0,0 +1,85 @@
+"""
+datasets.py
+
+These modules generate the point distributions used by the benchmark suite.
+Every generator is deterministic for a given seed and returns a PointArray,
+so the same input can be handed to every engine.
+
+Key functions:
+- uniform(n, seed): points spread uniformly over a square.
+- clusters(n, seed): points in tight gaussian clusters.
+- line(n, seed): points on a vertical line, the worst case for the strips
+  of divide and conquer.
+- duplicates(n, seed): points drawn from a few distinct locations, so the
+  closest pair distance is zero.
+- one_duplicate(n, seed): uniform points where a single pair coincides, the
+  hardest input for a duplicate check.
+- grid(n, seed): distinct points of an integer lattice, with many ties.
+"""
+
+import math
+from typing import Callable, Dict
+
+import numpy as np
+
+from ..cpop.geometry import PointArray
+
+# Side of the square the points are drawn from.
+SPAN = 10**6
+
+
+def uniform(n: int, seed: int = 0) -> PointArray:
+    """Points drawn uniformly from [0, SPAN)^2."""
+    rng = np.random.default_rng(seed)
+    return PointArray(rng.uniform(0, SPAN, n), rng.uniform(0, SPAN, n))
+
+
+def clusters(n: int, seed: int = 0) -> PointArray:
+    """Points around n / 1000 uniform centers, with a standard deviation of SPAN / 10^4."""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, SPAN, (max(1, n // 1000), 2))
+    owner = rng.integers(0, len(centers), n)
+    offset = rng.normal(0, SPAN / 10**4, (n, 2))
+    return PointArray(centers[owner, 0] + offset[:, 0], centers[owner, 1] + offset[:, 1])
+
+
+def line(n: int, seed: int = 0) -> PointArray:
+    """Points on the vertical line x = SPAN / 2, so every strip holds every point."""
+    rng = np.random.default_rng(seed)
+    return PointArray(np.full(n, SPAN / 2), rng.uniform(0, SPAN, n))
+
+
+def duplicates(n: int, seed: int = 0) -> PointArray:
+    """Points drawn with replacement from n / 10 distinct uniform locations."""
+    rng = np.random.default_rng(seed)
+    sites = rng.uniform(0, SPAN, (max(1, n // 10), 2))
+    owner = rng.integers(0, len(sites), n)
+    return PointArray(sites[owner, 0], sites[owner, 1])
+
+
+def one_duplicate(n: int, seed: int = 0) -> PointArray:
+    """Points drawn uniformly from [0, SPAN)^2, then one of them copied over another."""
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(0, SPAN, n), rng.uniform(0, SPAN, n)
+    if n >= 2:
+        i, j = rng.choice(n, size=2, replace=False)
+        x[j], y[j] = x[i], y[i]
+    return PointArray(x, y)
+
+
+def grid(n: int, seed: int = 0) -> PointArray:
+    """n distinct points of the integer lattice with about 2n points, in random order."""
+    rng = np.random.default_rng(seed)
+    side = math.isqrt(2 * n) + 1
+    cells = rng.choice(side * side, size=n, replace=False)
+    return PointArray(cells // side, cells % side)
+
+
+DISTRIBUTIONS: Dict[str, Callable[[int, int], PointArray]] = {
+    'uniform': uniform,
+    'clusters': clusters,
+    'line': line,
+    'duplicates': duplicates,
+    'one_duplicate': one_duplicate,
+    'grid': grid,
+}
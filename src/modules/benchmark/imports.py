@@ -0,0 +1,125 @@
+"""
+imports.py
+
+This module measures how long importing the package modules takes and
+checks it against a budget, so that short-lived worker processes do not
+pay for plotting or report dependencies they never use.
+
+Every measurement runs in a fresh interpreter (the import cache of the
+current one would hide the cost). The dependencies a module cannot do
+without, such as NumPy, are imported first as a baseline and not counted:
+the budget covers what the module itself adds, which keeps it tight and
+comparable across machines. Each budget also lists modules the import must
+not load (matplotlib, python-docx, ...), unless the baseline already did.
+
+Key functions:
+- measure_import(module, baseline, repeats): the import time of a module.
+- check_import_budgets(budgets, repeats): measures every budget and lists
+  its violations.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, NamedTuple, Sequence
+
+
+class ImportBudget(NamedTuple):
+    """The import-time budget of one module."""
+    module: str
+    baseline: Sequence[str]     # Imported first and not counted.
+    max_ms: float               # Best-of-repeats time the import may take.
+    forbidden: Sequence[str]    # Modules the import must not load.
+
+
+_PLOTTING = ('matplotlib', 'docx', 'PIL', 'pandas')
+
+IMPORT_BUDGETS: List[ImportBudget] = [
+    ImportBudget('modules.cpop', (), 5, ('numpy',) + _PLOTTING),
+    ImportBudget('modules.cpop.algorithms', ('numpy',), 25, ('numpy.random',) + _PLOTTING),
+    # Numba is imported when the compiled backend first runs, never at import.
+    ImportBudget('modules.cpop.backends', ('numpy',), 30, ('numba', 'numpy.random') + _PLOTTING),
+    ImportBudget('modules.utils', ('numpy',), 15, _PLOTTING),
+    ImportBudget('modules.cpopstep.algorithms', (), 20, ('numpy',) + _PLOTTING),
+    ImportBudget('modules.cpopstep.report', (), 35, ('numpy',) + _PLOTTING),
+]
+
+# Run in the fresh interpreter: import the baseline, then time the module.
+_PROBE = """
+import json, sys, time
+for name in sys.argv[2:]:
+    __import__(name)
+before = set(sys.modules)
+start = time.perf_counter()
+__import__(sys.argv[1])
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'loaded': sorted(set(sys.modules) - before)}))
+"""
+
+
+def _source_root() -> str:
+    """The directory holding the `modules` package."""
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _probe(module: str, baseline: Sequence[str]) -> dict:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [_source_root(), env.get('PYTHONPATH')]))
+    result = subprocess.run([sys.executable, '-c', _PROBE, module, *baseline],
+                            env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def measure_import(module: str, baseline: Sequence[str] = (), repeats: int = 5) -> dict:
+    """
+    Measures the import time of a module in fresh interpreters.
+
+    One untimed run comes first, so that byte-code compilation is not counted.
+
+    Parameters:
+    - module (str): The module to import.
+    - baseline (Sequence[str]): Modules imported first and not counted.
+    - repeats (int): Number of timed interpreters.
+
+    Returns:
+    - (dict): module, min_ms and median_ms of the import, and loaded, the
+      modules the import loaded on top of the baseline.
+    """
+    loaded = _probe(module, baseline)['loaded']
+    times = [_probe(module, baseline)['seconds'] * 1000 for _ in range(repeats)]
+    return {
+        'module': module,
+        'min_ms': min(times),
+        'median_ms': statistics.median(times),
+        'loaded': loaded,
+    }
+
+
+def check_import_budgets(budgets: Sequence[ImportBudget] = IMPORT_BUDGETS, repeats: int = 5) -> List[dict]:
+    """
+    Measures every module of the budgets.
+
+    Parameters:
+    - budgets (Sequence[ImportBudget]): The budgets.
+    - repeats (int): Number of timed interpreters per module.
+
+    Returns:
+    - (List[dict]): A measure_import() record per budget, plus max_ms and
+      violations, a list of messages (empty if the budget holds).
+    """
+    records = []
+    for budget in budgets:
+        record = measure_import(budget.module, budget.baseline, repeats)
+        record['max_ms'] = budget.max_ms
+        violations = []
+        if record['min_ms'] > budget.max_ms:
+            violations.append(f"takes {record['min_ms']:.1f} ms, budget {budget.max_ms:g} ms")
+        loaded = set(record['loaded'])
+        for name in budget.forbidden:
+            if name in loaded:
+                violations.append(f"loads {name}")
+        record['violations'] = violations
+        records.append(record)
+    return records
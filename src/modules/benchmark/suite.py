@@ -0,0 +1,235 @@
+"""
+suite.py
+
+These modules run the closest pair engines over the benchmark datasets and
+compare result files.
+
+Every (engine, distribution, size) case is run a few times after untimed
+warmup runs, and records:
+- the wall time of every repeat (time.perf_counter),
+- the peak memory allocated during one extra run (tracemalloc),
+- the number of point-to-point distances evaluated during one extra run,
+- optionally, the full statistics of that run (instrument.py): strip sizes,
+  early breaks and per-depth timings of the divide and conquer.
+
+The extra runs are kept out of the timings because tracing allocations and
+counting distances both slow the engines down. Distances are counted by the
+statistics hooks of the engines (instrument.collect_stats()), on the calling
+thread only, so the count and the statistics come from the same run.
+
+Key functions:
+- run_suite(sizes, ...): benchmarks every engine and returns the records.
+- save_results(path, records) / load_results(path): JSON result files.
+- compare_results(baseline, current, threshold): lists the regressions.
+"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from ..cpop.algorithms import brute_force, closest_pair_backend, closest_pair_distance, closest_pair_recursive
+from ..cpop.approximate import approximate_closest_pair
+from ..cpop.instrument import collect_stats
+from ..cpop.parallel import closest_pair_parallel
+from .datasets import DISTRIBUTIONS
+
+
+class Engine(NamedTuple):
+    """A benchmarked engine."""
+    run: Callable[[object], float]    # Solves one input, returns the distance.
+    wants_list: bool                  # Takes a list of Point instead of a PointArray.
+    max_size: Optional[int]           # Larger inputs are skipped (O(n^2) engines).
+    countable: bool                   # Its distance evaluations can be counted.
+
+
+ENGINES: Dict[str, Engine] = {
+    'brute_force': Engine(brute_force, True, 2_000, True),
+    'recursive': Engine(closest_pair_recursive, True, None, True),
+    'brute': Engine(lambda p: closest_pair_distance(p, engine='brute'), False, 10_000, True),
+    'dc': Engine(lambda p: closest_pair_distance(p, engine='dc'), False, None, True),
+    'grid': Engine(lambda p: closest_pair_distance(p, engine='grid'), False, None, True),
+    'auto': Engine(lambda p: closest_pair_distance(p, engine='auto'), False, None, True),
+    'auto_dedupe': Engine(lambda p: closest_pair_distance(p, check_duplicates=True), False, None, True),
+    # Within 10% of the exact distance (approximate.py).
+    'approx': Engine(lambda p: approximate_closest_pair(p, 0.1).distance, False, None, True),
+    # The divide-and-conquer engine of the default backend (backends.py).
+    'kernels': Engine(lambda p: closest_pair_backend(p).distance, False, None, True),
+    # The workers run in other processes, out of reach of the counters.
+    'parallel': Engine(lambda p: closest_pair_parallel(p).distance, False, None, False),
+}
+
+
+def measure(engine: Engine, points, repeats: int = 5, warmup: int = 1, stats: bool = False) -> dict:
+    """
+    Benchmarks one engine on one input.
+
+    Parameters:
+    - engine (Engine): The engine.
+    - points (List[Point] | PointArray): The input, in the form the engine takes.
+    - repeats (int): Number of timed runs.
+    - warmup (int): Number of untimed runs before them.
+    - stats (bool): Add the RunStats.to_dict() of the counting run as "stats"
+      (countable engines only).
+
+    Returns:
+    - (dict): The distance, the times of all repeats, their minimum and
+      median, the peak allocation in MiB and the distance evaluations.
+    """
+    for _ in range(warmup):
+        engine.run(points)
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        distance = engine.run(points)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    engine.run(points)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    evaluations = run_stats = None
+    if engine.countable:
+        with collect_stats() as run_stats:
+            engine.run(points)
+        evaluations = run_stats.distance_evaluations
+
+    record = {
+        'distance': distance,
+        'times': times,
+        'min_time': min(times),
+        'median_time': statistics.median(times),
+        'peak_mib': peak / 2**20,
+        'distance_evaluations': evaluations,
+    }
+    if stats and run_stats is not None:
+        record['stats'] = run_stats.to_dict()
+    return record
+
+
+def run_suite(sizes: Sequence[int], distributions: Optional[Sequence[str]] = None,
+              engines: Optional[Sequence[str]] = None, repeats: int = 5, warmup: int = 1,
+              seed: int = 0, progress: Optional[Callable[[dict], None]] = None,
+              stats: bool = False) -> List[dict]:
+    """
+    Benchmarks every engine on every distribution and size.
+
+    Parameters:
+    - sizes (Sequence[int]): The numbers of points.
+    - distributions (Sequence[str] | None): Names from DISTRIBUTIONS (default: all).
+    - engines (Sequence[str] | None): Names from ENGINES (default: all).
+    - repeats (int): Number of timed runs per case.
+    - warmup (int): Number of untimed runs per case.
+    - seed (int): Seed of the generated datasets.
+    - progress (Callable | None): Called with every record as it is produced.
+    - stats (bool): Also record the statistics of one instrumented run per case.
+
+    Returns:
+    - (List[dict]): One record per case, with the engine, distribution and
+      size next to the measurements of measure(). Engines are skipped on
+      inputs above their max_size.
+    """
+    distributions = list(distributions or DISTRIBUTIONS)
+    engines = list(engines or ENGINES)
+    for name in distributions:
+        if name not in DISTRIBUTIONS:
+            raise ValueError(f"unknown distribution {name!r}, expected one of {tuple(DISTRIBUTIONS)}")
+    for name in engines:
+        if name not in ENGINES:
+            raise ValueError(f"unknown engine {name!r}, expected one of {tuple(ENGINES)}")
+
+    records = []
+    for distribution in distributions:
+        for n in sizes:
+            array = DISTRIBUTIONS[distribution](n, seed)
+            points = None
+            for name in engines:
+                engine = ENGINES[name]
+                if engine.max_size is not None and n > engine.max_size:
+                    continue
+                if engine.wants_list and points is None:
+                    points = array.to_points()
+                record = {'engine': name, 'distribution': distribution, 'size': n,
+                          'repeats': repeats, 'warmup': warmup}
+                record.update(measure(engine, points if engine.wants_list else array, repeats, warmup, stats))
+                records.append(record)
+                if progress is not None:
+                    progress(record)
+    return records
+
+
+def save_results(path: str, records: List[dict]) -> None:
+    """
+    Writes benchmark records to a JSON file, with a description of the machine.
+
+    Parameters:
+    - path (str): The output file.
+    - records (List[dict]): Records from run_suite().
+    """
+    document = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': records,
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+
+
+def load_results(path: str) -> List[dict]:
+    """Reads the records of a JSON file written by save_results()."""
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare_results(baseline: List[dict], current: List[dict],
+                    threshold: float = 0.10) -> List[dict]:
+    """
+    Compares two sets of records case by case.
+
+    A case regresses when its median time, peak memory or distance
+    evaluations grew by more than `threshold` (relative), or when its
+    distance changed. Cases present in only one set are ignored. The grid
+    and auto engines draw random samples, so their distance evaluations
+    vary a little from run to run.
+
+    Parameters:
+    - baseline (List[dict]): The reference records.
+    - current (List[dict]): The new records.
+    - threshold (float): The tolerated relative increase.
+
+    Returns:
+    - (List[dict]): One entry per regressed metric, with the case, the
+      metric name, both values and their ratio.
+    """
+    def key(record):
+        return record['engine'], record['distribution'], record['size']
+
+    reference = {key(record): record for record in baseline}
+    regressions = []
+    for record in current:
+        old = reference.get(key(record))
+        if old is None:
+            continue
+        case = dict(zip(('engine', 'distribution', 'size'), key(record)))
+
+        if old['distance'] != record['distance']:
+            regressions.append({**case, 'metric': 'distance', 'baseline': old['distance'],
+                                'current': record['distance'], 'ratio': None})
+        for metric in ('median_time', 'peak_mib', 'distance_evaluations'):
+            before, after = old.get(metric), record.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + threshold):
+                ratio = after / before if before else float('inf')
+                regressions.append({**case, 'metric': metric, 'baseline': before,
+                                    'current': after, 'ratio': ratio})
+    return regressions
@@ -7,22 +7,106 @@ divide-and-conquer approach, as well as a brute-force approach for small subsets
 Key functions:
 - brute_force(points): O(n^2) approach, used for small subsets.
 - closest_pair_distance(points): O(n log n) divide and conquer solution.
+- closest_pair_recursive(points): the same solution as a recursion over
+  index ranges, whose loops are the kernels of a backend (backends.py).
+- closest_pair_backend(points, backend): the closest pair from the
+  divide-and-conquer engine of a chosen backend.
+- closest_pair_vectorized(points): the same divide and conquer, run level by
+  level as NumPy array operations over a PointArray.
+- closest_pair_grid(points): randomized grid algorithm, expected O(n).
+- closest_pair(points): the closest distance together with its two points.
+  It and closest_pair_distance() take check_duplicates=True to answer 0
+  from a hashing pass when two points coincide, without running an engine.
+- k_closest_pairs(points, k): the k closest pairs in a single run.
 
 The divide-and-conquer solution:
 1. Sort points by x-coordinate.
 2. Recursively find the closest pairs in the left and right subsets.
 3. Combine results and check the "strip" (points close to the dividing line)
    to find if there's a closer pair that straddles the two subsets.
+   Each subset comes back sorted by y (the halves are merged), so the strip
+   never needs to be sorted again.
+
+The vectorized engine processes the recursion bottom-up: every subset of one
+level is merged with its neighbour at the same time, so each level costs a
+handful of array operations instead of one Python call per subset.
+
+Integer coordinates are compared exactly: every engine switches to squared
+distances (int64, or Python int when the coordinates are too far apart for
+int64) and takes a single square root of the result, so ties are exact and
+no square root or float conversion happens per pair. A PointArray whose
+coordinates neither int64 nor float64 holds exactly (Python ints beyond
+int64, or such ints mixed with floats) keeps the Python numbers in object
+arrays; the engines compare their squared distances with Python arithmetic,
+as brute_force() does on the Point objects. They never use the grid (its
+cells are computed in float): "grid" runs divide and conquer instead.
+
+Only the closest pair engines are exact this way: the KD-tree
+(kdtree.py), the SpatialIndex built on it (spatial.py) and
+DynamicClosestPair (dynamic.py) convert the coordinates to float64.
+
+The engines report their work (distance evaluations, strips, recursion
+levels) to the statistics collector of instrument.collect_stats() when one
+is active on the calling thread. They look it up once per call, and the
+kernel recursion hands it down to its levels, so runs without a
+collector only pay for a few "is None" checks.
 """
 
-from typing import List
-from .geometry import Point, dist
+import heapq
+import math
+import threading
+import time
+from operator import attrgetter
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from . import backends
+from .backends import INT64_SPAN
+from .duplicates import _first_duplicate
+from .geometry import Point, PointArray
+
+# Number of consecutive (x-sorted) points brute forced together at the bottom
+# of the vectorized recursion.
+LEAF_SIZE = 8
+
+# Largest input for which engine="auto" uses brute force.
+BRUTE_FORCE_MAX = 64
+
+# The grid engine retries with a larger sample when a grid would need more
+# than this many candidate pairs per point.
+GRID_CANDIDATES_PER_POINT = 8
+
+# Number of candidate pairs the grid engine evaluates per array operation.
+GRID_CHUNK = 1 << 20
+
+ENGINES = ('auto', 'brute', 'dc', 'grid')
+
+_by_x = attrgetter('x')
+
+
+class _Collector(threading.local):
+    """
+    The statistics collector of the current thread: the RunStats of an open
+    instrument.collect_stats() block, or None.
+    """
+    stats = None
+
+
+_collector = _Collector()
+
+
+def _coordinates(points: List[Point]) -> Tuple[list, list]:
+    """The x and y coordinates of the points, as two lists."""
+    return [p.x for p in points], [p.y for p in points]
 
 
 def brute_force(points: List[Point]) -> float:
     """
     Brute force method to find the closest pair distance among a small set of points.
-    This is used when n <= 3 or as a fallback method.
+    This is used when n <= 3 or as a fallback method. It runs the brute
+    force kernel of the default backend (backends.py), which compares exact
+    squared distances.
 
     Parameters:
     - points (List[Point]): The list of points to consider.
@@ -31,85 +115,121 @@ def brute_force(points: List[Point]) -> float:
     - (float): The smallest distance between any pair of points.
     """
     n = len(points)
-    min_dist = float('inf')
-    for i in range(n):
-        for j in range(i+1, n):
-            d = dist(points[i], points[j])
-            if d < min_dist:
-                min_dist = d
-    return min_dist
+    stats = _collector.stats
+    if stats is not None:
+        stats.distance_evaluations += n * (n - 1) // 2
+    kernels, xs, ys, unbounded = backends.prepare(*_coordinates(points))
+    key, i, _ = kernels.brute_force(xs, ys, 0, n, unbounded, -1, -1)
+    return math.sqrt(key) if i >= 0 else float('inf')
 
 
-def strip_closest(strip: List[Point], d: float) -> float:
+def strip_closest(strip: List[Point], d: float, lo: int = 0, hi: Optional[int] = None) -> float:
     """
     Given a strip (a subset of points close to the dividing vertical line)
     and a current minimum distance d, this function finds the closest distance
-    in the strip. Points in the strip are sorted by their y-coordinate.
+    in the strip. Points in the strip are already sorted by their y-coordinate.
+    It runs the strip scan kernel of the default backend (backends.py).
 
     Parameters:
-    - strip (List[Point]): The list of points in the strip.
+    - strip (List[Point]): The list of points in the strip, in increasing y order.
     - d (float): The current known minimum distance.
+    - lo, hi (int): Only strip[lo:hi] is the strip (default: the whole list).
 
     Returns:
     - (float): The updated minimum distance found in the strip.
     """
-    # Sort strip by y-coordinate
-    strip.sort(key=lambda p: p.y)
-    min_dist = d
-    n = len(strip)
-
-    # According to the closest pair theorem, we need to check at most 7 points ahead.
-    for i in range(n):
-        for j in range(i+1, min(i+7, n)):
-            if (strip[j].y - strip[i].y) >= min_dist:
-                break
-            d_ij = dist(strip[i], strip[j])
-            if d_ij < min_dist:
-                min_dist = d_ij
-    return min_dist
+    hi = len(strip) if hi is None else hi
+    kernels, xs, ys, unbounded = backends.prepare(*_coordinates(strip[lo:hi]))
+    # Squared distances below d*d are exactly those below d once rooted.
+    bound = d * d
+    if unbounded != math.inf:
+        bound = unbounded if bound >= unbounded else math.ceil(bound)
+    order = kernels.positions(hi - lo)
+    order[:] = range(hi - lo)
+    key, i, _, _, _ = kernels.strip_scan(xs, ys, order, 0, hi - lo, bound, -1, -1)
+    return math.sqrt(key) if i >= 0 else d
 
 
-def closest_pair_util(points: List[Point]) -> float:
+def closest_pair_util(xs, ys, src, dst, strip, lo: int, hi: int, best: Tuple[Union[int, float], int, int],
+                      kernels: 'backends.Kernels', stats=None) -> Tuple[Union[int, float], int, int]:
     """
-    A recursive utility function that computes the closest pair distance
-    for a list of points sorted by x-coordinate.
+    A recursive utility function that computes the closest pair for the
+    points lo..hi-1 of the points sorted by x-coordinate.
+
+    Subsets are passed as index bounds instead of list slices, and the
+    recursion works on point positions in preallocated buffers, so no
+    level allocates. The roles of src and dst alternate from one level to
+    the next: the two halves come back sorted by y in src, and they are
+    merged into dst[lo:hi], so no level has to sort its strip. The merge
+    also picks the strip out of the merged points by their distance to the
+    dividing line. The smallest squared distance found so far is passed
+    down in best: a subset only has to look for pairs closer than that,
+    which keeps strips narrow. The loops are the kernels of a backend.
 
     Parameters:
-    - points (List[Point]): Points sorted by x-coordinate.
+    - xs, ys (list | np.ndarray): The coordinates sorted by x, in the form
+      the kernels take (backends.prepare()).
+    - src, dst (list | np.ndarray): Two position buffers of the kernels.
+      On return dst[lo:hi] holds the positions lo..hi-1 sorted by
+      y-coordinate, and src[lo:hi] is scratch.
+    - strip (list | np.ndarray): Position buffer for the strip.
+    - lo, hi (int): The bounds of the subset.
+    - best (tuple): The smallest squared distance known so far and the
+      positions of its pair (-1 before the first pair).
+    - kernels (backends.Kernels): The kernels to run.
+    - stats (RunStats | None): The collector of instrument.collect_stats()
+      that every level reports to, if any.
 
     Returns:
-    - (float): The smallest distance between any pair of points in the subset.
+    - (tuple): best, or the closest pair of the subset if it is closer.
     """
-    n = len(points)
+    n = hi - lo
+    start = stats.enter(n, n <= 3) if stats is not None else None
     # If the dataset is small, use brute force directly.
     if n <= 3:
-        return brute_force(points)
-
-    # Divide step
-    mid = n // 2
-    mid_point = points[mid]
+        best = kernels.brute_force(xs, ys, lo, hi, *best)
+        kernels.sort_by_y(ys, dst, lo, hi)
+    else:
+        # Divide step
+        mid = lo + n // 2
 
-    # Recursively find the smallest distances in left and right subsets
-    d_left = closest_pair_util(points[:mid])
-    d_right = closest_pair_util(points[mid:])
-    d = min(d_left, d_right)
+        # Recursively find the closest pairs in the left and right subsets,
+        # which leave their halves sorted by y in src.
+        best = closest_pair_util(xs, ys, dst, src, strip, lo, mid, best, kernels, stats)
+        best = closest_pair_util(xs, ys, dst, src, strip, mid, hi, best, kernels, stats)
+        m = kernels.merge_strip(xs, ys, src, dst, strip, lo, mid, hi, xs[mid], best[0])
 
-    # Create the strip subset of points
-    strip = [p for p in points if abs(p.x - mid_point.x) < d]
+        # Find the closest points in strip
+        if m >= 2:
+            key, i, j, evaluations, breaks = kernels.strip_scan(xs, ys, strip, 0, m, *best)
+            best = key, i, j
+            if stats is not None:
+                stats.add_strip(m, m - 1, breaks, evaluations)
+    if stats is not None:
+        stats.leave(start)
+    return best
 
-    # Find the closest points in strip
-    d_strip = strip_closest(strip, d)
 
-    return min(d, d_strip)
+def _closest_pair_kernels(kernels: 'backends.Kernels', xs, ys,
+                          unbounded: Union[int, float]) -> Tuple[Union[int, float], int, int]:
+    """Runs closest_pair_util() on at least two x-sorted points, with fresh buffers."""
+    n = len(xs)
+    src, dst, strip = kernels.positions(n), kernels.positions(n), kernels.positions(n)
+    return closest_pair_util(xs, ys, src, dst, strip, 0, n, (unbounded, -1, -1), kernels, _collector.stats)
 
 
-def closest_pair_distance(points: List[Point]) -> float:
+def closest_pair_recursive(points: List[Point], backend: Optional[str] = None) -> float:
     """
-    The main function to find the closest pair of points distance from a given set of points.
-    Uses a divide-and-conquer approach with O(n log n) complexity.
+    Finds the closest pair distance with the divide-and-conquer recursion
+    of closest_pair_util(), whose loops are the kernels of a backend
+    (backends.py). It sorts once by x and allocates its working buffers up
+    front, so the whole run is O(n log n) and no level allocates. Squared
+    distances are compared exactly, and a single square root is taken.
 
     Parameters:
     - points (List[Point]): The list of points.
+    - backend (str | None): The backend whose kernels to run, or None for
+      the default backend. "numpy" runs the "python" kernels.
 
     Returns:
     - (float): The smallest distance between any pair of points.
@@ -117,7 +237,644 @@ def closest_pair_distance(points: List[Point]) -> float:
     if not points or len(points) < 2:
         return float('inf')
 
-    # Sort points by x-coordinate
-    points_sorted = sorted(points, key=lambda p: p.x)
+    xs, ys = _coordinates(sorted(points, key=_by_x))
+    key, _, _ = _closest_pair_kernels(*backends.prepare(xs, ys, backend))
+    return math.sqrt(key)
+
+
+def _pair_distances(xs: np.ndarray, ys: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Euclidean distances between the points at index arrays a and b."""
+    dx = xs[a] - xs[b]
+    dy = ys[a] - ys[b]
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def _pair_squared(xs: np.ndarray, ys: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Squared distances between the points at index arrays a and b, in the dtype of xs."""
+    dx = xs[a] - xs[b]
+    dy = ys[a] - ys[b]
+    return dx * dx + dy * dy
+
+
+def _exact_coordinates(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Prepares coordinate arrays for distance comparisons.
+
+    Returns:
+    - (Tuple[np.ndarray, np.ndarray, bool]): The coordinates and whether
+      they are compared by squared distance. Float input becomes float64.
+      Integer input stays int64 when its squared distances fit, and becomes
+      an object array of Python ints otherwise. Object arrays (the Python
+      numbers of a PointArray that int64 and float64 cannot hold) are kept
+      and compared by squared distance with Python arithmetic.
+    """
+    if x.dtype == object or y.dtype == object:
+        return x.astype(object), y.astype(object), True
+    if not (np.issubdtype(x.dtype, np.integer) and np.issubdtype(y.dtype, np.integer)):
+        return x.astype(np.float64), y.astype(np.float64), False
+    if len(x) and max(int(x.max()) - int(x.min()), int(y.max()) - int(y.min())) >= INT64_SPAN:
+        return x.astype(object), y.astype(object), True
+    return x.astype(np.int64), y.astype(np.int64), True
+
+
+def _pair_keys(xs: np.ndarray, ys: np.ndarray, a: np.ndarray, b: np.ndarray, squared: bool) -> np.ndarray:
+    """
+    Squared distances for integer coordinates, distances otherwise. Every
+    vectorized engine evaluates its distances here, so this is where they
+    are counted.
+    """
+    stats = _collector.stats
+    if stats is not None:
+        stats.distance_evaluations += len(a)
+    return _pair_squared(xs, ys, a, b) if squared else _pair_distances(xs, ys, a, b)
+
+
+def _closer(x: np.ndarray, y: np.ndarray, first: Tuple[float, int, int],
+            second: Tuple[float, int, int]) -> bool:
+    """
+    Whether the (distance, i, j) pair `first` is strictly closer than
+    `second`. Two integer distances may round to the same float, so integer
+    pairs are compared by their exact squared distances, and so are the
+    Python numbers of object arrays.
+    """
+    if np.issubdtype(x.dtype, np.integer) or x.dtype == object:
+        def squared(pair):
+            _, i, j = pair
+            return (x.item(i) - x.item(j))**2 + (y.item(i) - y.item(j))**2
+        return squared(first) < squared(second)
+    return first[0] < second[0]
+
+
+def _key_distance(key: Union[int, float], squared: bool) -> float:
+    """The distance of a comparison key from _pair_keys()."""
+    return math.sqrt(key) if squared else float(key)
+
+
+def _sort_strip(strip: np.ndarray, subset: np.ndarray, ys: np.ndarray,
+                y_rank: Optional[np.ndarray]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Orders the strip positions by (subset, y).
+
+    lexsort is slow on wide strips (e.g. all points on a vertical line), so
+    those sort a single (subset, y rank) key instead. The y ranks of all
+    points are computed on first use and handed back for the next level.
+
+    Returns:
+    - (Tuple[np.ndarray, np.ndarray | None]): The sorted strip and the y ranks.
+    """
+    n = len(ys)
+    if len(strip) < n // 16:
+        return strip[np.lexsort((ys[strip], subset[strip]))], y_rank
+    if y_rank is None:
+        y_rank = np.empty(n, dtype=np.int64)
+        y_rank[np.argsort(ys)] = np.arange(n)
+    return strip[np.argsort(subset[strip] * n + y_rank[strip])], y_rank
+
+
+def _closest_pairs_arrays(x: np.ndarray, y: np.ndarray, k: int) -> List[Tuple[float, int, int]]:
+    """
+    Vectorized divide and conquer over coordinate arrays.
+
+    The points are sorted by x once. Blocks of LEAF_SIZE consecutive points
+    are brute forced, then neighbouring blocks are merged level by level.
+    At every level the strip around each dividing line is built with a
+    single mask, sorted by (subset, y), and scanned by comparing each strip
+    point with the next one, two, ... points of the same subset until no
+    pair is closer than d vertically.
+
+    The k best pairs seen so far are kept in a bounded heap, and d is the
+    distance of the k-th of them (the smallest distance when k == 1). d is
+    shared by all subsets and never larger than the per-subset minimum of
+    the recursive version, so the strips only get narrower and the result
+    is the same.
+
+    With a statistics collector active, every level reports its subsets,
+    time and strips: the leaves are the deepest level, the last merge is
+    depth 0, as in the recursion.
+
+    Parameters:
+    - x (np.ndarray): The x-coordinates (at least two points).
+    - y (np.ndarray): The y-coordinates.
+    - k (int): The number of pairs to find.
+
+    Returns:
+    - (List[Tuple[float, int, int]]): Up to k (distance, i, j) entries in
+      increasing distance, with i and j indices into x and y.
+    """
+    stats = _collector.stats
+    if stats is not None:
+        start = time.perf_counter()
+        # Per level, bottom-up: subsets, base cases and seconds.
+        levels = []
+    n = len(x)
+    order = np.argsort(x)
+    xs, ys, squared = _exact_coordinates(x[order], y[order])
+
+    def within(delta: np.ndarray) -> np.ndarray:
+        """Whether coordinate differences are below best_d."""
+        return delta * delta < best_d if squared else np.abs(delta) < best_d
+
+    # For integer coordinates, best_d and the heap hold squared distances.
+    heap = []
+    best_d = float('inf')
+
+    def offer(a: np.ndarray, b: np.ndarray) -> Union[int, float]:
+        """Pushes the pairs (a, b) closer than best_d into the heap."""
+        d = _pair_keys(xs, ys, a, b, squared)
+        if k == 1:
+            keep = np.argmin(d)[None]
+        else:
+            keep = np.flatnonzero(d < best_d)
+            if len(keep) > k:
+                keep = keep[np.argpartition(d[keep], k - 1)[:k]]
+        for i, value in zip(keep.tolist(), d[keep].tolist()):
+            entry = (-value, int(a[i]), int(b[i]))
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[0] > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+        return -heap[0][0] if len(heap) == k else float('inf')
+
+    # Conquer the leaves: compare every pair inside a block of LEAF_SIZE points.
+    position = np.arange(n)
+    for step in range(1, min(LEAF_SIZE, n)):
+        a = position[:n - step]
+        a = a[a % LEAF_SIZE < LEAF_SIZE - step]
+        best_d = offer(a, a + step)
+    if stats is not None:
+        leaves = -(-n // LEAF_SIZE)
+        levels.append((leaves, leaves, time.perf_counter() - start))
+
+    # Combine: merge neighbouring subsets of `size` points into subsets of 2 * size.
+    y_rank = None
+    size = LEAF_SIZE
+    while size < n:
+        if stats is not None:
+            start = time.perf_counter()
+        subset = position // (2 * size)
+        mid = subset * (2 * size) + size
+        has_right = mid < n
+        mid_x = xs[np.minimum(mid, n - 1)]
+        strip = np.flatnonzero(has_right & within(xs - mid_x))
+
+        if len(strip) > 1:
+            strip, y_rank = _sort_strip(strip, subset, ys, y_rank)
+            strip_subset = subset[strip]
+            if stats is not None:
+                # One strip per subset; the recursion skips those of one point.
+                widths, counts = np.unique(np.bincount(strip_subset), return_counts=True)
+                for width, count in zip(widths.tolist(), counts.tolist()):
+                    if width > 1:
+                        stats.add_strip(width, 0, 0, 0, count)
+            strip_y = ys[strip]
+            strip_left = strip < mid[strip]
+            m = len(strip)
+            for step in range(1, m):
+                live = ((strip_subset[:m - step] == strip_subset[step:]) &
+                        within(strip_y[step:] - strip_y[:m - step]))
+                if not live.any():
+                    # Pairs further apart in the strip are even further apart in y.
+                    break
+                # Pairs from the same half were already seen one level down.
+                live &= strip_left[:m - step] != strip_left[step:]
+                if live.any():
+                    best_d = offer(strip[:m - step][live], strip[step:][live])
+        if stats is not None:
+            levels.append((-(-n // (2 * size)), 0, time.perf_counter() - start))
+        size *= 2
+
+    if stats is not None:
+        cumulative = 0.0
+        for depth, (calls, base_cases, seconds) in zip(range(len(levels) - 1, -1, -1), levels):
+            cumulative += seconds
+            stats.add_level(depth, calls, n, base_cases, seconds, cumulative)
+
+    pairs = []
+    for d, a, b in sorted(heap, reverse=True):
+        i, j = sorted((int(order[a]), int(order[b])))
+        pairs.append((_key_distance(-d, squared), i, j))
+    return pairs
+
+
+def _closest_pair_arrays(x: np.ndarray, y: np.ndarray) -> Tuple[float, int, int]:
+    """
+    Vectorized divide and conquer for the single closest pair.
+
+    Returns:
+    - (Tuple[float, int, int]): The smallest distance and the indices of
+      the two points (into x and y) that realise it.
+    """
+    return _closest_pairs_arrays(x, y, 1)[0]
+
+
+def closest_pair_vectorized(points: PointArray) -> float:
+    """
+    Finds the closest pair distance of a PointArray with NumPy array operations.
+    Sorting, partitioning, strip filtering and distance evaluation are all
+    done on whole arrays, so no Python object is created per point.
+
+    Parameters:
+    - points (PointArray): The points to consider.
+
+    Returns:
+    - (float): The smallest distance between any pair of points.
+    """
+    if len(points) < 2:
+        return float('inf')
+    d, _, _ = _closest_pair_arrays(points.x, points.y)
+    return d
+
+
+def _brute_force_arrays(x: np.ndarray, y: np.ndarray) -> Tuple[float, int, int]:
+    """
+    Vectorized brute force over coordinate arrays: for k = 1, 2, ... every
+    point is compared with the point k positions further on.
+
+    Returns:
+    - (Tuple[float, int, int]): The smallest distance and the indices of its pair.
+    """
+    n = len(x)
+    xs, ys, squared = _exact_coordinates(x, y)
+    best_d = float('inf')
+    best_a = best_b = 0
+    for k in range(1, n):
+        a = np.arange(n - k)
+        d = _pair_keys(xs, ys, a, a + k, squared)
+        i = int(np.argmin(d))
+        if d[i] < best_d:
+            best_d, best_a, best_b = d.item(i), i, i + k
+    return _key_distance(best_d, squared), best_a, best_b
+
+
+def _expand_ranges(start: np.ndarray, stop: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatenates np.arange(start[k], stop[k]) over all k.
+
+    Returns:
+    - (Tuple[np.ndarray, np.ndarray]): For every produced value, the range k
+      it came from, and the value itself.
+    """
+    length = stop - start
+    owner = np.repeat(np.arange(len(start)), length)
+    offset = np.arange(int(length.sum())) - np.repeat(np.cumsum(length) - length, length)
+    return owner, np.repeat(start, length) + offset
+
+
+def _grid_closest_pair(x: np.ndarray, y: np.ndarray, cell: float,
+                       max_candidates: int) -> Optional[Tuple[float, int, int]]:
+    """
+    Finds the closest pair among the pairs of points that fall into the same
+    or adjacent square cells of side `cell`. This is exact whenever the
+    closest pair distance is below `cell`.
+
+    Parameters:
+    - x, y (np.ndarray): The coordinates.
+    - cell (float): The side of a grid cell (> 0).
+    - max_candidates (int): Give up if more pairs than this would have to be compared.
+
+    Returns:
+    - (Tuple[float, int, int] | None): The smallest candidate distance and
+      its pair, or None if the grid is too fine to index or too crowded.
+    """
+    n = len(x)
+    if np.issubdtype(x.dtype, np.integer):
+        # Offsets from the minimum are exact in uint64, so large integer
+        # coordinates are only rounded relative to the extent of the grid.
+        dx = (x.astype(np.uint64) - x.min().astype(np.uint64)).astype(np.float64)
+        dy = (y.astype(np.uint64) - y.min().astype(np.uint64)).astype(np.float64)
+    else:
+        xs = x.astype(np.float64)
+        ys = y.astype(np.float64)
+        dx = xs - xs.min()
+        dy = ys - ys.min()
+    # Points whose distance is below `cell` must land in adjacent cells; the
+    # slightly larger side keeps that true under floating point rounding.
+    side = cell * (1 + 1e-6)
+    if dx.max() / side >= 2**30 or dy.max() / side >= 2**30:
+        return None
+    cx = np.floor(dx / side).astype(np.int64)
+    cy = np.floor(dy / side).astype(np.int64)
+    stride = int(cy.max()) + 3
+    key = cx * stride + cy
+
+    order = np.argsort(key)
+    key = key[order]
+    # Cells are assigned in floating point, candidates are compared exactly.
+    xs, ys, squared = _exact_coordinates(x[order], y[order])
+    first = np.flatnonzero(np.diff(key, prepend=-1))
+    cells = key[first]
+    count = np.diff(first, append=n)
+    cell_of = np.repeat(np.arange(len(cells)), count)
+    position = np.arange(n)
+
+    # Every point is compared with the rest of its own cell and with the
+    # cells above, right-below, right and right-above it.
+    ranges = [(position + 1, (first + count)[cell_of])]
+    last = len(cells) - 1
+
+    def neighbour(j, target):
+        found = cells[j] == target
+        start = np.where(found, first[j], 0)[cell_of]
+        stop = np.where(found, first[j] + count[j], 0)[cell_of]
+        ranges.append((start, stop))
+        return found
+
+    neighbour(np.minimum(np.arange(1, len(cells) + 1), last), cells + 1)
+    # The three cells of the next column have consecutive keys, so one
+    # search finds all of them.
+    target = cells + (stride - 1)
+    j = np.searchsorted(cells, target)
+    for dy in range(3):
+        j = np.minimum(j, last)
+        j = j + neighbour(j, target + dy)
+
+    if sum(int((stop - start).sum()) for start, stop in ranges) > max_candidates:
+        return None
+
+    best_d = float('inf')
+    best_a = best_b = 0
+    for start, stop in ranges:
+        # Expand the ranges in chunks to bound the memory of the pair arrays.
+        bounds = np.cumsum(stop - start)
+        cuts = np.searchsorted(bounds, np.arange(GRID_CHUNK, int(bounds[-1]), GRID_CHUNK))
+        for lo, hi in zip(np.concatenate(([0], cuts)), np.concatenate((cuts, [n]))):
+            owner, b = _expand_ranges(start[lo:hi], stop[lo:hi])
+            if len(b) == 0:
+                continue
+            a = owner + lo
+            d = _pair_keys(xs, ys, a, b, squared)
+            i = int(np.argmin(d))
+            if d[i] < best_d:
+                best_d, best_a, best_b = d.item(i), int(a[i]), int(b[i])
+
+    return _key_distance(best_d, squared), int(order[best_a]), int(order[best_b])
+
+
+def _grid_round(x: np.ndarray, y: np.ndarray, sample_size: int,
+                rng: 'np.random.Generator') -> Optional[Tuple[float, int, int]]:
+    """
+    One round of the randomized grid algorithm (after Rabin): the closest
+    pair distance of a random sample is an upper bound for the answer, so
+    a grid with that cell size contains the closest pair in adjacent cells.
+
+    Returns:
+    - (Tuple[float, int, int] | None): The exact answer, or None when the
+      sample bound was too loose and the grid would be too crowded.
+    """
+    n = len(x)
+    sample = np.sort(rng.choice(n, size=sample_size, replace=False))
+    d, a, b = _closest_pair_arrays(x[sample], y[sample])
+    best = (d, int(sample[a]), int(sample[b]))
+    if d == 0:
+        return best
+
+    found = _grid_closest_pair(x, y, d, GRID_CANDIDATES_PER_POINT * n)
+    if found is None:
+        return None
+    return found if _closer(x, y, found, best) else best
+
+
+def _grid_sample_size(n: int) -> int:
+    """Sample size of the first grid round: n^(2/3), so the sample costs o(n)."""
+    return min(n, max(LEAF_SIZE, int(n ** (2 / 3))))
+
+
+def _closest_pair_grid_arrays(x: np.ndarray, y: np.ndarray,
+                              rng: 'np.random.Generator') -> Tuple[float, int, int]:
+    """
+    Runs grid rounds with a growing sample until the grid is sparse enough.
+    Once the sample is the whole input, its divide-and-conquer result is the answer.
+    Object arrays run divide and conquer right away (see the module docstring).
+    """
+    n = len(x)
+    if x.dtype == object:
+        return _closest_pair_arrays(x, y)
+    sample_size = _grid_sample_size(n)
+    while True:
+        if sample_size == n:
+            return _closest_pair_arrays(x, y)
+        found = _grid_round(x, y, sample_size, rng)
+        if found is not None:
+            return found
+        sample_size = min(n, 4 * sample_size)
+
+
+def closest_pair_grid(points: PointArray, seed: Optional[int] = None) -> float:
+    """
+    Finds the closest pair distance with the randomized grid algorithm,
+    which runs in expected linear time on uniform or mildly clustered data.
+
+    The closest pair of a random sample of n^(2/3) points gives an upper
+    bound d on the answer. The points are bucketed into square cells of
+    side d, and only points in the same or adjacent cells are compared.
+    If the cells turn out too crowded, the round is retried with a larger
+    sample; in the worst case the sample grows to the whole input and the
+    divide-and-conquer answer is returned. The result is always exact.
+
+    Parameters:
+    - points (PointArray): The points to consider.
+    - seed (int | None): Seed for the random sample.
+
+    Returns:
+    - (float): The smallest distance between any pair of points.
+    """
+    if len(points) < 2:
+        return float('inf')
+    d, _, _ = _closest_pair_grid_arrays(points.x, points.y, np.random.default_rng(seed))
+    return d
+
+
+def _run_engine(points: PointArray, engine: str, info: Optional[dict],
+                check_duplicates: bool = False) -> Tuple[float, int, int]:
+    """
+    Runs the named engine on at least two points, resolving engine="auto".
+
+    "auto" picks brute force for at most BRUTE_FORCE_MAX points. Otherwise
+    it tries one grid round, whose sample doubles as a cheap probe of the
+    data distribution: if the grid built from it is sparse the grid answer
+    is used, if it is crowded (strongly clustered data) divide and conquer
+    runs instead. Object arrays (see the module docstring) never use the
+    grid. With check_duplicates, a hashing pass looks for coincident
+    points first and answers 0 without running any engine ("duplicates").
+    The engine that produced the answer is stored in info["engine"] when
+    info is a dict.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {ENGINES}")
+    n = len(points)
+    x, y = points.x, points.y
+
+    result = None
+    if check_duplicates:
+        duplicate = _first_duplicate(x, y)
+        if duplicate is not None:
+            result = (0.0, *duplicate)
+            engine = 'duplicates'
+
+    if result is None and x.dtype == object and engine in ('auto', 'grid'):
+        # Grid cells are computed in float, which cannot place these exactly.
+        engine = 'brute' if engine == 'auto' and n <= BRUTE_FORCE_MAX else 'dc'
+
+    if result is None and engine == 'auto':
+        if n <= BRUTE_FORCE_MAX:
+            engine = 'brute'
+        else:
+            result = _grid_round(x, y, _grid_sample_size(n), np.random.default_rng())
+            engine = 'dc' if result is None else 'grid'
+
+    if result is None:
+        if engine == 'brute':
+            result = _brute_force_arrays(x, y)
+        elif engine == 'grid':
+            result = _closest_pair_grid_arrays(x, y, np.random.default_rng())
+        else:
+            result = _closest_pair_arrays(x, y)
+
+    if info is not None:
+        info['engine'] = engine
+    return result
+
+
+def closest_pair_distance(points: Union[List[Point], PointArray], engine: str = 'auto',
+                          info: Optional[dict] = None, check_duplicates: bool = False) -> float:
+    """
+    The main function to find the closest pair of points distance from a given set of points.
+    Uses a divide-and-conquer approach with O(n log n) complexity, or one of
+    the alternative engines.
+
+    This is a thin adapter over the vectorized engines: a list of Point
+    objects is converted into a PointArray first.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - engine (str): "dc" (closest_pair_vectorized), "grid" (closest_pair_grid),
+      "brute" (vectorized brute force) or "auto" to choose by the size and
+      distribution of the input.
+    - info (dict | None): If given, info["engine"] is set to the engine used.
+    - check_duplicates (bool): Look for coincident points with an O(n)
+      hashing pass first (duplicates.py) and return 0 right away if two
+      points coincide. Worth it when duplicates are common in the input.
+
+    Returns:
+    - (float): The smallest distance between any pair of points.
+    """
+    if not isinstance(points, PointArray) and (not points or len(points) < 2):
+        return float('inf')
+    points = _as_point_array(points)
+    if len(points) < 2:
+        return float('inf')
+
+    d, _, _ = _run_engine(points, engine, info, check_duplicates)
+    return d
+
+
+class ClosestPair(NamedTuple):
+    """
+    A pair of points together with their distance, as returned by
+    closest_pair() and k_closest_pairs().
+    """
+    distance: float
+    i: int              # Index of the first point in the input (i < j).
+    j: int              # Index of the second point in the input.
+    first: Point        # The point at index i.
+    second: Point       # The point at index j.
+    engine: str         # The engine that found the pair.
+
+
+def _as_point_array(points: Union[List[Point], PointArray]) -> PointArray:
+    """Returns points as a PointArray, converting a list of Point objects."""
+    if isinstance(points, PointArray):
+        return points
+    return PointArray.from_points(points)
+
+
+def closest_pair(points: Union[List[Point], PointArray], engine: str = 'auto',
+                 check_duplicates: bool = False) -> Optional[ClosestPair]:
+    """
+    Finds the closest pair of points and reports which two points it is,
+    in the same pass that computes the distance.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - engine (str): The engine to use, as for closest_pair_distance().
+    - check_duplicates (bool): As for closest_pair_distance(); a pair of
+      coincident points is reported with engine "duplicates".
+
+    Returns:
+    - (ClosestPair | None): The distance, the indices of both points in the
+      input and the points themselves (the original objects for a list of
+      points), or None if there are fewer than two points.
+    """
+    array = _as_point_array(points)
+    if len(array) < 2:
+        return None
+
+    info = {}
+    d, i, j = _run_engine(array, engine, info, check_duplicates)
+    i, j = sorted((i, j))
+    return ClosestPair(d, i, j, points[i], points[j], info['engine'])
+
+
+def k_closest_pairs(points: Union[List[Point], PointArray], k: int) -> List[ClosestPair]:
+    """
+    Finds the k closest pairs of points in one divide-and-conquer run.
+
+    The k best pairs found so far are kept in a bounded heap, and the
+    strips are filtered by the distance of the k-th of them instead of the
+    single minimum, so asking for a few pairs costs about as much as asking
+    for one.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - k (int): The number of pairs to return.
+
+    Returns:
+    - (List[ClosestPair]): The min(k, n(n-1)/2) closest pairs, closest first.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    array = _as_point_array(points)
+    if len(array) < 2:
+        return []
+
+    return [ClosestPair(d, i, j, points[i], points[j], 'dc')
+            for d, i, j in _closest_pairs_arrays(array.x, array.y, k)]
+
+
+def closest_pair_backend(points: Union[List[Point], PointArray],
+                         backend: Optional[str] = None) -> Optional[ClosestPair]:
+    """
+    Finds the closest pair with the divide-and-conquer engine of a backend
+    (backends.py): the recursion of closest_pair_util() over the "numba" or
+    "python" kernels, or the vectorized engine for "numpy".
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - backend (str | None): "auto", one of backends.BACKENDS, or None for
+      the default backend (backends.get_backend()).
+
+    Returns:
+    - (ClosestPair | None): The pair, with engine "dc:<backend>" naming the
+      backend that ran it, or None if there are fewer than two points.
+
+    Raises:
+    - ValueError: If the backend is unknown or not installed.
+    """
+    backend = backends._backend(backend)
+    array = _as_point_array(points)
+    if len(array) < 2:
+        return None
 
-    return closest_pair_util(points_sorted)
+    xs, ys, _ = _exact_coordinates(array.x, array.y)
+    # Coordinates the compiled kernels cannot hold go to the vectorized engine.
+    if backend == 'numpy' or (backend == 'numba' and xs.dtype == object):
+        d, i, j = _closest_pair_arrays(array.x, array.y)
+        backend = 'numpy'
+    else:
+        by_x = np.argsort(xs, kind='stable')
+        kernels, sorted_x, sorted_y, unbounded = backends.prepare(xs[by_x], ys[by_x], backend)
+        key, i, j = _closest_pair_kernels(kernels, sorted_x, sorted_y, unbounded)
+        d, i, j = math.sqrt(key), int(by_x[i]), int(by_x[j])
+        backend = kernels.backend
+    i, j = sorted((i, j))
+    return ClosestPair(d, i, j, points[i], points[j], f"dc:{backend}")
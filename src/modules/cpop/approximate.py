@@ -0,0 +1,225 @@
+"""
+approximate.py
+
+This module finds a pair of points whose distance is within a factor
+(1 + eps) of the closest pair distance, for very large exploratory runs
+where the exact answer is not worth its price.
+
+The closest pair of a random sample of n^(2/3) points has a distance U,
+an upper bound for the answer, and the sample pair is itself a valid
+answer as soon as the true distance is above w = U / (1 + eps). Only pairs
+closer than w are then searched for, with shifted grids instead of the
+neighbour cells of the exact grid engine: the points are snapped to square
+cells of side L >= 6w, and only points in the same cell are compared. By
+Chan's shifting lemma, two points at most L/6 apart (in every coordinate)
+share a cell in at least one of the three grids shifted by 0, L/3 and 2L/3
+along the diagonal. A point whose whole w-neighbourhood lies inside its
+cell has no partner closer than w elsewhere, so each grid only keeps the
+points near the sides of its cells for the next one. The first grid sees
+every point, the later ones a small fraction, and no grid needs the per
+point neighbour lookups that dominate the exact engine.
+
+The guarantee: the returned pair is always a real pair of input points, at
+distance d with exact <= d <= (1 + eps) * exact. If the closest pair is
+closer than w it is found exactly; otherwise the sample pair qualifies.
+eps = 0 gives the exact answer. Larger eps shrink the cells, so fewer
+pairs are compared.
+
+Key functions:
+- approximate_closest_pair(points, eps): a (1 + eps)-approximate closest
+  pair, as a ClosestPair with engine "approximate".
+"""
+
+import math
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .algorithms import (BRUTE_FORCE_MAX, GRID_CANDIDATES_PER_POINT, GRID_CHUNK, ClosestPair,
+                         _as_point_array, _brute_force_arrays, _closer, _closest_pair_arrays,
+                         _exact_coordinates, _expand_ranges, _grid_sample_size, _key_distance, _pair_keys)
+from .geometry import Point, PointArray
+
+# Side of the shifted grid cells, in multiples of the distance searched for
+# (at least 6, the shifting lemma for three grids). Larger cells hold more
+# points; smaller ones leave more points near their sides for the next grid.
+CELL_SCALE = 16
+
+# The diagonal shifts of the grids, in cells.
+SHIFTS = (0.0, 1 / 3, 2 / 3)
+
+
+def _cell_positions(x: np.ndarray, y: np.ndarray, side: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    The positions of the points in cell units from the minimum corner,
+    or None if the grid would have too many cells to index.
+    """
+    if np.issubdtype(x.dtype, np.integer):
+        # As in the exact grid engine: offsets from the minimum are exact in uint64.
+        dx = (x.astype(np.uint64) - x.min().astype(np.uint64)).astype(np.float64)
+        dy = (y.astype(np.uint64) - y.min().astype(np.uint64)).astype(np.float64)
+    else:
+        dx = x - x.min()
+        dy = y - y.min()
+    tx = dx / side
+    ty = dy / side
+    if tx.max() >= 2**30 or ty.max() >= 2**30:
+        return None
+    return tx, ty
+
+
+def _same_cell_ranges(tx: np.ndarray, ty: np.ndarray, subset: np.ndarray,
+                      shift: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sorts the points of `subset` by their cell in the grid shifted by
+    `shift` cells along the diagonal.
+
+    Returns:
+    - (Tuple[np.ndarray, np.ndarray, np.ndarray]): The subset in cell
+      order, and for every point of a cell holding at least two points, its
+      position in that order and the position where its cell ends.
+    """
+    cx = np.floor(tx[subset] + shift).astype(np.int64)
+    cy = np.floor(ty[subset] + shift).astype(np.int64)
+    key = cx * (int(cy.max()) + 1) + cy
+    order = np.argsort(key)
+    key = key[order]
+    first = np.flatnonzero(np.diff(key, prepend=-1))
+    count = np.diff(first, append=len(key))
+    crowded = count > 1
+    first, count = first[crowded], count[crowded]
+    _, position = _expand_ranges(first, first + count)
+    return subset[order], position, np.repeat(first + count, count)
+
+
+def _near_sides(tx: np.ndarray, ty: np.ndarray, subset: np.ndarray, shift: float,
+                margin: float) -> np.ndarray:
+    """The points of `subset` within `margin` cells of a side of their cell."""
+    fx = tx[subset] + shift
+    fy = ty[subset] + shift
+    fx -= np.floor(fx)
+    fy -= np.floor(fy)
+    near = (fx < margin) | (fx > 1 - margin) | (fy < margin) | (fy > 1 - margin)
+    return subset[near]
+
+
+def _shifted_grid_round(x: np.ndarray, y: np.ndarray, w: float,
+                        max_candidates: int) -> Optional[Tuple[float, int, int]]:
+    """
+    Finds the closest pair among the pairs that share a cell of one of the
+    shifted grids. Every pair at most w apart is among them.
+
+    Parameters:
+    - x, y (np.ndarray): The coordinates.
+    - w (float): The distance searched for (> 0).
+    - max_candidates (int): Give up if more pairs than this would have to be compared.
+
+    Returns:
+    - (Tuple[float, int, int] | None): The smallest candidate distance and
+      its pair (inf if there is no candidate), or None if the grids are too
+      crowded or too fine to index.
+    """
+    side = CELL_SCALE * w
+    positions = _cell_positions(x, y, side)
+    if positions is None:
+        return None
+    tx, ty = positions
+    # A point is kept for the next grid if a partner within w could lie in
+    # another cell; the slightly wider margin absorbs rounding, as the
+    # slightly larger cells of the exact grid engine do.
+    margin = w / side * (1 + 1e-6)
+
+    xs, ys, squared = _exact_coordinates(x, y)
+    best_d = math.inf
+    best_a = best_b = 0
+    compared = 0
+    subset = np.arange(len(x))
+    for shift in SHIFTS:
+        # Every point of a crowded cell is compared with the points after it.
+        ordered, start, stop = _same_cell_ranges(tx, ty, subset, shift)
+        start_after = start + 1
+        compared += int((stop - start_after).sum())
+        if compared > max_candidates:
+            return None
+        bounds = np.cumsum(stop - start_after)
+        total = int(bounds[-1]) if len(bounds) else 0
+        cuts = np.searchsorted(bounds, np.arange(GRID_CHUNK, total, GRID_CHUNK))
+        for lo, hi in zip(np.concatenate(([0], cuts)), np.concatenate((cuts, [len(start)]))):
+            owner, b = _expand_ranges(start_after[lo:hi], stop[lo:hi])
+            if len(b) == 0:
+                continue
+            a = ordered[start[lo:hi][owner]]
+            b = ordered[b]
+            d = _pair_keys(xs, ys, a, b, squared)
+            i = int(np.argmin(d))
+            if d[i] < best_d:
+                best_d, best_a, best_b = d.item(i), int(a[i]), int(b[i])
+        subset = _near_sides(tx, ty, subset, shift, margin)
+        if not len(subset):
+            break
+
+    if best_d == math.inf:
+        return best_d, 0, 0
+    return _key_distance(best_d, squared), best_a, best_b
+
+
+def _approximate_arrays(x: np.ndarray, y: np.ndarray, eps: float,
+                        rng: 'np.random.Generator') -> Tuple[float, int, int]:
+    """
+    Runs shifted grid rounds with a growing sample until the grids are
+    sparse enough. Once the sample is the whole input, its exact
+    divide-and-conquer result is the answer.
+    """
+    n = len(x)
+    sample_size = _grid_sample_size(n)
+    while sample_size < n:
+        sample = np.sort(rng.choice(n, size=sample_size, replace=False))
+        d, a, b = _closest_pair_arrays(x[sample], y[sample])
+        best = (d, int(sample[a]), int(sample[b]))
+        if d == 0:
+            return best
+        found = _shifted_grid_round(x, y, d / (1 + eps), GRID_CANDIDATES_PER_POINT * n)
+        if found is not None:
+            return found if found[0] != math.inf and _closer(x, y, found, best) else best
+        sample_size = min(n, 4 * sample_size)
+    return _closest_pair_arrays(x, y)
+
+
+def approximate_closest_pair(points: Union[List[Point], PointArray], eps: float,
+                             seed: Optional[int] = None) -> Optional[ClosestPair]:
+    """
+    Finds a pair of points whose distance is at most (1 + eps) times the
+    closest pair distance, with shifted grids over a sampled upper bound.
+
+    The pair is always a real pair of input points, so its distance is
+    never below the exact answer either. Inputs of at most BRUTE_FORCE_MAX
+    points are solved exactly.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - eps (float): The allowed relative error (finite, >= 0; 0 is exact).
+    - seed (int | None): Seed for the random sample.
+
+    Returns:
+    - (ClosestPair | None): The pair, with engine "approximate" (or the
+      exact "brute" for small inputs and "dc" for coordinates that only
+      object arrays hold exactly), or None if there are fewer than two points.
+    """
+    if not 0 <= eps < math.inf:
+        raise ValueError("eps must be a non-negative finite number")
+    array = _as_point_array(points)
+    if len(array) < 2:
+        return None
+
+    if len(array) <= BRUTE_FORCE_MAX:
+        d, i, j = _brute_force_arrays(array.x, array.y)
+        engine = 'brute'
+    elif array.dtype == object:
+        # Coordinates beyond int64/float64 cannot be placed in float cells.
+        d, i, j = _closest_pair_arrays(array.x, array.y)
+        engine = 'dc'
+    else:
+        d, i, j = _approximate_arrays(array.x, array.y, float(eps), np.random.default_rng(seed))
+        engine = 'approximate'
+    i, j = sorted((i, j))
+    return ClosestPair(d, i, j, points[i], points[j], engine)
@@ -0,0 +1,316 @@
+"""
+backends.py
+
+This module holds the scalar inner loops of the closest pair solutions of
+algorithms.py as kernels over coordinate sequences and point positions:
+the brute force of a run of points, the y sort of a small subset, the merge
+of two y-sorted halves that also picks out the strip around their dividing
+line, and the 7-point strip scan. brute_force(), strip_closest() and the
+divide-and-conquer recursion of closest_pair_recursive() run no loops of
+their own: they call the kernels of the selected backend, so there is one
+implementation of each loop. The backends are:
+- "numba": the kernels compiled by Numba, if it is installed. They are
+  compiled on first use (once per coordinate type), not at import, and
+  cached on disk next to this module.
+- "numpy": the vectorized level-by-level engine of algorithms.py
+  (closest_pair_vectorized), which has no per-point loop. It takes over
+  whole inputs in closest_pair_backend(); the scalar call sites, which
+  have no whole input to hand over, run the "python" kernels.
+- "python": the kernels run by the interpreter over lists of Python
+  numbers. Always available, and exact for integers of any size.
+
+Distances are compared squared in the coordinate type and a single square
+root is taken at the end, so on integer inputs every backend computes the
+same exact squared distance and returns the same float, bit for bit. The
+"numba" and "python" kernels also run the same comparisons in the same
+order, so they report the same pair.
+
+Integer coordinates too far apart for int64 squared distances (see
+INT64_SPAN) and coordinates of mixed or other types cannot be compiled;
+the "numba" backend hands them to the "python" kernels.
+
+The backend is "auto" by default: "numba" when it is installed, "numpy"
+otherwise. The CPOP_BACKEND environment variable or set_backend() choose
+another one for the whole process, the backend argument of
+algorithms.closest_pair_backend() for one call.
+
+Key functions:
+- prepare(xs, ys, backend): the kernels of a backend, with the coordinates
+  converted to the form they take.
+- set_backend(name) / get_backend(): the default backend.
+- available_backends(): the backends that can run here.
+"""
+
+import importlib.util
+import math
+import os
+from typing import Callable, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+BACKENDS = ('numba', 'numpy', 'python')
+
+# Names the default backend ("auto" or one of BACKENDS).
+BACKEND_ENV = 'CPOP_BACKEND'
+
+# Integer coordinates spanning less than this are compared as int64 squared
+# distances: dx^2 + dy^2 < 2 * 2^62 cannot overflow.
+INT64_SPAN = 2**31
+
+# Larger than every int64 squared distance: the "no pair yet" key of the
+# compiled integer kernels.
+INT64_UNBOUNDED = np.iinfo(np.int64).max
+
+# The default backend chosen by set_backend(); None defers to BACKEND_ENV.
+_default: Optional[str] = None
+
+# The compiled kernels, once Numba has been imported.
+_compiled = {}
+
+
+def _brute_force(xs, ys, lo, hi, best_key, best_i, best_j):
+    """
+    Compares every pair of the points lo..hi-1.
+
+    Returns:
+    - (tuple): The smallest squared distance and its pair of positions:
+      (best_key, best_i, best_j) unless a pair is closer than best_key.
+    """
+    for i in range(lo, hi):
+        for j in range(i + 1, hi):
+            dx = xs[i] - xs[j]
+            dy = ys[i] - ys[j]
+            d2 = dx*dx + dy*dy
+            if d2 < best_key:
+                best_key = d2
+                best_i = i
+                best_j = j
+    return best_key, best_i, best_j
+
+
+def _sort_by_y(ys, order, lo, hi):
+    """Writes the positions lo..hi-1 to order[lo:hi], sorted by y (insertion sort)."""
+    for k in range(lo, hi):
+        y = ys[k]
+        m = k - 1
+        while m >= lo and ys[order[m]] > y:
+            order[m + 1] = order[m]
+            m -= 1
+        order[m + 1] = k
+
+
+def _merge_strip(xs, ys, src, dst, strip, lo, mid, hi, mid_x, best_key):
+    """
+    Merges the y-sorted positions src[lo:mid] and src[mid:hi] into
+    dst[lo:hi], and copies the merged positions whose squared distance to
+    the dividing line x = mid_x is below best_key into strip, from its
+    start and in y order.
+
+    Returns:
+    - (int): The number of positions in the strip.
+    """
+    m = 0
+    i = lo
+    j = mid
+    a = src[i]
+    b = src[j]
+    ay = ys[a]
+    by = ys[b]
+    p = a
+    k = lo
+    for k in range(lo, hi):
+        if by < ay:
+            p = b
+            j += 1
+            if j == hi:
+                break
+            b = src[j]
+            by = ys[b]
+        else:
+            p = a
+            i += 1
+            if i == mid:
+                break
+            a = src[i]
+            ay = ys[a]
+        dst[k] = p
+        dx = xs[p] - mid_x
+        if dx*dx < best_key:
+            strip[m] = p
+            m += 1
+
+    # One half is used up: p and the rest of the other half follow.
+    rest = i if j == hi else j
+    while True:
+        dst[k] = p
+        dx = xs[p] - mid_x
+        if dx*dx < best_key:
+            strip[m] = p
+            m += 1
+        k += 1
+        if k == hi:
+            return m
+        p = src[rest]
+        rest += 1
+
+
+def _strip_scan(xs, ys, strip, lo, hi, best_key, best_i, best_j):
+    """
+    Compares every point of the y-sorted positions strip[lo:hi] with at
+    most 7 successors, until their y distance alone reaches best_key.
+
+    Returns:
+    - (tuple): As _brute_force(), followed by the number of distances
+      evaluated and the number of scans stopped early by the y distance.
+    """
+    evaluations = 0
+    breaks = 0
+    # According to the closest pair theorem, we need to check at most 7 points ahead.
+    for k in range(lo, hi - 1):
+        a = strip[k]
+        stop = k + 8 if k + 8 < hi else hi
+        for l in range(k + 1, stop):
+            b = strip[l]
+            dy = ys[b] - ys[a]
+            if dy*dy >= best_key:
+                breaks += 1
+                break
+            evaluations += 1
+            dx = xs[a] - xs[b]
+            d2 = dx*dx + dy*dy
+            if d2 < best_key:
+                best_key = d2
+                best_i = a
+                best_j = b
+    return best_key, best_i, best_j, evaluations, breaks
+
+
+def _position_list(n: int) -> list:
+    return [0] * n
+
+
+def _position_array(n: int) -> np.ndarray:
+    return np.empty(n, np.int64)
+
+
+class Kernels(NamedTuple):
+    """The kernels of one backend."""
+    backend: str                # "numba" or "python".
+    brute_force: Callable       # _brute_force()
+    sort_by_y: Callable         # _sort_by_y()
+    merge_strip: Callable       # _merge_strip()
+    strip_scan: Callable        # _strip_scan()
+    positions: Callable         # positions(n): a buffer for n positions.
+
+
+PYTHON_KERNELS = Kernels('python', _brute_force, _sort_by_y, _merge_strip, _strip_scan, _position_list)
+
+
+def _numba_kernels() -> Kernels:
+    """The kernels compiled by Numba (compiled again per coordinate dtype on first call)."""
+    kernels = _compiled.get('kernels')
+    if kernels is None:
+        import numba
+        # Module-level functions, so the machine code is cached across processes.
+        jit = numba.njit(cache=True)
+        kernels = Kernels('numba', jit(_brute_force), jit(_sort_by_y), jit(_merge_strip),
+                          jit(_strip_scan), _position_array)
+        _compiled['kernels'] = kernels
+    return kernels
+
+
+def available_backends() -> Tuple[str, ...]:
+    """The backends that can run here, in the order "auto" prefers them."""
+    if importlib.util.find_spec('numba') is None:
+        return ('numpy', 'python')
+    return BACKENDS
+
+
+def _resolve(name: Optional[str]) -> str:
+    """Checks a backend name and resolves "auto" (or None) to a backend."""
+    if name is None or name == 'auto':
+        return available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend {name!r}, expected 'auto' or one of {BACKENDS}")
+    if name not in available_backends():
+        raise ValueError(f"backend {name!r} is not available: {name} is not installed")
+    return name
+
+
+def set_backend(name: Optional[str]) -> str:
+    """
+    Sets the default backend for the process.
+
+    Parameters:
+    - name (str | None): "auto", one of BACKENDS, or None to go back to the
+      CPOP_BACKEND environment variable.
+
+    Returns:
+    - (str): The backend that calls will now use.
+    """
+    global _default
+    backend = _resolve(name if name is not None else os.environ.get(BACKEND_ENV))
+    _default = name
+    return backend
+
+
+def get_backend() -> str:
+    """The backend used by default, with "auto" resolved."""
+    return _resolve(_default if _default is not None else os.environ.get(BACKEND_ENV))
+
+
+def _backend(name: Optional[str]) -> str:
+    """The named backend, or the default one for None."""
+    return get_backend() if name is None else _resolve(name)
+
+
+def _typed_arrays(xs, ys) -> Optional[Tuple[np.ndarray, np.ndarray, Union[int, float]]]:
+    """
+    The coordinates as int64 or float64 arrays for the compiled kernels,
+    with the key larger than all their squared distances, or None if they
+    cannot be compiled exactly.
+    """
+    if not isinstance(xs, np.ndarray):
+        kinds = {type(v) for v in xs} | {type(v) for v in ys}
+        if kinds == {float}:
+            xs, ys = np.array(xs, np.float64), np.array(ys, np.float64)
+        elif kinds == {int}:
+            try:
+                xs, ys = np.array(xs, np.int64), np.array(ys, np.int64)
+            except OverflowError:
+                return None
+        else:
+            return None
+    if xs.dtype == np.float64 and ys.dtype == np.float64:
+        return xs, ys, math.inf
+    if xs.dtype == np.int64 and ys.dtype == np.int64 and len(xs) and \
+            max(int(xs.max()) - int(xs.min()), int(ys.max()) - int(ys.min())) < INT64_SPAN:
+        return xs, ys, INT64_UNBOUNDED
+    return None
+
+
+def prepare(xs, ys, backend: Optional[str] = None) -> Tuple[Kernels, object, object, Union[int, float]]:
+    """
+    Picks the kernels that run over the given coordinates.
+
+    Parameters:
+    - xs, ys (list | np.ndarray): The coordinates, as lists of Python
+      numbers or as arrays (of Python numbers for dtype object).
+    - backend (str | None): "auto", one of BACKENDS, or None for the
+      default backend (get_backend()).
+
+    Returns:
+    - (tuple): The kernels, the coordinates in the form they take (lists
+      or typed arrays) and the key larger than every squared distance
+      between them, to start the search with.
+
+    Raises:
+    - ValueError: If the backend is unknown or not installed.
+    """
+    if _backend(backend) == 'numba':
+        typed = _typed_arrays(xs, ys)
+        if typed is not None:
+            return (_numba_kernels(), *typed)
+    if isinstance(xs, np.ndarray):
+        xs, ys = xs.tolist(), ys.tolist()
+    return PYTHON_KERNELS, xs, ys, math.inf
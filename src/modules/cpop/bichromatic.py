@@ -0,0 +1,100 @@
+"""
+bichromatic.py
+
+This module answers closest pair questions between groups of points, such
+as "which red point is closest to any blue point", and builds the matrix of
+minimum distances between every pair of colors.
+
+Both are answered with the labelled KDTree of kdtree.py, which keeps a
+bounding box per node and color. The closest pair between colors a and b
+walks pairs of nodes down the tree together, skipping every pair whose
+color-a and color-b boxes are farther apart than the best distance bound
+found so far. The matrix builds a single tree over all points, with the
+color as label, and runs one such walk per pair of colors instead of
+building a tree per pair. Unlike strip-based divide and conquer, the walk
+stays fast when the two colors are far apart or each color is densely
+clustered.
+
+Key functions:
+- bichromatic_closest_pair(points, key, first, second): the closest pair
+  with one point of each group.
+- color_distance_matrix(points, key): minimum distances between all groups.
+"""
+
+from typing import Callable, Hashable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .algorithms import ClosestPair, _as_point_array
+from .geometry import Point, PointArray
+from .groups import _group_codes
+from .kdtree import KDTree
+
+
+def bichromatic_closest_pair(points: Union[List[Point], PointArray],
+                             key: Union[Callable[[Point], Hashable], Sequence[Hashable]],
+                             first: Hashable, second: Hashable) -> Optional[ClosestPair]:
+    """
+    Finds the closest pair made of a point of group `first` and a point of
+    group `second`.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - key (Callable | Sequence): Either a function mapping a point to its
+      group (e.g. lambda p: p.color), or a sequence with the group of every point.
+    - first, second (Hashable): The two groups. If they are equal, the
+      closest pair within that group is returned.
+
+    Returns:
+    - (ClosestPair | None): The closest pair (indices refer to the input),
+      or None if either group has no points.
+    """
+    array = _as_point_array(points)
+    codes, group = _group_codes(points, key)
+    if first not in codes or second not in codes:
+        return None
+
+    a, b = codes[first], codes[second]
+    subset = np.flatnonzero((group == a) | (group == b))
+    x, y = array.x[subset], array.y[subset]
+    labels = (group[subset] == b).astype(np.int64) if a != b else np.zeros(len(subset), dtype=np.int64)
+
+    tree = KDTree(x, y, labels, 2)
+    d, i, j = tree.closest_pair(0, 1 if a != b else 0)
+    if i < 0:
+        return None
+    i, j = sorted((int(subset[i]), int(subset[j])))
+    return ClosestPair(d, i, j, points[i], points[j], 'kdtree')
+
+
+def color_distance_matrix(points: Union[List[Point], PointArray],
+                          key: Union[Callable[[Point], Hashable], Sequence[Hashable]]
+                          ) -> Tuple[List[Hashable], np.ndarray]:
+    """
+    Computes the minimum distance between every pair of groups from one
+    shared tree.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - key (Callable | Sequence): Either a function mapping a point to its
+      group (e.g. lambda p: p.color), or a sequence with the group of every point.
+
+    Returns:
+    - (Tuple[List[Hashable], np.ndarray]): The groups in order of first
+      appearance, and the symmetric matrix whose entry [a, b] is the
+      smallest distance between a point of group a and a point of group b.
+      The diagonal holds the closest pair distance within each group (inf
+      for a group of one point).
+    """
+    array = _as_point_array(points)
+    codes, group = _group_codes(points, key)
+    n_groups = len(codes)
+    matrix = np.full((n_groups, n_groups), np.inf)
+    if n_groups == 0:
+        return [], matrix
+
+    tree = KDTree(array.x, array.y, group, n_groups)
+    for a in range(n_groups):
+        for b in range(a, n_groups):
+            matrix[a, b] = matrix[b, a] = tree.closest_pair(a, b)[0]
+    return list(codes), matrix
@@ -0,0 +1,302 @@
+"""
+cache.py
+
+This module caches closest pair results by the content of their input, so a
+pipeline that submits the same point set again gets the earlier answer
+instead of a new run.
+
+A result is keyed by a hash of the coordinate buffers (blake2b over the raw
+x and y arrays, with their dtype), together with the engine function and its
+other arguments. Order-insensitive keys instead sum a 128-bit hash of every
+point, so any permutation of the same points finds the same entry; they
+suit results that do not depend on the order, such as distances, but not
+the indices of a ClosestPair.
+
+Entries live in an in-memory LRU bounded by a number of entries and/or by
+their pickled size, and, with a directory, also on disk, where they
+survive the process and are found again once evicted from memory.
+
+Key classes:
+- ResultCache(max_entries, max_bytes, directory, order_insensitive): the
+  cache, used as a decorator (@cache) or wrapper (cache.wrap(engine)), with
+  hit and miss counters in stats().
+
+Key functions:
+- content_key(points, order_insensitive): the hash of a point set.
+- closest_pair_by_group_cached(points, key, cache): closest_pair_by_group()
+  that only recomputes the groups whose points changed since they were cached.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .algorithms import ClosestPair, _as_point_array
+from .duplicates import _MIX, _MIX_X, _MIX_Y, _coordinate_bits
+from .geometry import Point, PointArray
+from .groups import _closest_pair_per_group, _group_codes
+
+_MISSING = object()
+
+# A second pair of mixing constants (from murmur3's finalizer), for the
+# other half of the order-insensitive 128-bit point hash.
+_MIX_X2 = np.uint64(0xFF51AFD7ED558CCD)
+_MIX_Y2 = np.uint64(0xC4CEB9FE1A85EC53)
+
+
+def _point_hashes(x: np.ndarray, y: np.ndarray, mix_x: np.uint64, mix_y: np.uint64) -> np.ndarray:
+    """A 64-bit hash of every point, as in duplicates.py."""
+    bx, by = _coordinate_bits(x, y)
+    h = bx * mix_x ^ by * mix_y
+    h ^= h >> np.uint64(31)
+    h *= _MIX
+    h ^= h >> np.uint64(29)
+    return h
+
+
+def content_key(points: Union[List[Point], PointArray], order_insensitive: bool = False) -> str:
+    """
+    Hashes the coordinates of the points.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - order_insensitive (bool): Give every permutation of the points the same key.
+
+    Returns:
+    - (str): A hex digest that changes with any coordinate (-0.0 and 0.0 are
+      the same coordinate) or with the coordinate type.
+    """
+    array = _as_point_array(points)
+    x, y = array.x, array.y
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{x.dtype.str}:{len(x)}:{int(order_insensitive)}".encode())
+    if x.dtype == object:
+        # Python numbers beyond int64/float64 have no fixed-width bits; every
+        # point is hashed by its repr instead.
+        hashes = [hashlib.blake2b(repr(point).encode(), digest_size=16).digest()
+                  for point in zip(x.tolist(), y.tolist())]
+        if order_insensitive:
+            total = sum(int.from_bytes(h, 'little') for h in hashes) % (1 << 128)
+            digest.update(total.to_bytes(16, 'little'))
+        else:
+            for h in hashes:
+                digest.update(h)
+    elif order_insensitive:
+        # Sums of the point hashes do not depend on the order (mod 2^64).
+        for mix_x, mix_y in ((_MIX_X, _MIX_Y), (_MIX_X2, _MIX_Y2)):
+            digest.update(np.add.reduce(_point_hashes(x, y, mix_x, mix_y), dtype=np.uint64).tobytes())
+    else:
+        bx, by = _coordinate_bits(x, y)
+        digest.update(bx.data)
+        digest.update(by.data)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    A content-addressed cache of closest pair results with LRU eviction and
+    optional disk persistence.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 1024, max_bytes: Optional[int] = None,
+                 directory: Optional[str] = None, order_insensitive: bool = False):
+        """
+        Initialize a ResultCache instance.
+
+        Parameters:
+        - max_entries (int | None): Most entries kept in memory (None: no limit).
+        - max_bytes (int | None): Most pickled bytes kept in memory (None: no limit).
+        - directory (str | None): Also store every entry as a file in this
+          directory (created if needed), and look there on memory misses.
+        - order_insensitive (bool): Key by the set of points instead of
+          their order (only for order-independent results, see content_key).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.order_insensitive = order_insensitive
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, points: Union[List[Point], PointArray], *parts: Any) -> str:
+        """
+        The cache key of the points together with anything else the result
+        depends on (the engine, its options), which must have a stable repr().
+        """
+        return hashlib.blake2b(f"{content_key(points, self.order_insensitive)}:{parts!r}".encode(),
+                               digest_size=16).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Looks a key up in memory, then on disk. Counts a hit or a miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        if self.directory is not None:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                value = pickle.loads(data)
+                self._remember(key, value, len(data))
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+        self.misses += 1
+        return default
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores a value, evicting the least recently used entries as needed."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.directory is not None:
+            # Written under a temporary name first, so readers never see half a file.
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        self._remember(key, value, len(data))
+
+    def wrap(self, engine: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Caches an engine taking the points as first argument, such as
+        closest_pair_distance. The other arguments are part of the key.
+        A cached ClosestPair holds the point objects of the call that
+        computed it (copies of them when read from disk).
+        """
+        name = f"{engine.__module__}.{engine.__qualname__}"
+
+        @wraps(engine)
+        def cached(points, *args, **kwargs):
+            key = self.key(points, name, args, sorted(kwargs.items()))
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                value = engine(points, *args, **kwargs)
+                self.put(key, value)
+            return value
+
+        cached.cache = self
+        return cached
+
+    __call__ = wrap
+
+    def stats(self) -> dict:
+        """Hit and miss counters and the memory held."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
+
+    def clear(self, disk: bool = False) -> None:
+        """Empties the memory (and, with disk=True, the directory) and resets the counters."""
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.directory, name))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _remember(self, key: str, value: Any, size: int) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._entries and ((self.max_entries is not None and len(self._entries) > self.max_entries)
+                                 or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self.evictions += 1
+
+
+def closest_pair_by_group_cached(points: Union[List[Point], PointArray],
+                                 key: Union[Callable[[Point], Hashable], Sequence[Hashable]],
+                                 cache: ResultCache) -> Dict[Hashable, Optional[ClosestPair]]:
+    """
+    closest_pair_by_group() with every group cached on its own: only the
+    groups whose points changed since they were cached are recomputed, all
+    of them in one per-group pass.
+
+    Entries hold the pair as positions within the group, so they are keyed
+    by the group's points in input order even if the cache is order-insensitive.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - key (Callable | Sequence): The group of every point, as for closest_pair_by_group().
+    - cache (ResultCache): The cache.
+
+    Returns:
+    - (Dict[Hashable, ClosestPair | None]): As closest_pair_by_group().
+    """
+    array = _as_point_array(points)
+    codes, group = _group_codes(points, key)
+    if not codes:
+        return {}
+
+    # The members of every group, in input order.
+    order = np.argsort(group, kind='stable')
+    sizes = np.bincount(group, minlength=len(codes))
+    members = np.split(order, np.cumsum(sizes)[:-1])
+
+    # (distance, position of i, position of j) within the group, or None.
+    found = {}
+    keys = {}
+    for code, index in enumerate(members):
+        subset = PointArray(array.x[index], array.y[index])
+        digest = hashlib.blake2b(f"{content_key(subset)}:closest_pair_by_group".encode(),
+                                 digest_size=16).hexdigest()
+        keys[code] = digest
+        value = cache.get(digest, _MISSING)
+        if value is not _MISSING:
+            found[code] = value
+
+    missing = [code for code in range(len(codes)) if code not in found]
+    if missing:
+        index = np.concatenate([members[code] for code in missing])
+        local = np.repeat(np.arange(len(missing)), sizes[missing])
+        best_d, best_a, best_b = _closest_pair_per_group(array.x[index], array.y[index], local, len(missing))
+        # Positions of the pair within its group's members.
+        starts = np.cumsum(sizes[missing]) - sizes[missing]
+        for k, code in enumerate(missing):
+            d = float(best_d[k])
+            value = None if d == float('inf') else (d, int(best_a[k] - starts[k]), int(best_b[k] - starts[k]))
+            cache.put(keys[code], value)
+            found[code] = value
+
+    result = {}
+    for label, code in codes.items():
+        value = found[code]
+        if value is None:
+            result[label] = None
+            continue
+        d, a, b = value
+        i, j = sorted((int(members[code][a]), int(members[code][b])))
+        result[label] = ClosestPair(d, i, j, points[i], points[j], 'dc')
+    return result
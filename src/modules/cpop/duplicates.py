@@ -0,0 +1,143 @@
+"""
+duplicates.py
+
+This module finds coincident points (exact duplicate coordinates) in
+expected O(n) time with a vectorized hashing pass, without sorting.
+
+The bit patterns of both coordinates are hashed into a table of about 4n
+buckets. Every round, each bucket elects one of its remaining points as
+representative; the points of the bucket with exactly the representative's
+coordinates join its group and leave, and the rest (hash collisions) go to
+the next round. Buckets hold very few points, so a handful of rounds of
+array operations settle every point.
+
+closest_pair_distance(points, check_duplicates=True) in algorithms.py runs
+this pass first and returns a zero distance without running any engine when
+two points coincide.
+
+Key functions:
+- duplicate_groups(points): the groups of coincident points.
+- unique_indices(points): the first point of every distinct location, to
+  drop duplicates before heavier processing.
+"""
+
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .geometry import Point, PointArray
+
+# Mixing constants of the coordinate hash (odd 64-bit multipliers, from splitmix64).
+_MIX_X = np.uint64(0x9E3779B97F4A7C15)
+_MIX_Y = np.uint64(0xBF58476D1CE4E5B9)
+_MIX = np.uint64(0x94D049BB133111EB)
+
+
+def _coordinate_bits(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """The coordinates as uint64 bit patterns, equal exactly when the coordinates are."""
+    if x.dtype.kind == 'f':
+        # -0.0 == 0.0 but their bits differ; adding 0.0 turns -0.0 into 0.0.
+        x = x + 0.0
+        y = y + 0.0
+    return x.view(np.uint64), y.view(np.uint64)
+
+
+def _coordinate_ids(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Labels every point with the smallest index of a point at the same
+    coordinates (its own index if it has no duplicate).
+
+    Parameters:
+    - x, y (np.ndarray): The coordinates (int64, float64, or object arrays
+      of Python numbers).
+
+    Returns:
+    - (np.ndarray): The label of every point.
+    """
+    n = len(x)
+    if x.dtype == object or y.dtype == object:
+        # Python numbers have no fixed-width bits to hash; a dict compares
+        # them exactly (equal numbers are equal keys, like 0.0 and -0.0).
+        first = {}
+        return np.array([first.setdefault(point, i) for i, point in enumerate(zip(x.tolist(), y.tolist()))],
+                        dtype=np.intp)
+    bx, by = _coordinate_bits(x, y)
+    bits = max(1, (4 * n - 1).bit_length())
+    h = bx * _MIX_X ^ by * _MIX_Y
+    h ^= h >> np.uint64(31)
+    h *= _MIX
+    bucket = (h >> np.uint64(64 - bits)).astype(np.intp)
+
+    representative = np.empty(1 << bits, dtype=np.intp)
+    owner = np.empty(n, dtype=np.intp)
+    alive = np.arange(n)
+    while len(alive):
+        # Any point of the bucket can win the election; every bucket with a
+        # live point gets one, so every round settles at least that point.
+        representative[bucket] = alive
+        rep = representative[bucket]
+        same = (bx[alive] == bx[rep]) & (by[alive] == by[rep])
+        owner[alive[same]] = rep[same]
+        alive, bucket = alive[~same], bucket[~same]
+
+    # Relabel every group by its smallest index.
+    first = np.full(n, n, dtype=np.intp)
+    np.minimum.at(first, owner, np.arange(n))
+    return first[owner]
+
+
+def _first_duplicate(x: np.ndarray, y: np.ndarray) -> Optional[Tuple[int, int]]:
+    """The indices (i < j) of two coincident points, or None if all points are distinct."""
+    ids = _coordinate_ids(x, y)
+    repeated = np.flatnonzero(ids != np.arange(len(ids)))
+    if not len(repeated):
+        return None
+    j = int(repeated[0])
+    return int(ids[j]), j
+
+
+def _as_arrays(points: Union[List[Point], PointArray]) -> Tuple[np.ndarray, np.ndarray]:
+    array = points if isinstance(points, PointArray) else PointArray.from_points(points)
+    return array.x, array.y
+
+
+def duplicate_groups(points: Union[List[Point], PointArray]) -> List[np.ndarray]:
+    """
+    Finds the groups of coincident points.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+
+    Returns:
+    - (List[np.ndarray]): The indices of every group of at least two points
+      with equal coordinates, in increasing order, with the groups ordered
+      by their first index.
+    """
+    x, y = _as_arrays(points)
+    if len(x) < 2:
+        return []
+    ids = _coordinate_ids(x, y)
+    size = np.bincount(ids, minlength=len(ids))
+    members = np.flatnonzero(size[ids] >= 2)
+    if not len(members):
+        return []
+    members = members[np.argsort(ids[members], kind='stable')]
+    starts = np.flatnonzero(np.diff(ids[members])) + 1
+    return np.split(members, starts)
+
+
+def unique_indices(points: Union[List[Point], PointArray]) -> np.ndarray:
+    """
+    Finds the first point of every distinct location.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+
+    Returns:
+    - (np.ndarray): The indices, in increasing order, of the points that
+      have no duplicate at a smaller index. Indexing a PointArray with them
+      drops every duplicate.
+    """
+    x, y = _as_arrays(points)
+    ids = _coordinate_ids(x, y)
+    return np.flatnonzero(ids == np.arange(len(ids)))
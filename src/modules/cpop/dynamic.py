@@ -0,0 +1,303 @@
+"""
+dynamic.py
+
+This module maintains the closest pair of a set of points under both
+insertions and deletions.
+
+Every point keeps a neighbour candidate: its nearest neighbour among the
+points present when the candidate was computed. All candidates sit in a
+heap keyed by distance. For any two present points a and b, the one whose
+candidate was computed last saw the other, so its candidate distance is at
+most d(a, b); the top of the heap is therefore the closest pair. Inserting a
+point computes its own candidate only. Deleting a point recomputes the
+candidates of the points that had it as their neighbour. Stale heap entries
+are skipped lazily, and the heap is rebuilt from the live candidates once
+stale entries outnumber them, so it stays within twice the number of points
+even when points are deleted without current_closest() being called.
+
+Nearest neighbour queries run on a dynamic 2-d tree. Insertions keep it
+balanced by rebuilding the subtree at the lowest unbalanced node along the
+insertion path (scapegoat rebalancing), and the whole tree whenever it has
+doubled in size. Deletions only mark nodes dead until half of the tree is
+dead, when it is rebuilt. Both updates take amortized O(log^2 n) time for
+the rebuilds, plus their nearest-neighbour queries.
+
+An insertion runs one query. A deletion runs one query for each of its
+dependents, the points whose candidate is the deleted point, and their
+number is not bounded: candidates are not refreshed when closer points
+arrive later, so a point is the candidate of every later point that lands
+nearer to it than to the points before, such as points approaching it at
+distances 1, 1/3, 1/9, ... A single deletion therefore runs up to n - 1
+queries, and a sequence of m deletions up to O(m n) in the worst case.
+Every point has a single candidate, so the dependents of all points add
+up to at most n, and deleting a point chosen at random runs at most one
+query in expectation.
+
+Candidate distances are float square roots, so integer points are not
+compared by exact squared distances as in algorithms.py.
+
+Key classes:
+- DynamicClosestPair: insert(point), delete(handle) and current_closest().
+"""
+
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .algorithms import ClosestPair
+from .geometry import Point
+
+# Scapegoat balance factor: no child subtree may hold more than this share
+# of its parent's nodes, which bounds the depth by log(n) / log(1 / ALPHA).
+ALPHA = 0.7
+
+
+class _Node:
+    """A 2-d tree node. Deleted points stay in the tree as routing nodes."""
+    __slots__ = ('handle', 'x', 'y', 'axis', 'left', 'right', 'size', 'alive')
+
+    def __init__(self, handle: int, x: float, y: float, axis: int):
+        self.handle = handle
+        self.x = x
+        self.y = y
+        self.axis = axis
+        self.left = None
+        self.right = None
+        self.size = 1
+        self.alive = True
+
+
+class _KDTree:
+    """A dynamic 2-d tree over (handle, x, y) entries."""
+
+    def __init__(self):
+        self.root = None
+        self.nodes: Dict[int, _Node] = {}
+        self.dead = 0
+        self.built_size = 0
+
+    def _build(self, entries: List[Tuple[int, float, float]]) -> Optional[_Node]:
+        """
+        Builds a balanced subtree by splitting at the median of the axis with
+        the larger spread. Always alternating axes would let splits across a
+        thin direction (say, points along a line) prune nothing.
+        """
+        if not entries:
+            return None
+        xs = [e[1] for e in entries]
+        ys = [e[2] for e in entries]
+        axis = 0 if max(xs) - min(xs) >= max(ys) - min(ys) else 1
+        entries.sort(key=lambda e: e[1 + axis])
+        mid = len(entries) // 2
+        handle, x, y = entries[mid]
+        node = _Node(handle, x, y, axis)
+        self.nodes[handle] = node
+        node.left = self._build(entries[:mid])
+        node.right = self._build(entries[mid + 1:])
+        node.size = len(entries)
+        return node
+
+    def _collect(self, node: Optional[_Node], out: List[Tuple[int, float, float]]) -> None:
+        """Appends the live entries of a subtree to out, dropping dead ones."""
+        if node is None:
+            return
+        if node.alive:
+            out.append((node.handle, node.x, node.y))
+        else:
+            del self.nodes[node.handle]
+            self.dead -= 1
+        self._collect(node.left, out)
+        self._collect(node.right, out)
+
+    def _rebuild_all(self) -> None:
+        """Rebuilds the whole tree from its live entries."""
+        entries = []
+        self._collect(self.root, entries)
+        self.root = self._build(entries)
+        self.built_size = len(entries)
+
+    def insert(self, handle: int, x: float, y: float) -> None:
+        """Adds an entry, rebuilding the subtree of a scapegoat if needed."""
+        if self.root is None:
+            self.root = self.nodes[handle] = _Node(handle, x, y, 0)
+            self.built_size = 1
+            return
+
+        path = []
+        node = self.root
+        while node is not None:
+            path.append(node)
+            node.size += 1
+            go_left = (x < node.x) if node.axis == 0 else (y < node.y)
+            child = node.left if go_left else node.right
+            if child is None:
+                leaf = self.nodes[handle] = _Node(handle, x, y, 1 - node.axis)
+                if go_left:
+                    node.left = leaf
+                else:
+                    node.right = leaf
+            node = child
+
+        if len(self.nodes) > 2 * self.built_size:
+            # The top splits were chosen for a tree half this size; redo them.
+            self._rebuild_all()
+            return
+        if len(path) <= math.log(self.root.size, 1 / ALPHA) + 1:
+            return
+        # Too deep: rebuild the subtree of the lowest ancestor whose child is
+        # too heavy (the scapegoat). Such an ancestor always exists here.
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            heaviest = max(node.left.size if node.left else 0, node.right.size if node.right else 0)
+            if heaviest > ALPHA * node.size:
+                entries = []
+                self._collect(node, entries)
+                rebuilt = self._build(entries)
+                if depth == 0:
+                    self.root = rebuilt
+                else:
+                    parent = path[depth - 1]
+                    if parent.left is node:
+                        parent.left = rebuilt
+                    else:
+                        parent.right = rebuilt
+                    removed = node.size - len(entries)
+                    for ancestor in path[:depth]:
+                        ancestor.size -= removed
+                return
+
+    def delete(self, handle: int) -> None:
+        """Marks an entry dead; rebuilds the tree once half of it is dead."""
+        self.nodes[handle].alive = False
+        self.dead += 1
+        if 2 * self.dead > len(self.nodes):
+            self._rebuild_all()
+
+    def nearest(self, x: float, y: float, exclude: int) -> Tuple[float, int]:
+        """
+        Finds the live entry nearest to (x, y), other than `exclude`.
+
+        Returns:
+        - (Tuple[float, int]): The distance and handle (inf and -1 if none).
+        """
+        best_d, best = float('inf'), -1
+        # Every stacked subtree carries a lower bound on its distance to
+        # (x, y), checked when it is popped, once nearer subtrees are done.
+        stack = [(self.root, 0.0)] if self.root is not None else []
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_d:
+                continue
+            if node.alive and node.handle != exclude:
+                d = math.sqrt((node.x - x)**2 + (node.y - y)**2)
+                if d < best_d:
+                    best_d, best = d, node.handle
+            diff = (x - node.x) if node.axis == 0 else (y - node.y)
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            if far is not None:
+                stack.append((far, max(bound, abs(diff))))
+            if near is not None:
+                stack.append((near, bound))
+        return best_d, best
+
+
+class DynamicClosestPair:
+    """
+    The closest pair of a set of points that supports insertion and deletion.
+    Points are referred to by the integer handle returned by insert().
+    """
+
+    def __init__(self, points: Iterable[Point] = ()):
+        """
+        Initialize a DynamicClosestPair instance.
+
+        Parameters:
+        - points (Iterable[Point]): Initial points, inserted in order.
+        """
+        self._points: Dict[int, Point] = {}
+        self._tree = _KDTree()
+        self._next_handle = 0
+        # handle -> (distance, neighbour) candidate, and its reverse index
+        self._candidate: Dict[int, Tuple[float, int]] = {}
+        self._dependents: Dict[int, Set[int]] = {}
+        self._heap: List[Tuple[float, int, int]] = []
+        for p in points:
+            self.insert(p)
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, handle: int):
+        return handle in self._points
+
+    def _update_candidate(self, handle: int) -> None:
+        """Recomputes the neighbour candidate of a point."""
+        p = self._points[handle]
+        d, other = self._tree.nearest(p.x, p.y, handle)
+        if other < 0:
+            return
+        self._candidate[handle] = (d, other)
+        self._dependents.setdefault(other, set()).add(handle)
+        heapq.heappush(self._heap, (d, handle, other))
+
+    def insert(self, point: Point) -> int:
+        """
+        Adds a point.
+
+        Parameters:
+        - point (Point): The point to add.
+
+        Returns:
+        - (int): The handle of the point, used by delete() and in results.
+        """
+        handle = self._next_handle
+        self._next_handle += 1
+        self._points[handle] = point
+        self._tree.insert(handle, point.x, point.y)
+        self._update_candidate(handle)
+        return handle
+
+    def delete(self, handle: int) -> None:
+        """
+        Removes a point. Every point whose candidate it was is queried
+        again, so this costs one nearest-neighbour query per such point
+        (see the module docstring).
+
+        Parameters:
+        - handle (int): The handle returned by insert().
+        """
+        if handle not in self._points:
+            raise KeyError(handle)
+        del self._points[handle]
+        self._tree.delete(handle)
+
+        candidate = self._candidate.pop(handle, None)
+        if candidate is not None:
+            self._dependents[candidate[1]].discard(handle)
+        for dependent in self._dependents.pop(handle, ()):
+            del self._candidate[dependent]
+            self._update_candidate(dependent)
+        if len(self._heap) > 2 * len(self._candidate):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rebuilds the heap from the live candidates, dropping stale entries."""
+        self._heap = [(d, handle, other) for handle, (d, other) in self._candidate.items()]
+        heapq.heapify(self._heap)
+
+    def current_closest(self) -> Optional[ClosestPair]:
+        """
+        Returns the current closest pair.
+
+        Returns:
+        - (ClosestPair | None): The closest pair, with handles as indices, or
+          None while there are fewer than two points.
+        """
+        heap = self._heap
+        while heap and self._candidate.get(heap[0][1]) != (heap[0][0], heap[0][2]):
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        d, a, b = heap[0]
+        i, j = min(a, b), max(a, b)
+        return ClosestPair(d, i, j, self._points[i], self._points[j], 'dynamic')
@@ -1,12 +1,17 @@
 """
 geometry.py
 
-These modules define the geometric data structures (Point and ColoredPoint)
-used in the closest pair of points problem. It keeps the focus on data
-representations and basic operations (like distance computation).
+These modules define the geometric data structures (Point, ColoredPoint and
+the columnar PointArray) used in the closest pair of points problem. It keeps
+the focus on data representations and basic operations (like distance
+computation).
 """
 
 import math
+from numbers import Integral
+from typing import Iterable, List, Tuple
+
+import numpy as np
 
 class Point:
     """
@@ -64,3 +69,121 @@ def dist(a: Point, b: Point) -> float:
     - (float) The Euclidean distance between a and b.
     """
     return math.sqrt((a.x - b.x)**2 + (a.y - b.y)**2)
+
+
+class PointArray:
+    """
+    A columnar collection of 2D points backed by contiguous NumPy arrays.
+
+    Instead of one Python object per point, the coordinates live in two
+    parallel arrays `x` and `y`. Integer input is stored as int64 and
+    everything else as float64, so large datasets can be sorted, partitioned
+    and measured with vectorized array operations.
+
+    Coordinates that neither dtype holds exactly (Python ints beyond int64,
+    or ints beyond 2^53 mixed with floats) are kept as the Python numbers
+    themselves, in object arrays, so that the engines still return the
+    same answer as brute_force() on the Point objects.
+    """
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x, y):
+        """
+        Initialize a PointArray instance.
+
+        Parameters:
+        - x (array-like): The x-coordinates of the points.
+        - y (array-like): The y-coordinates of the points.
+        """
+        x = _coordinate_column(x)
+        y = _coordinate_column(y)
+        if x.ndim != 1 or x.shape != y.shape:
+            raise ValueError("x and y must be one-dimensional arrays of equal length")
+        x, y = _common_columns(x, y)
+        self.x = np.ascontiguousarray(x)
+        self.y = np.ascontiguousarray(y)
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point]) -> 'PointArray':
+        """
+        Build a PointArray from Point (or ColoredPoint) objects.
+
+        Parameters:
+        - points (Iterable[Point]): The points to convert.
+
+        Returns:
+        - (PointArray): The same coordinates in columnar form.
+        """
+        points = list(points)
+        return cls([p.x for p in points], [p.y for p in points])
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The dtype shared by the x and y arrays (int64, float64 or object)."""
+        return self.x.dtype
+
+    def to_points(self) -> List[Point]:
+        """Converts the array back into a list of Point objects."""
+        return [Point(x, y) for x, y in zip(self.x.tolist(), self.y.tolist())]
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return Point(self.x.item(index), self.y.item(index))
+        return PointArray(self.x[index], self.y[index])
+
+    def __repr__(self):
+        return f"PointArray(n={len(self)}, dtype={self.dtype})"
+
+
+# Integers up to this magnitude are exact in float64.
+_FLOAT_EXACT = 2**53
+
+
+def _coordinate_column(values) -> np.ndarray:
+    """
+    Converts one coordinate column to int64 or float64 if that holds every
+    value exactly, and to an object array of the values otherwise.
+    """
+    column = np.asarray(values)
+    kind = column.dtype.kind
+    if kind in 'ib':
+        return column.astype(np.int64, copy=False)
+    if kind == 'u':
+        if len(column) and column.max() > np.iinfo(np.int64).max:
+            return column.astype(object)
+        return column.astype(np.int64)
+    if kind == 'f':
+        # A list mixing floats with large ints converts to float64 with
+        # rounding; only then are the original values looked at again.
+        if isinstance(values, np.ndarray) or not len(column) or not np.abs(column).max() >= _FLOAT_EXACT:
+            return column.astype(np.float64, copy=False)
+        column = np.asarray(values, dtype=object)
+    elif kind != 'O':
+        return column.astype(np.float64)
+    if column.ndim != 1:
+        return column
+
+    items = column.tolist()
+    integers = [v for v in items if isinstance(v, Integral)]
+    if len(integers) == len(items):
+        if all(-2**63 <= v < 2**63 for v in integers):
+            return column.astype(np.int64)
+        return np.array([int(v) for v in items], dtype=object)
+    if all(-_FLOAT_EXACT <= v <= _FLOAT_EXACT for v in integers):
+        return column.astype(np.float64)
+    return np.array([v if isinstance(v, float) else int(v) if isinstance(v, Integral) else float(v)
+                     for v in items], dtype=object)
+
+
+def _common_columns(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Gives both columns the same dtype, falling back to object where float64 would round."""
+    if x.dtype == y.dtype:
+        return x, y
+    if x.dtype != object and y.dtype != object:
+        integers = x if x.dtype.kind == 'i' else y
+        if not len(integers) or max(-int(integers.min()), int(integers.max())) <= _FLOAT_EXACT:
+            return x.astype(np.float64), y.astype(np.float64)
+    return x.astype(object), y.astype(object)
@@ -0,0 +1,180 @@
+"""
+groups.py
+
+This module computes the closest pair of every group of points (for example
+every color of ColoredPoint) in a single pass.
+
+Instead of grouping the points and running closest_pair_distance once per
+group, the points are sorted once by (group, x), so every group is a
+contiguous run. The vectorized divide and conquer then processes the same
+recursion level of all groups with the same array operations, keeping one
+current minimum per group. Thousands of small groups therefore cost about
+as much as one large group of the same total size.
+
+Key functions:
+- closest_pair_by_group(points, key): maps every group to its closest pair.
+"""
+
+import math
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .algorithms import LEAF_SIZE, ClosestPair, _as_point_array, _exact_coordinates, _pair_keys, _sort_strip
+from .geometry import Point, PointArray
+
+
+def _closest_pair_per_group(x: np.ndarray, y: np.ndarray, group: np.ndarray,
+                            n_groups: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized divide and conquer run on all groups at once.
+
+    Parameters:
+    - x, y (np.ndarray): The coordinates.
+    - group (np.ndarray): The group code (0 .. n_groups - 1) of every point.
+    - n_groups (int): The number of groups.
+
+    Returns:
+    - (Tuple[np.ndarray, np.ndarray, np.ndarray]): Per group, the smallest
+      distance (inf for groups of one point) and the indices of its pair.
+    """
+    n = len(x)
+    order = np.lexsort((x, group))
+    xs, ys, squared = _exact_coordinates(x[order], y[order])
+    g = group[order]
+
+    group_size = np.bincount(g, minlength=n_groups)
+    group_start = np.cumsum(group_size) - group_size
+    start = group_start[g]
+    end = start + group_size[g]
+    position = np.arange(n)
+    rank = position - start
+
+    # Integer coordinates keep squared distances: int64 ones use the largest
+    # int64 as "no pair yet", Python int ones an object array.
+    if not squared:
+        best_d = np.full(n_groups, np.inf)
+    elif xs.dtype == object:
+        best_d = np.full(n_groups, np.inf, dtype=object)
+    else:
+        best_d = np.full(n_groups, np.iinfo(np.int64).max)
+    best_a = np.zeros(n_groups, dtype=np.int64)
+    best_b = np.zeros(n_groups, dtype=np.int64)
+
+    def offer(a: np.ndarray, b: np.ndarray) -> None:
+        """Keeps, per group, the closest of the pairs (a, b) if it improves."""
+        d = _pair_keys(xs, ys, a, b, squared)
+        ga = g[a]
+        new_d = best_d.copy()
+        np.minimum.at(new_d, ga, d)
+        hit = (new_d[ga] < best_d[ga]) & (d == new_d[ga])
+        winners, first = np.unique(ga[hit], return_index=True)
+        chosen = np.flatnonzero(hit)[first]
+        best_d[winners] = d[chosen]
+        best_a[winners] = a[chosen]
+        best_b[winners] = b[chosen]
+
+    def within(delta: np.ndarray, bound: np.ndarray) -> np.ndarray:
+        """Whether coordinate differences are below the groups' best distances."""
+        return delta * delta < bound if squared else np.abs(delta) < bound
+
+    # Conquer the leaves: compare every pair inside a block of LEAF_SIZE points.
+    for step in range(1, LEAF_SIZE):
+        a = position[(rank % LEAF_SIZE < LEAF_SIZE - step) & (position + step < end)]
+        if len(a):
+            offer(a, a + step)
+
+    # Combine: merge neighbouring subsets of `size` points into subsets of
+    # 2 * size, in every group that is still larger than `size`.
+    y_rank = None
+    size = LEAF_SIZE
+    largest = int(group_size.max())
+    while size < largest:
+        subset = start + rank // (2 * size) * (2 * size)
+        mid = subset + size
+        has_right = mid < end
+        mid_x = xs[np.minimum(mid, n - 1)]
+        strip = np.flatnonzero(has_right & within(xs - mid_x, best_d[g]))
+
+        if len(strip) > 1:
+            strip, y_rank = _sort_strip(strip, subset, ys, y_rank)
+            strip_subset = subset[strip]
+            strip_y = ys[strip]
+            strip_d = best_d[g[strip]]
+            strip_left = strip < mid[strip]
+            m = len(strip)
+            for step in range(1, m):
+                live = ((strip_subset[:m - step] == strip_subset[step:]) &
+                        within(strip_y[step:] - strip_y[:m - step], strip_d[:m - step]))
+                if not live.any():
+                    # Pairs further apart in the strip are even further apart in y.
+                    break
+                # Pairs from the same half were already seen one level down.
+                live &= strip_left[:m - step] != strip_left[step:]
+                if live.any():
+                    offer(strip[:m - step][live], strip[step:][live])
+                    strip_d = best_d[g[strip]]
+        size *= 2
+
+    if squared:
+        best_d = np.array([math.sqrt(d) if size > 1 else np.inf
+                           for d, size in zip(best_d.tolist(), group_size.tolist())])
+    return best_d, order[best_a], order[best_b]
+
+
+def _group_codes(points: Union[List[Point], PointArray],
+                 key: Union[Callable[[Point], Hashable], Sequence[Hashable]]
+                 ) -> Tuple[Dict[Hashable, int], np.ndarray]:
+    """
+    Numbers the groups of the points in order of first appearance.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - key (Callable | Sequence): A function mapping a point to its group,
+      or a sequence with the group of every point.
+
+    Returns:
+    - (Tuple[Dict[Hashable, int], np.ndarray]): The code of every group,
+      and the group code of every point.
+    """
+    labels = [key(p) for p in points] if callable(key) else list(key)
+    if len(labels) != len(points):
+        raise ValueError("key must give one group per point")
+    codes = {}
+    group = np.fromiter((codes.setdefault(label, len(codes)) for label in labels),
+                        dtype=np.int64, count=len(labels))
+    return codes, group
+
+
+def closest_pair_by_group(points: Union[List[Point], PointArray],
+                          key: Union[Callable[[Point], Hashable], Sequence[Hashable]]
+                          ) -> Dict[Hashable, Optional[ClosestPair]]:
+    """
+    Computes the closest pair of every group of points in one pass.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - key (Callable | Sequence): Either a function mapping a point to its
+      group (e.g. lambda p: p.color), or a sequence with the group of every
+      point (required for a PointArray).
+
+    Returns:
+    - (Dict[Hashable, ClosestPair | None]): For every group, in order of
+      first appearance, its closest pair (indices refer to the input), or
+      None if the group has a single point.
+    """
+    array = _as_point_array(points)
+    codes, group = _group_codes(points, key)
+    if not codes:
+        return {}
+
+    best_d, best_a, best_b = _closest_pair_per_group(array.x, array.y, group, len(codes))
+    result = {}
+    for label, code in codes.items():
+        d = float(best_d[code])
+        if d == float('inf'):
+            result[label] = None
+            continue
+        i, j = sorted((int(best_a[code]), int(best_b[code])))
+        result[label] = ClosestPair(d, i, j, points[i], points[j], 'dc')
+    return result
@@ -0,0 +1,150 @@
+"""
+incremental.py
+
+This module maintains the closest pair of a growing set of points, so the
+current answer is available after every insertion without rerunning
+closest_pair_distance on the whole list.
+
+The points are hashed into a grid of square cells whose side is the current
+minimum distance d. A cell can then hold at most four points, and a new
+point can only be closer than d to points in the cells around it, so an
+insertion checks a constant number of points. When an insertion finds a
+closer pair, d shrinks and the grid is rebuilt with the new cell size. For
+points arriving in random order the expected number of rebuilds after i
+points is O(1/i) per insertion, so insertions take amortized constant time.
+
+Key classes:
+- IncrementalClosestPair: insert(point), extend(points) and current().
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .algorithms import ClosestPair, closest_pair
+from .geometry import Point
+
+# extend() recomputes from scratch with the vectorized engine instead of
+# inserting one by one when it adds at least this many points at once.
+BULK_EXTEND_MIN = 1024
+
+
+class IncrementalClosestPair:
+    """
+    The closest pair of a set of points that only grows.
+    Accepts Point, ColoredPoint or any object with x and y attributes.
+    """
+
+    def __init__(self, points: Iterable[Point] = ()):
+        """
+        Initialize an IncrementalClosestPair instance.
+
+        Parameters:
+        - points (Iterable[Point]): Initial points, added with extend().
+        """
+        self._points: List[Point] = []
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        self._distance = float('inf')
+        self._pair = (-1, -1)
+        self.extend(points)
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        """The grid cell containing (x, y)."""
+        return math.floor(x / self._distance), math.floor(y / self._distance)
+
+    def _rebuild(self) -> None:
+        """Rehashes every point into cells of the current minimum distance."""
+        self._grid = {}
+        if not 0 < self._distance < float('inf'):
+            # With fewer than two points there is no cell size yet, and once
+            # two points coincide the answer can no longer change.
+            return
+        for index, p in enumerate(self._points):
+            self._grid.setdefault(self._cell(p.x, p.y), []).append(index)
+
+    def _set_pair(self, d: float, i: int, j: int) -> None:
+        """Records a new closest pair and regrids for its distance."""
+        self._distance = d
+        self._pair = (min(i, j), max(i, j))
+        self._rebuild()
+
+    def insert(self, point: Point) -> float:
+        """
+        Adds a point and updates the closest pair.
+
+        Parameters:
+        - point (Point): The point to add.
+
+        Returns:
+        - (float): The closest pair distance after the insertion.
+        """
+        index = len(self._points)
+        self._points.append(point)
+        d = self._distance
+
+        if index == 1:
+            first = self._points[0]
+            self._set_pair(math.sqrt((first.x - point.x)**2 + (first.y - point.y)**2), 0, 1)
+            return self._distance
+        if not 0 < d < float('inf'):
+            return d
+
+        # Every point closer than d lies in the cells overlapping the square
+        # of side 2d around the new point. Taking the cell bounds from x - d
+        # and x + d (rather than the neighbours of the point's own cell)
+        # keeps this exact under floating point rounding.
+        x0, y0 = self._cell(point.x - d, point.y - d)
+        x1, y1 = self._cell(point.x + d, point.y + d)
+        best = d
+        partner = -1
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for other in self._grid.get((cx, cy), ()):
+                    q = self._points[other]
+                    d_q = math.sqrt((q.x - point.x)**2 + (q.y - point.y)**2)
+                    if d_q < best:
+                        best = d_q
+                        partner = other
+
+        if partner >= 0:
+            self._set_pair(best, partner, index)
+        else:
+            self._grid.setdefault(self._cell(point.x, point.y), []).append(index)
+        return self._distance
+
+    def extend(self, points: Iterable[Point]) -> float:
+        """
+        Adds several points. Large batches are solved in one go with the
+        vectorized engine and regridded once, instead of point by point.
+
+        Parameters:
+        - points (Iterable[Point]): The points to add.
+
+        Returns:
+        - (float): The closest pair distance after the insertions.
+        """
+        points = list(points)
+        if len(points) < BULK_EXTEND_MIN:
+            for p in points:
+                self.insert(p)
+            return self._distance
+
+        self._points.extend(points)
+        pair = closest_pair(self._points)
+        self._set_pair(pair.distance, pair.i, pair.j)
+        return self._distance
+
+    def current(self) -> Optional[ClosestPair]:
+        """
+        Returns the current closest pair.
+
+        Returns:
+        - (ClosestPair | None): The closest pair, with indices in insertion
+          order, or None while there are fewer than two points.
+        """
+        if len(self._points) < 2:
+            return None
+        i, j = self._pair
+        return ClosestPair(self._distance, i, j, self._points[i], self._points[j], 'incremental')
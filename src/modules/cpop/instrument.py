@@ -0,0 +1,203 @@
+"""
+instrument.py
+
+This module collects statistics about where a closest pair run spends its
+work: how many distances it evaluated, how large the strips got, how often
+the inner strip loop stopped before its 7 points, and how the time splits
+across recursion depths.
+
+Collection is off by default. collect_stats() makes its RunStats the
+collector of the calling thread, and the engines of algorithms.py report to
+it through hooks: they look the collector up once per call, and do nothing
+more while there is none. Nothing is swapped in or out of the modules, so
+runs on other threads are neither counted nor disturbed.
+
+What is measured:
+- distance evaluations of every engine: the brute force, the base cases and
+  strips of the kernel recursion (closest_pair_recursive), and the
+  pair arrays of the vectorized engines (_pair_keys());
+- strip sizes of both divide-and-conquer engines, and the inner loop
+  windows and early breaks of the strip scan kernel (the vectorized
+  scan has no 7-point window);
+- calls, points and time per recursion depth of both divide-and-conquer
+  engines. The vectorized engine runs a depth as one level of array
+  operations: its calls are the subsets of that depth, and its leaves of
+  LEAF_SIZE points are the base cases. A level's seconds exclude its
+  sub-levels; cumulative_seconds include them.
+
+Key functions:
+- collect_stats(): a context manager yielding the RunStats of the runs
+  inside it.
+
+Key classes:
+- RunStats: the report, with to_dict(), to_json() and summary().
+"""
+
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from . import algorithms
+
+
+class LevelStats:
+    """The recursion calls at one depth."""
+    __slots__ = ('calls', 'points', 'base_cases', 'seconds', 'cumulative_seconds')
+
+    def __init__(self):
+        self.calls = 0
+        self.points = 0
+        self.base_cases = 0
+        self.seconds = 0.0
+        self.cumulative_seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RunStats:
+    """
+    The statistics collected by collect_stats().
+    """
+
+    def __init__(self):
+        self.distance_evaluations = 0
+        self.strip_sizes: Counter = Counter()   # Strip size -> number of strips.
+        self.strip_windows = 0                  # Points whose 7 successors were scanned.
+        self.early_breaks = 0                   # Scans stopped by the y distance.
+        self.levels: Dict[int, LevelStats] = {}
+        self.seconds = 0.0                      # Wall time inside collect_stats().
+        # Per open recursion call: the time spent in its sub-calls so far.
+        self._child_seconds: List[float] = []
+
+    @property
+    def strips(self) -> int:
+        return sum(self.strip_sizes.values())
+
+    def _level(self, depth: int) -> LevelStats:
+        level = self.levels.get(depth)
+        if level is None:
+            level = self.levels[depth] = LevelStats()
+        return level
+
+    def enter(self, points: int, base_case: bool) -> float:
+        """
+        Hook: a call of the kernel recursion on `points` points starts
+        one level below the calls still open.
+
+        Returns:
+        - (float): Its start time, to hand back to leave().
+        """
+        level = self._level(len(self._child_seconds))
+        level.calls += 1
+        level.points += points
+        if base_case:
+            level.base_cases += 1
+            self.distance_evaluations += points * (points - 1) // 2
+        self._child_seconds.append(0.0)
+        return time.perf_counter()
+
+    def leave(self, start: float) -> None:
+        """Hook: the innermost open call of the recursion, started at `start`, returns."""
+        elapsed = time.perf_counter() - start
+        level = self.levels[len(self._child_seconds) - 1]
+        level.cumulative_seconds += elapsed
+        level.seconds += elapsed - self._child_seconds.pop()
+        if self._child_seconds:
+            self._child_seconds[-1] += elapsed
+
+    def add_level(self, depth: int, calls: int, points: int, base_cases: int,
+                  seconds: float, cumulative_seconds: float) -> None:
+        """Hook: a whole level of the vectorized engine, timed as one."""
+        level = self._level(depth)
+        level.calls += calls
+        level.points += points
+        level.base_cases += base_cases
+        level.seconds += seconds
+        level.cumulative_seconds += cumulative_seconds
+
+    def add_strip(self, size: int, windows: int, early_breaks: int, evaluations: int,
+                  count: int = 1) -> None:
+        """Hook: `count` strips of `size` points were scanned."""
+        self.strip_sizes[size] += count
+        self.strip_windows += windows
+        self.early_breaks += early_breaks
+        self.distance_evaluations += evaluations
+
+    def to_dict(self) -> dict:
+        """The statistics as JSON-compatible data."""
+        sizes = self.strip_sizes
+        total = sum(size * count for size, count in sizes.items())
+        return {
+            'seconds': self.seconds,
+            'distance_evaluations': self.distance_evaluations,
+            'strips': {
+                'count': self.strips,
+                'points': total,
+                'mean_size': total / self.strips if self.strips else None,
+                'max_size': max(sizes) if sizes else None,
+                'sizes': {str(size): sizes[size] for size in sorted(sizes)},
+            },
+            'strip_windows': self.strip_windows,
+            'early_breaks': self.early_breaks,
+            'levels': [dict(depth=depth, **self.levels[depth].to_dict()) for depth in sorted(self.levels)],
+        }
+
+    def to_json(self, path: Optional[str] = None, indent: Optional[int] = 2) -> str:
+        """
+        Exports the statistics as JSON.
+
+        Parameters:
+        - path (str | None): Also write the JSON to this file.
+        - indent (int | None): Indentation of the JSON text.
+
+        Returns:
+        - (str): The JSON text.
+        """
+        text = json.dumps(self.to_dict(), indent=indent)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def summary(self) -> str:
+        """A short human-readable summary."""
+        data = self.to_dict()
+        strips = data['strips']
+        lines = [f"{self.distance_evaluations} distance evaluations in {self.seconds:.6f}s",
+                 f"{strips['count']} strips, mean size {strips['mean_size'] or 0:.1f}, max {strips['max_size'] or 0}",
+                 f"{self.early_breaks} of {self.strip_windows} strip scans stopped early"]
+        for level in data['levels']:
+            lines.append(f"depth {level['depth']:>3}: {level['calls']:>8} calls {level['points']:>10} points "
+                         f"{level['seconds']:.6f}s ({level['cumulative_seconds']:.6f}s with sub-levels)")
+        return "\n".join(lines)
+
+
+@contextmanager
+def collect_stats() -> Iterator[RunStats]:
+    """
+    Collects statistics about the closest pair runs of the calling thread
+    inside the with block:
+
+        with collect_stats() as stats:
+            closest_pair_recursive(points)
+        print(stats.summary())
+
+    Runs on other threads (or in worker processes) are not counted. Blocks
+    cannot be nested on one thread.
+
+    Returns:
+    - (RunStats): The statistics, filled in as the runs go.
+    """
+    if algorithms._collector.stats is not None:
+        raise RuntimeError("statistics are already being collected on this thread")
+    stats = RunStats()
+    algorithms._collector.stats = stats
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.seconds = time.perf_counter() - start
+        algorithms._collector.stats = None
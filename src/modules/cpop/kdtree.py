@@ -0,0 +1,623 @@
+"""
+kdtree.py
+
+This module implements a static 2-d tree stored in flat NumPy arrays, with
+nearest neighbour queries answered for a whole batch of query points at once.
+
+The tree is built level by level: every node covers a contiguous range of
+the points, split at the median of its wider side, so the tree is complete
+and node k has children 2k and 2k + 1. Leaves hold up to LEAF_SIZE points.
+
+Every point may carry an integer label (for example a color code). For every
+node and label the tree keeps the bounding box and the number of points with
+that label, so one tree answers "nearest point with label c" for every c.
+Within a leaf the points are grouped by label, so the points of one label in
+one leaf are a contiguous range.
+
+A batch query walks the tree one level at a time for all queries together.
+For every (query, node) pair it keeps, the farthest corner of the node's box
+bounds the nearest neighbour distance from above and the nearest side
+bounds the node's points from below; nodes that cannot beat the best upper
+bound are dropped. The surviving leaves are then compared point by point.
+closest_pair(a, b) and all_nearest() walk pairs of nodes the same way,
+bounding each pair by the gap and the far corners between their boxes.
+
+The tree stores and compares float64 coordinates: integer input is
+converted, so unlike the engines of algorithms.py it does not compare
+integer points by exact squared distances.
+
+Key classes:
+- KDTree(x, y, labels): the tree, with nearest(qx, qy, label, exclude) for
+  every query, closest(qx, qy, label, exclude) for the best query only,
+  closest_pair(a, b) between two labels of the tree, and all_nearest(label)
+  for every point of the tree.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .algorithms import _expand_ranges
+
+# Largest number of points in a leaf.
+LEAF_SIZE = 16
+
+# Number of queries processed per batch, to bound the size of the frontier.
+QUERY_CHUNK = 1 << 16
+
+# Number of queries whose home leaf seeds the shared bound of closest().
+HOME_SAMPLE = 1024
+
+
+def _segment_min(best: np.ndarray, query: np.ndarray, values: np.ndarray) -> None:
+    """best[q] = min(best[q], values of q) for a query array sorted in increasing order."""
+    if len(query) == 0:
+        return
+    starts = np.flatnonzero(np.diff(query, prepend=-1))
+    owners = query[starts]
+    best[owners] = np.minimum(best[owners], np.minimum.reduceat(values, starts))
+
+
+class KDTree:
+    """
+    A static, array-backed 2-d tree over labelled points.
+
+    Attributes:
+    - order (np.ndarray): The input index of every point, in tree order.
+    - xs, ys (np.ndarray): The float64 coordinates, in tree order.
+    - labels (np.ndarray): The label of every point, in tree order.
+    - n_labels (int): The number of labels.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, labels: Optional[np.ndarray] = None,
+                 n_labels: int = 1):
+        """
+        Initialize a KDTree instance.
+
+        Parameters:
+        - x, y (np.ndarray): The coordinates.
+        - labels (np.ndarray | None): An integer label in 0 .. n_labels - 1
+          for every point (default: all 0).
+        - n_labels (int): The number of labels.
+        """
+        n = len(x)
+        xs = np.asarray(x, dtype=np.float64)
+        ys = np.asarray(y, dtype=np.float64)
+        labels = np.zeros(n, dtype=np.int64) if labels is None else np.asarray(labels, dtype=np.int64)
+        order = np.arange(n)
+
+        levels = 0
+        while n > LEAF_SIZE << levels:
+            levels += 1
+
+        # Split level by level: sort every node's range along its wider side,
+        # and its two halves become the ranges of the next level.
+        # The split axis and value of every inner node guide queries to the
+        # leaf around them.
+        split_x = np.zeros(1 << levels, dtype=bool)
+        split_at = np.zeros(1 << levels)
+        # Sorting by (node, rank of the coordinate) is one integer argsort
+        # per level instead of a two-key lexsort.
+        rank_x = np.empty(n, dtype=np.int64)
+        rank_y = np.empty(n, dtype=np.int64)
+        if levels:
+            rank_x[np.argsort(xs)] = order
+            rank_y[np.argsort(ys)] = order
+        starts = np.zeros(1, dtype=np.int64)
+        stops = np.full(1, n, dtype=np.int64)
+        for level in range(levels):
+            node_of = np.repeat(np.arange(len(starts)), stops - starts)
+            spread_x = np.maximum.reduceat(xs, starts) - np.minimum.reduceat(xs, starts)
+            spread_y = np.maximum.reduceat(ys, starts) - np.minimum.reduceat(ys, starts)
+            along_x = (spread_x >= spread_y)[node_of]
+            perm = np.argsort(node_of * n + np.where(along_x, rank_x, rank_y))
+            xs, ys, labels, order = xs[perm], ys[perm], labels[perm], order[perm]
+            rank_x, rank_y, along_x = rank_x[perm], rank_y[perm], along_x[perm]
+            mids = starts + (stops - starts) // 2
+            split_x[1 << level:2 << level] = along_x[mids]
+            split_at[1 << level:2 << level] = np.where(along_x[mids], xs[mids], ys[mids])
+            starts, stops = np.stack((starts, mids), axis=1).ravel(), np.stack((mids, stops), axis=1).ravel()
+
+        # Group every leaf by label.
+        n_leaves = 1 << levels
+        leaf_of = np.repeat(np.arange(n_leaves), stops - starts)
+        cell = leaf_of * n_labels + labels
+        perm = np.argsort(cell, kind='stable')
+        xs, ys, labels, order, cell = xs[perm], ys[perm], labels[perm], order[perm], cell[perm]
+
+        # Boxes and counts of every (leaf, label), then of every inner node.
+        n_nodes = 2 * n_leaves
+        count = np.zeros((n_nodes, n_labels), dtype=np.int64)
+        min_x = np.full((n_nodes, n_labels), np.inf)
+        max_x = np.full((n_nodes, n_labels), -np.inf)
+        min_y = np.full((n_nodes, n_labels), np.inf)
+        max_y = np.full((n_nodes, n_labels), -np.inf)
+        leaves = slice(n_leaves, n_nodes)
+        count[leaves] = np.bincount(cell, minlength=n_leaves * n_labels).reshape(n_leaves, n_labels)
+        for box, reduce, values in ((min_x, np.minimum, xs), (max_x, np.maximum, xs),
+                                    (min_y, np.minimum, ys), (max_y, np.maximum, ys)):
+            flat = box[leaves].ravel()
+            reduce.at(flat, cell, values)
+            box[leaves] = flat.reshape(n_leaves, n_labels)
+        for level in range(levels - 1, -1, -1):
+            parents = slice(1 << level, 2 << level)
+            left = slice(2 << level, 4 << level, 2)
+            right = slice((2 << level) + 1, 4 << level, 2)
+            count[parents] = count[left] + count[right]
+            min_x[parents] = np.minimum(min_x[left], min_x[right])
+            max_x[parents] = np.maximum(max_x[left], max_x[right])
+            min_y[parents] = np.minimum(min_y[left], min_y[right])
+            max_y[parents] = np.maximum(max_y[left], max_y[right])
+
+        self.order = order
+        self.xs = xs
+        self.ys = ys
+        self.labels = labels
+        self.n_labels = n_labels
+        self._levels = levels
+        self._split_x = split_x
+        self._split_at = split_at
+        self._count = count
+        self._min_x, self._max_x, self._min_y, self._max_y = min_x, max_x, min_y, max_y
+        # Position of the first point of every (leaf, label) cell.
+        self._cell_start = np.concatenate(([0], np.cumsum(count[leaves].ravel())))
+
+    def __len__(self):
+        return len(self.order)
+
+    def _leaf_candidates(self, query: np.ndarray, node: np.ndarray, label: int,
+                         qx: np.ndarray, qy: np.ndarray,
+                         exclude: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Expands (query, leaf) pairs, sorted by query, into the points of the
+        label in those leaves.
+
+        Returns:
+        - (Tuple[np.ndarray, np.ndarray, np.ndarray]): The query, the tree
+          position of the point and their distance, for every candidate.
+        """
+        cell = (node - (1 << self._levels)) * self.n_labels + label
+        owner, position = _expand_ranges(self._cell_start[cell], self._cell_start[cell + 1])
+        query = query[owner]
+        dx = self.xs[position] - qx[query]
+        dy = self.ys[position] - qy[query]
+        d = np.sqrt(dx * dx + dy * dy)
+        if exclude is not None:
+            d[self.order[position] == exclude[query]] = np.inf
+        return query, position, d
+
+    def _nearest_chunk(self, qx: np.ndarray, qy: np.ndarray, label: int,
+                       exclude: Optional[np.ndarray], shared: bool = False,
+                       bound: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        nearest() for one chunk of queries; returns tree positions (-1 if none).
+
+        If shared is set, nodes farther than `bound` or than the best distance
+        found for any query are dropped as well, so only the overall closest
+        (query, point) pair is exact. That is what closest() needs, and it
+        prunes far more.
+        """
+        m = len(qx)
+        best = np.full(m, np.inf)
+        if self._count[1, label] == 0:
+            return best, np.full(m, -1, dtype=np.int64)
+
+        # Start from the points of the leaf each query falls into. A shared
+        # bound only needs a good start from a sample of the queries.
+        query = np.arange(m) if not shared else np.arange(0, m, max(1, m // HOME_SAMPLE))
+        home = np.ones(len(query), dtype=np.int64)
+        for _ in range(self._levels):
+            go_right = np.where(self._split_x[home], qx[query], qy[query]) >= self._split_at[home]
+            home = 2 * home + go_right
+        query, _, d = self._leaf_candidates(query, home, label, qx, qy, exclude)
+        _segment_min(best, query, d)
+        if shared:
+            bound = min(bound, best.min())
+
+        # A node's far corner only bounds the answer if the node holds a
+        # point other than the excluded one.
+        bounding = 2 if exclude is not None else 1
+        query = np.arange(m)
+        node = np.ones(m, dtype=np.int64)
+        for _ in range(self._levels):
+            query = np.repeat(query, 2)
+            node = 2 * np.repeat(node, 2) + np.tile([0, 1], len(node))
+            count = self._count[node, label]
+            live = count > 0
+            query, node, count = query[live], node[live], count[live]
+
+            x, y = qx[query], qy[query]
+            lo_x, hi_x = self._min_x[node, label], self._max_x[node, label]
+            lo_y, hi_y = self._min_y[node, label], self._max_y[node, label]
+            far_x = np.maximum(np.abs(x - lo_x), np.abs(x - hi_x))
+            far_y = np.maximum(np.abs(y - lo_y), np.abs(y - hi_y))
+            far = np.where(count >= bounding, np.sqrt(far_x * far_x + far_y * far_y), np.inf)
+            _segment_min(best, query, far)
+            limit = best[query]
+            if shared:
+                bound = min(bound, best.min())
+                limit = np.minimum(limit, bound)
+
+            near_x = np.maximum(np.maximum(lo_x - x, x - hi_x), 0)
+            near_y = np.maximum(np.maximum(lo_y - y, y - hi_y), 0)
+            keep = np.sqrt(near_x * near_x + near_y * near_y) <= limit
+            query, node = query[keep], node[keep]
+
+        query, position, d = self._leaf_candidates(query, node, label, qx, qy, exclude)
+        best = np.full(m, np.inf)
+        _segment_min(best, query, d)
+        found = np.full(m, -1, dtype=np.int64)
+        hit = (d == best[query]) & (d < np.inf)
+        # Several points may tie; keep the last one written per query.
+        found[query[hit]] = position[hit]
+        return best, found
+
+    def nearest(self, qx, qy, label: int = 0,
+                exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds, for every query point, the nearest point with the given label.
+
+        Parameters:
+        - qx, qy (array-like): The query coordinates.
+        - label (int): Only points with this label are considered.
+        - exclude (np.ndarray | None): For every query, an input index that
+          must not be returned (e.g. the query point itself), or None.
+
+        Returns:
+        - (Tuple[np.ndarray, np.ndarray]): For every query, the distance to
+          its nearest point and that point's input index (inf and -1 when
+          there is no candidate).
+        """
+        qx = np.asarray(qx, dtype=np.float64)
+        qy = np.asarray(qy, dtype=np.float64)
+        distance = np.full(len(qx), np.inf)
+        index = np.full(len(qx), -1, dtype=np.int64)
+        if len(self) == 0:
+            return distance, index
+        for lo in range(0, len(qx), QUERY_CHUNK):
+            hi = min(len(qx), lo + QUERY_CHUNK)
+            d, position = self._nearest_chunk(qx[lo:hi], qy[lo:hi], label,
+                                              None if exclude is None else exclude[lo:hi])
+            distance[lo:hi] = d
+            index[lo:hi] = np.where(position >= 0, self.order[np.maximum(position, 0)], -1)
+        return distance, index
+
+    def closest(self, qx, qy, label: int = 0,
+                exclude: Optional[np.ndarray] = None) -> Tuple[float, int, int]:
+        """
+        Finds the closest pair between the query points and the points with
+        the given label. The best distance found so far prunes the search of
+        every query, which makes this much cheaper than min(nearest(...)).
+
+        Parameters:
+        - qx, qy (array-like): The query coordinates.
+        - label (int): Only points with this label are considered.
+        - exclude (np.ndarray | None): For every query, an input index that
+          must not be paired with it, or None.
+
+        Returns:
+        - (Tuple[float, int, int]): The distance, the position of the query
+          and the input index of the point (inf, -1, -1 if there is none).
+        """
+        qx = np.asarray(qx, dtype=np.float64)
+        qy = np.asarray(qy, dtype=np.float64)
+        best = (float('inf'), -1, -1)
+        for lo in range(0, len(qx), QUERY_CHUNK):
+            hi = min(len(qx), lo + QUERY_CHUNK)
+            d, position = self._nearest_chunk(qx[lo:hi], qy[lo:hi], label,
+                                              None if exclude is None else exclude[lo:hi],
+                                              shared=True, bound=best[0])
+            k = int(np.argmin(d))
+            if d[k] < best[0]:
+                best = (float(d[k]), lo + k, int(self.order[position[k]]))
+        return best
+
+    def closest_pair(self, a: int = 0, b: Optional[int] = None) -> Tuple[float, int, int]:
+        """
+        Finds the closest pair with one point labelled a and one labelled b
+        (two distinct points labelled a if b is None or equal to a).
+
+        The pairs within every leaf are compared first, which usually finds
+        a distance close to the answer. Then, instead of one search per
+        point, pairs of nodes are walked down the tree together, one level
+        at a time: the gap between their boxes bounds their pairs from
+        below, and the distance between the far corners bounds the answer
+        from above, so only node pairs closer than the best bound survive
+        to the leaves.
+
+        Parameters:
+        - a, b (int): The labels.
+
+        Returns:
+        - (Tuple[float, int, int]): The distance and the input indices of the
+          pair (inf, -1, -1 if there is none).
+        """
+        same = b is None or b == a
+        b = a if same else b
+        if self._count[1, a] == 0 or self._count[1, b] == 0 or (same and self._count[1, a] < 2):
+            return float('inf'), -1, -1
+
+        leaf = 1 << self._levels
+        best = (float('inf'), -1, -1)
+
+        def compare(first, second):
+            """Compares the points of pairs of leaves and keeps the closest pair."""
+            nonlocal best
+            cell1 = first * self.n_labels + a
+            cell2 = second * self.n_labels + b
+            owner, i = _expand_ranges(self._cell_start[cell1], self._cell_start[cell1 + 1])
+            start2, stop2 = self._cell_start[cell2][owner], self._cell_start[cell2 + 1][owner]
+            if same:
+                start2 = np.where(first[owner] == second[owner], i + 1, start2)
+            pair, j = _expand_ranges(start2, stop2)
+            i = i[pair]
+            if len(i) == 0:
+                return
+            dx = self.xs[i] - self.xs[j]
+            dy = self.ys[i] - self.ys[j]
+            d = np.sqrt(dx * dx + dy * dy)
+            k = int(np.argmin(d))
+            if d[k] < best[0]:
+                best = (float(d[k]), int(self.order[i[k]]), int(self.order[j[k]]))
+
+        block = max(1, QUERY_CHUNK // LEAF_SIZE)
+        for lo in range(0, leaf, block):
+            leaves = np.arange(lo, min(leaf, lo + block))
+            compare(leaves, leaves)
+
+        first = np.ones(1, dtype=np.int64)
+        second = np.ones(1, dtype=np.int64)
+        bound = best[0]
+        for _ in range(self._levels):
+            first = 2 * np.repeat(first, 4) + np.tile([0, 0, 1, 1], len(first))
+            second = 2 * np.repeat(second, 4) + np.tile([0, 1, 0, 1], len(second))
+            live = (self._count[first, a] > 0) & (self._count[second, b] > 0)
+            if same:
+                # Each unordered pair of nodes once; a node with itself
+                # needs two points.
+                live &= (first < second) | ((first == second) & (self._count[first, a] >= 2))
+            first, second = first[live], second[live]
+
+            lo_x1, hi_x1 = self._min_x[first, a], self._max_x[first, a]
+            lo_y1, hi_y1 = self._min_y[first, a], self._max_y[first, a]
+            lo_x2, hi_x2 = self._min_x[second, b], self._max_x[second, b]
+            lo_y2, hi_y2 = self._min_y[second, b], self._max_y[second, b]
+            far_x = np.maximum(hi_x2 - lo_x1, hi_x1 - lo_x2)
+            far_y = np.maximum(hi_y2 - lo_y1, hi_y1 - lo_y2)
+            if len(far_x):
+                bound = min(bound, float(np.sqrt(far_x * far_x + far_y * far_y).min()))
+            gap_x = np.maximum(np.maximum(lo_x2 - hi_x1, lo_x1 - hi_x2), 0)
+            gap_y = np.maximum(np.maximum(lo_y2 - hi_y1, lo_y1 - hi_y2), 0)
+            keep = np.sqrt(gap_x * gap_x + gap_y * gap_y) <= bound
+            first, second = first[keep], second[keep]
+
+        # Pairs of different leaves; every leaf with itself is done.
+        keep = first != second
+        first, second = first[keep] - leaf, second[keep] - leaf
+        for lo in range(0, len(first), block):
+            compare(first[lo:lo + block], second[lo:lo + block])
+        return best
+
+    def all_nearest(self, label: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the nearest other point of every point with the given label,
+        among the points with that label.
+
+        Every point first gets the nearest other point of its own leaf. The
+        largest of these distances below a node bounds the answer of all of
+        its points, so the tree is then walked against itself with pairs of
+        (query node, node), dropping nodes farther than that bound or than
+        their far corner. Only at the leaves are the pairs split into single
+        query points.
+
+        Parameters:
+        - label (int): The label of the query points and of their neighbours.
+
+        Returns:
+        - (Tuple[np.ndarray, np.ndarray]): For every input point, the
+          distance to its nearest neighbour and that neighbour's input index
+          (inf and -1 for points with another label, or without a neighbour).
+        """
+        distance = np.full(len(self), np.inf)
+        index = np.full(len(self), -1, dtype=np.int64)
+        count = self._count[:, label]
+        if count[1] < 2:
+            return distance, index
+
+        leaf = 1 << self._levels
+        block = max(1, QUERY_CHUNK // LEAF_SIZE)
+        cell_start = self._cell_start[label::self.n_labels]
+        cell_stop = self._cell_start[label + 1::self.n_labels]
+
+        def points_of(leaves):
+            """The tree positions of the labelled points of some leaves, and their leaf."""
+            owner, point = _expand_ranges(cell_start[leaves], cell_stop[leaves])
+            return point, leaves[owner]
+
+        def compare(point, leaves, best, found):
+            """Lowers best and found with the points of one leaf per query point."""
+            pair, neighbour = _expand_ranges(cell_start[leaves], cell_stop[leaves])
+            point = point[pair]
+            other = neighbour != point
+            point, neighbour = point[other], neighbour[other]
+            dx = self.xs[neighbour] - self.xs[point]
+            dy = self.ys[neighbour] - self.ys[point]
+            d = np.sqrt(dx * dx + dy * dy)
+            _segment_min(best, point, d)
+            hit = d == best[point]
+            found[point[hit]] = neighbour[hit]
+
+        # Nearest neighbour within the own leaf.
+        best = np.full(len(self), np.inf)
+        found = np.full(len(self), -1, dtype=np.int64)
+        for lo in range(0, leaf, block):
+            point, home = points_of(np.arange(lo, min(leaf, lo + block)))
+            compare(point, home, best, found)
+
+        # The largest of them below every node (-inf for nodes without points).
+        bound = np.full(2 * leaf, -np.inf)
+        filled = np.flatnonzero(count[leaf:])
+        ranges = np.stack((cell_start[filled], cell_stop[filled]), axis=1).ravel()
+        bound[leaf + filled] = np.maximum.reduceat(np.append(best, -np.inf), ranges)[::2]
+        for level in range(self._levels - 1, -1, -1):
+            bound[1 << level:2 << level] = np.maximum(bound[2 << level:4 << level:2],
+                                                      bound[(2 << level) + 1:4 << level:2])
+
+        def boxes(node):
+            return (self._min_x[node, label], self._max_x[node, label],
+                    self._min_y[node, label], self._max_y[node, label])
+
+        query = np.ones(1, dtype=np.int64)
+        node = np.ones(1, dtype=np.int64)
+        for level in range(self._levels):
+            query = 2 * np.repeat(query, 4) + np.tile([0, 0, 1, 1], len(query))
+            node = 2 * np.repeat(node, 4) + np.tile([0, 1, 0, 1], len(node))
+            # A node only bounds its own points if it holds two of them.
+            live = (count[query] > 0) & (count[node] > 0) & ((query != node) | (count[query] >= 2))
+            query, node = query[live], node[live]
+
+            lo_x1, hi_x1, lo_y1, hi_y1 = boxes(query)
+            lo_x2, hi_x2, lo_y2, hi_y2 = boxes(node)
+            far_x = np.maximum(hi_x2 - lo_x1, hi_x1 - lo_x2)
+            far_y = np.maximum(hi_y2 - lo_y1, hi_y1 - lo_y2)
+            np.minimum.at(bound, query, np.sqrt(far_x * far_x + far_y * far_y))
+            gap_x = np.maximum(np.maximum(lo_x2 - hi_x1, lo_x1 - hi_x2), 0)
+            gap_y = np.maximum(np.maximum(lo_y2 - hi_y1, lo_y1 - hi_y2), 0)
+            keep = np.sqrt(gap_x * gap_x + gap_y * gap_y) <= bound[query]
+            query, node = query[keep], node[keep]
+            # Children are bounded by their parent as well.
+            children = np.arange(2 << level, 4 << level)
+            bound[children] = np.minimum(bound[children], bound[children >> 1])
+
+        # Split the remaining pairs of different leaves into (query point,
+        # leaf), a block of query leaves at a time.
+        keep = query != node
+        query, node = query[keep] - leaf, node[keep] - leaf
+        pairs = np.argsort(query, kind='stable')
+        query, node = query[pairs], node[pairs]
+        pair_start = np.searchsorted(query, np.arange(leaf + 1))
+        for lo in range(0, leaf, block):
+            point, home = points_of(np.arange(lo, min(leaf, lo + block)))
+            pair, candidate = _expand_ranges(pair_start[home], pair_start[home + 1])
+            point, candidate = point[pair], node[candidate]
+
+            x, y = self.xs[point], self.ys[point]
+            lo_x, hi_x, lo_y, hi_y = boxes(candidate + leaf)
+            near_x = np.maximum(np.maximum(lo_x - x, x - hi_x), 0)
+            near_y = np.maximum(np.maximum(lo_y - y, y - hi_y), 0)
+            keep = np.sqrt(near_x * near_x + near_y * near_y) <= best[point]
+            compare(point[keep], candidate[keep], best, found)
+
+        labelled = np.flatnonzero(found >= 0)
+        distance[self.order[labelled]] = best[labelled]
+        index[self.order[labelled]] = self.order[found[labelled]]
+        return distance, index
+
+    def _node_points(self, node: np.ndarray, depth: int, label: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Expands nodes of one depth into the tree positions of their points
+        with the label.
+
+        Returns:
+        - (Tuple[np.ndarray, np.ndarray]): The owning entry of `node` and the
+          position, for every point.
+        """
+        shift = self._levels - depth
+        first = (node << shift) - (1 << self._levels)
+        start = self._cell_start[first * self.n_labels]
+        stop = self._cell_start[(first + (1 << shift)) * self.n_labels]
+        owner, position = _expand_ranges(start, stop)
+        if self.n_labels > 1:
+            same = self.labels[position] == label
+            owner, position = owner[same], position[same]
+        return owner, position
+
+    def within(self, qx, qy, radius, label: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds, for every query point, all points with the label within a
+        distance of at most `radius`.
+
+        Nodes whose whole box lies within the radius are reported without
+        looking at their points, so large results cost about their size.
+
+        Parameters:
+        - qx, qy (array-like): The query coordinates.
+        - radius (float | array-like): The radius, or one radius per query.
+        - label (int): Only points with this label are considered.
+
+        Returns:
+        - (Tuple[np.ndarray, np.ndarray]): The query position and the input
+          index of every (query, point) match, sorted by query and index.
+        """
+        qx = np.asarray(qx, dtype=np.float64)
+        qy = np.asarray(qy, dtype=np.float64)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), qx.shape)
+        queries, indices = [], []
+        for lo in range(0, len(qx), QUERY_CHUNK):
+            hi = min(len(qx), lo + QUERY_CHUNK)
+            x_chunk, y_chunk, r_chunk = qx[lo:hi], qy[lo:hi], radius[lo:hi]
+            query = np.arange(hi - lo)
+            node = np.ones(hi - lo, dtype=np.int64)
+            for depth in range(self._levels + 1):
+                if depth:
+                    query = np.repeat(query, 2)
+                    node = 2 * np.repeat(node, 2) + np.tile([0, 1], len(node))
+                live = self._count[node, label] > 0
+                query, node = query[live], node[live]
+
+                x, y, r = x_chunk[query], y_chunk[query], r_chunk[query]
+                lo_x, hi_x = self._min_x[node, label], self._max_x[node, label]
+                lo_y, hi_y = self._min_y[node, label], self._max_y[node, label]
+                near_x = np.maximum(np.maximum(lo_x - x, x - hi_x), 0)
+                near_y = np.maximum(np.maximum(lo_y - y, y - hi_y), 0)
+                far_x = np.maximum(np.abs(x - lo_x), np.abs(x - hi_x))
+                far_y = np.maximum(np.abs(y - lo_y), np.abs(y - hi_y))
+                keep = np.sqrt(near_x * near_x + near_y * near_y) <= r
+                inside = keep & (np.sqrt(far_x * far_x + far_y * far_y) <= r)
+
+                owner, position = self._node_points(node[inside], depth, label)
+                queries.append(lo + query[inside][owner])
+                indices.append(self.order[position])
+                keep &= ~inside
+                query, node = query[keep], node[keep]
+
+            # Leaves that are only partly within the radius.
+            owner, position = self._node_points(node, self._levels, label)
+            query = query[owner]
+            dx = self.xs[position] - x_chunk[query]
+            dy = self.ys[position] - y_chunk[query]
+            hit = np.sqrt(dx * dx + dy * dy) <= r_chunk[query]
+            queries.append(lo + query[hit])
+            indices.append(self.order[position[hit]])
+
+        query = np.concatenate(queries) if queries else np.empty(0, dtype=np.int64)
+        index = np.concatenate(indices) if indices else np.empty(0, dtype=np.int64)
+        order = np.lexsort((index, query))
+        return query[order], index[order]
+
+    def in_box(self, x_min: float, y_min: float, x_max: float, y_max: float,
+               label: int = 0) -> np.ndarray:
+        """
+        Finds the points with the label inside an axis-aligned box (borders
+        included).
+
+        Returns:
+        - (np.ndarray): The input indices of the points, in increasing order.
+        """
+        found = []
+        node = np.ones(1, dtype=np.int64)
+        for depth in range(self._levels + 1):
+            if depth:
+                node = 2 * np.repeat(node, 2) + np.tile([0, 1], len(node))
+            lo_x, hi_x = self._min_x[node, label], self._max_x[node, label]
+            lo_y, hi_y = self._min_y[node, label], self._max_y[node, label]
+            # Empty nodes have inverted (inf, -inf) boxes and never overlap.
+            keep = (lo_x <= x_max) & (hi_x >= x_min) & (lo_y <= y_max) & (hi_y >= y_min)
+            inside = keep & (lo_x >= x_min) & (hi_x <= x_max) & (lo_y >= y_min) & (hi_y <= y_max)
+            found.append(self._node_points(node[inside], depth, label)[1])
+            node = node[keep & ~inside]
+
+        _, position = self._node_points(node, self._levels, label)
+        x, y = self.xs[position], self.ys[position]
+        found.append(position[(x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)])
+        return np.sort(self.order[np.concatenate(found)])
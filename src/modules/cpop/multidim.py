@@ -0,0 +1,356 @@
+"""
+multidim.py
+
+This module finds the closest pair among points with any number of
+coordinates, given as an (n, d) array (feature vectors, 3D scans, ...).
+
+Two dimensions are handed to the specialized engines of algorithms.py, and
+one dimension is a sort. For d >= 3 the randomized grid algorithm of
+algorithms.py is generalized: the closest pair of a random sample bounds
+the answer from above by delta, the points are bucketed into cells of side
+delta, and only points in the same or adjacent cells are compared. In d
+dimensions a cell has 3^d - 1 neighbours, so the grid is only built over
+the (at most MAX_GRID_DIMS) coordinates with the widest extent relative to
+delta; the remaining coordinates are still part of every distance. Pairs
+are compared in chunks with NumPy, and a crowded grid is retried with a
+larger sample, as in two dimensions.
+
+Integer coordinates are compared exactly by squared distance (int64, or
+Python ints when the coordinates are too far apart), like in algorithms.py.
+
+Key functions:
+- closest_pair_nd(points): the closest pair of an (n, d) array, as a
+  ClosestPair whose points are rows of the array.
+- closest_pair_distance_nd(points): only its distance.
+"""
+
+import itertools
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .algorithms import (BRUTE_FORCE_MAX, GRID_CANDIDATES_PER_POINT, GRID_CHUNK, ClosestPair, _expand_ranges,
+                         _grid_sample_size, _run_engine)
+from .geometry import PointArray
+
+# Largest number of coordinates the grid is built over (3^d - 1 neighbour cells).
+MAX_GRID_DIMS = 4
+
+ND_ENGINES = ('auto', 'brute', 'grid')
+
+
+def _as_rows(points) -> np.ndarray:
+    """The points as an (n, d) int64 or float64 array."""
+    array = np.asarray(points)
+    if array.ndim != 2:
+        raise ValueError("points must be an (n, d) array")
+    if np.issubdtype(array.dtype, np.integer) or np.issubdtype(array.dtype, np.bool_):
+        return array.astype(np.int64)
+    return array.astype(np.float64)
+
+
+def _exact_rows(rows: np.ndarray) -> np.ndarray:
+    """
+    Prepares rows for distance comparisons, as _exact_coordinates() does in
+    two dimensions: float rows stay float64, integer rows stay int64 when a
+    sum of d squared differences fits, and become Python ints otherwise.
+    """
+    if rows.dtype.kind == 'f' or not len(rows):
+        return rows
+    span = int((rows.max(axis=0) - rows.min(axis=0).astype(object)).max())
+    if rows.shape[1] * span * span >= 2**63:
+        return rows.astype(object)
+    return rows
+
+
+def _row_squared(rows: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Squared distances between the rows at index arrays a and b, in the dtype of rows."""
+    diff = rows[a] - rows[b]
+    if rows.dtype == object:
+        return (diff * diff).sum(axis=1)
+    return np.einsum('ij,ij->i', diff, diff)
+
+
+def _offsets(rows: np.ndarray) -> np.ndarray:
+    """Every coordinate minus its minimum, in float64 (exact for integers before rounding)."""
+    if rows.dtype.kind == 'f':
+        return rows - rows.min(axis=0)
+    return (rows.astype(np.uint64) - rows.min(axis=0).astype(np.uint64)).astype(np.float64)
+
+
+def _chunked_min(rows: np.ndarray, owners: np.ndarray, start: np.ndarray, stop: np.ndarray,
+                 best: Tuple[float, int, int]) -> Tuple[float, int, int]:
+    """
+    Compares every row owners[k] with the rows start[k]:stop[k], a bounded
+    number of pairs per array operation.
+
+    Returns:
+    - (Tuple[float, int, int]): The smallest squared distance and its pair,
+      or `best` if no candidate beats it.
+    """
+    bounds = np.cumsum(stop - start)
+    if not len(bounds) or bounds[-1] == 0:
+        return best
+    chunk = max(1, GRID_CHUNK // rows.shape[1])
+    cuts = np.searchsorted(bounds, np.arange(chunk, int(bounds[-1]), chunk))
+    for lo, hi in zip(np.concatenate(([0], cuts)), np.concatenate((cuts, [len(start)]))):
+        owner, b = _expand_ranges(start[lo:hi], stop[lo:hi])
+        if len(b) == 0:
+            continue
+        a = owners[lo:hi][owner]
+        keys = _row_squared(rows, a, b)
+        i = int(np.argmin(keys))
+        if keys[i] < best[0]:
+            best = (keys[i], int(a[i]), int(b[i]))
+    return best
+
+
+def _gram_brute_force(rows: np.ndarray) -> Tuple[float, int, int]:
+    """
+    Compares all pairs of float rows through blocks of the Gram matrix:
+    |a - b|^2 = |a|^2 + |b|^2 - 2 a.b turns the distances of a block of rows
+    to all later rows into one matrix product.
+
+    The expansion loses precision, so it only screens the pairs: every pair
+    within its rounding error bound of the best distance so far is compared
+    exactly afterwards.
+
+    Returns:
+    - (Tuple[float, int, int]): The smallest squared distance and its pair.
+    """
+    n, d = rows.shape
+    centered = rows - rows.mean(axis=0)
+    norms = np.einsum('ij,ij->i', centered, centered)
+    # Rounding error bound of the expansion, relative to the largest norm.
+    tolerance = 4 * (d + 2) * np.finfo(np.float64).eps * float(norms.max())
+    block = max(1, GRID_CHUNK // n)
+    best = (float('inf'), 0, 0)
+    for lo in range(0, n - 1, block):
+        hi = min(lo + block, n - 1)
+        gram = centered[lo:hi] @ centered[lo + 1:].T
+        gram *= -2
+        gram += norms[lo:hi, None]
+        gram += norms[None, lo + 1:]
+        # Row k of the block starts at column k: only later rows count.
+        gram[np.arange(hi - lo)[:, None] > np.arange(n - lo - 1)] = np.inf
+        limit = min(float(best[0]), float(gram.min())) + tolerance
+        a, b = np.nonzero(gram <= limit)
+        b += lo + 1
+        best = _chunked_min(rows, a + lo, b, b + 1, best)
+        if best[0] == 0:
+            break
+    return best
+
+
+def _brute_force_rows(rows: np.ndarray) -> Tuple[float, int, int]:
+    """
+    Compares all pairs of rows. Float rows are screened with matrix products
+    (_gram_brute_force), integer rows are compared exactly throughout.
+
+    Returns:
+    - (Tuple[float, int, int]): The smallest distance and its pair.
+    """
+    rows = _exact_rows(rows)
+    if rows.dtype.kind == 'f':
+        key, a, b = _gram_brute_force(rows)
+    else:
+        position = np.arange(len(rows))
+        key, a, b = _chunked_min(rows, position, position + 1, np.full(len(rows), len(rows)),
+                                 (float('inf'), 0, 0))
+    return math.sqrt(key), a, b
+
+
+def _sort_rows(rows: np.ndarray) -> Tuple[float, int, int]:
+    """The closest pair of one-dimensional points: two neighbours in sorted order."""
+    order = np.argsort(rows[:, 0], kind='stable')
+    keys = _row_squared(_exact_rows(rows), order[:-1], order[1:])
+    k = int(np.argmin(keys))
+    return math.sqrt(keys[k]), int(order[k]), int(order[k + 1])
+
+
+def _grid_dims(extent: np.ndarray, side: float) -> List[int]:
+    """
+    Picks the coordinates the grid is built over: those spanning the most
+    cells, at most MAX_GRID_DIMS of them, as long as the cell keys fit
+    int64. Coordinates that fit in a single cell would not filter anything.
+    """
+    cells = np.floor(extent / side)
+    dims = []
+    size = 1
+    for k in np.argsort(-cells, kind='stable')[:MAX_GRID_DIMS]:
+        if cells[k] < 1 or size * (cells[k] + 3) >= 2**62:
+            break
+        dims.append(int(k))
+        size *= cells[k] + 3
+    return dims
+
+
+def _grid_closest_pair_rows(rows: np.ndarray, cell: float,
+                            max_candidates: Optional[int]) -> Optional[Tuple[float, int, int]]:
+    """
+    Finds the closest pair among the pairs of rows that fall into the same
+    or adjacent cells of side `cell` along the grid coordinates. This is
+    exact whenever the closest pair distance is at most `cell`.
+
+    Parameters:
+    - rows (np.ndarray): The points, one per row.
+    - cell (float): The side of a grid cell (> 0).
+    - max_candidates (int | None): Give up if more pairs than this would
+      have to be compared (None: never give up).
+
+    Returns:
+    - (Tuple[float, int, int] | None): The smallest candidate distance and
+      its pair, or None if the grid is too crowded.
+    """
+    n = len(rows)
+    offsets = _offsets(rows)
+    # Points whose distance is below `cell` must land in adjacent cells; the
+    # slightly larger side keeps that true under floating point rounding.
+    side = cell * (1 + 1e-6)
+    dims = _grid_dims(offsets.max(axis=0), side)
+    # Cell coordinates start at 1, so that no neighbour key wraps around
+    # into another row of cells.
+    coords = np.floor(offsets[:, dims] / side).astype(np.int64) + 1
+    strides = [1]
+    for top in coords.max(axis=0)[:-1]:
+        strides.append(strides[-1] * (int(top) + 2))
+    key = coords @ np.array(strides[:len(dims)], dtype=np.int64)
+
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+    first = np.flatnonzero(np.diff(key, prepend=-1))
+    cells = key[first]
+    count = np.diff(first, append=n)
+    cell_of = np.repeat(np.arange(len(cells)), count)
+    position = np.arange(n)
+    last = len(cells) - 1
+
+    # Every point is compared with the rest of its own cell and with the
+    # neighbour cells whose last non-zero offset is positive, so that every
+    # pair of adjacent cells is visited once.
+    ranges = [(position + 1, (first + count)[cell_of])]
+    for step in itertools.product((-1, 0, 1), repeat=len(dims)):
+        nonzero = [s for s in step if s]
+        if not nonzero or nonzero[-1] < 0:
+            continue
+        target = cells + sum(s * stride for s, stride in zip(step, strides))
+        j = np.minimum(np.searchsorted(cells, target), last)
+        found = cells[j] == target
+        ranges.append((np.where(found, first[j], 0)[cell_of],
+                       np.where(found, first[j] + count[j], 0)[cell_of]))
+
+    if max_candidates is not None and sum(int((stop - start).sum()) for start, stop in ranges) > max_candidates:
+        return None
+
+    # Cells are assigned in floating point, candidates are compared exactly.
+    exact = _exact_rows(rows[order])
+    best = (float('inf'), 0, 0)
+    for start, stop in ranges:
+        best = _chunked_min(exact, position, start, stop, best)
+    key, a, b = best
+    return math.sqrt(key), int(order[a]), int(order[b])
+
+
+def _grid_rows(rows: np.ndarray, rng: 'np.random.Generator') -> Tuple[float, int, int]:
+    """
+    Runs grid rounds with a growing sample, whose closest pair is found
+    recursively, until the grid is sparse enough. Before the sample would
+    grow to the whole input, the last grid is searched unless brute force
+    would compare fewer pairs.
+    The pair of the sample is itself a candidate of the grid, so the grid
+    answer is never worse.
+    """
+    n = len(rows)
+    sample_size = _grid_sample_size(n)
+    if sample_size >= n:
+        return _brute_force_rows(rows)
+    while True:
+        sample = np.sort(rng.choice(n, size=sample_size, replace=False))
+        d, a, b = _closest_pair_rows(rows[sample], rng)
+        if d == 0:
+            return d, int(sample[a]), int(sample[b])
+        sample_size *= 4
+        if sample_size < n:
+            found = _grid_closest_pair_rows(rows, d, GRID_CANDIDATES_PER_POINT * n)
+        else:
+            # High dimensional data can leave the grid crowded for any
+            # sample; past a quarter of all pairs, brute force is cheaper.
+            found = _grid_closest_pair_rows(rows, d, n * (n - 1) // 8) or _brute_force_rows(rows)
+        if found is not None:
+            return found
+
+
+def _closest_pair_rows(rows: np.ndarray, rng: 'np.random.Generator',
+                       engine: str = 'auto') -> Tuple[float, int, int]:
+    """Runs an n-d engine on at least two rows of three or more coordinates."""
+    if engine == 'brute' or (engine == 'auto' and len(rows) <= BRUTE_FORCE_MAX):
+        return _brute_force_rows(rows)
+    return _grid_rows(rows, rng)
+
+
+def _run_nd(rows: np.ndarray, engine: str, seed: Optional[int],
+            info: dict) -> Tuple[float, int, int]:
+    """Dispatches by the number of coordinates and stores the engine used in info."""
+    d = rows.shape[1]
+    if d == 2:
+        # The two-dimensional engines are specialized and faster.
+        return _run_engine(PointArray(rows[:, 0], rows[:, 1]), engine, info)
+    if engine not in ND_ENGINES:
+        raise ValueError(f"unknown engine {engine!r} for {d} dimensions, expected one of {ND_ENGINES}")
+    if d == 0:
+        info['engine'] = 'brute'
+        return 0.0, 0, 1
+    if d == 1 and engine == 'auto':
+        info['engine'] = 'sort'
+        return _sort_rows(rows)
+    if engine == 'auto':
+        engine = 'brute' if len(rows) <= BRUTE_FORCE_MAX else 'grid'
+    info['engine'] = engine
+    return _closest_pair_rows(rows, np.random.default_rng(seed), engine)
+
+
+def closest_pair_nd(points, engine: str = 'auto', seed: Optional[int] = None) -> Optional[ClosestPair]:
+    """
+    Finds the closest pair of points in any number of dimensions.
+
+    Parameters:
+    - points (array-like): An (n, d) array, one point per row.
+    - engine (str): "brute", "grid" or "auto" to choose by the size of the
+      input. Two-dimensional input runs on the engines of algorithms.py and
+      also accepts their names (ENGINES).
+    - seed (int | None): Seed for the random samples of the grid engine.
+
+    Returns:
+    - (ClosestPair | None): The distance, the indices of both points and the
+      points themselves (rows of the array), or None if there are fewer than
+      two points.
+    """
+    rows = _as_rows(points)
+    if len(rows) < 2:
+        return None
+
+    info = {}
+    d, i, j = _run_nd(rows, engine, seed, info)
+    i, j = sorted((i, j))
+    array = np.asarray(points)
+    return ClosestPair(d, i, j, array[i], array[j], info['engine'])
+
+
+def closest_pair_distance_nd(points, engine: str = 'auto', seed: Optional[int] = None) -> float:
+    """
+    Finds the closest pair distance in any number of dimensions.
+
+    Parameters:
+    - points (array-like): An (n, d) array, one point per row.
+    - engine (str): As for closest_pair_nd().
+    - seed (int | None): Seed for the random samples of the grid engine.
+
+    Returns:
+    - (float): The smallest distance between any pair of points.
+    """
+    rows = _as_rows(points)
+    if len(rows) < 2:
+        return float('inf')
+    d, _, _ = _run_nd(rows, engine, seed, {})
+    return d
@@ -0,0 +1,43 @@
+"""
+neighbors.py
+
+This module finds the nearest neighbour of every point, for example as the
+first step of a clustering.
+
+One query per point against a brute-force scan costs O(n^2). Instead, the
+points are put into the array-backed KDTree of kdtree.py and all of them
+are answered at once by KDTree.all_nearest(): every point starts from the
+nearest point of its own leaf, and the tree is then walked against itself
+one level at a time, so whole groups of query points are pruned together.
+Building the tree and the search are both O(n log n) vectorized operations.
+
+Key functions:
+- all_nearest_neighbors(points): the distance to and index of the nearest
+  other point, for every point.
+"""
+
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from .algorithms import _as_point_array
+from .geometry import Point, PointArray
+from .kdtree import KDTree
+
+
+def all_nearest_neighbors(points: Union[List[Point], PointArray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the nearest other point of every point.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+
+    Returns:
+    - (Tuple[np.ndarray, np.ndarray]): For every point, the distance to its
+      nearest neighbour (float64) and the neighbour's index in the input
+      (int64). Ties are broken arbitrarily; duplicate points are each
+      other's neighbours at distance 0. With fewer than two points the
+      distances are inf and the indices -1.
+    """
+    array = _as_point_array(points)
+    return KDTree(array.x, array.y).all_nearest()
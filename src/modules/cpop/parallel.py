@@ -0,0 +1,187 @@
+"""
+parallel.py
+
+This module runs the divide-and-conquer closest pair search on several
+processes at once.
+
+The points are sorted by x in the parent and copied once into a
+multiprocessing.shared_memory block. The top recursion levels are unrolled
+into 2^k contiguous slices of that sorted order, and each slice is solved by
+a ProcessPoolExecutor worker that maps the block by name, so no point list is
+ever pickled. The parent then combines the slices like the recursion would:
+a pair closer than the best slice distance d that crosses a slice boundary
+lies in the strip of points within d of that boundary, so only those strips
+are checked. Overlapping strips are merged into one range and solved once;
+when a strip spans almost all points (x barely varies, as for points on a
+vertical line), the whole input is solved serially instead, and inputs
+whose points all share one x-coordinate skip the pool altogether.
+
+Key functions:
+- closest_pair_parallel(points): closest pair using a process pool, falling
+  back to the serial engine for small inputs.
+"""
+
+import math
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .algorithms import ClosestPair, _as_point_array, _closer, _closest_pair_arrays
+from .geometry import Point, PointArray
+
+# Inputs with fewer points than this are solved serially: below it, process
+# start-up and task dispatch cost more than the recursion itself.
+PARALLEL_MIN_SIZE = 200_000
+
+# A merged boundary strip holding at least this share of the points is not
+# worth solving on its own: the whole input is solved serially instead.
+STRIP_SERIAL_SHARE = 0.9
+
+_INT64 = np.iinfo(np.int64)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Maps an existing shared memory block without taking ownership of it."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Older versions always register the block with the resource tracker.
+    # Pool workers share the parent's tracker, so that registration is a
+    # no-op and the parent's unlink() still releases the block.
+    return shared_memory.SharedMemory(name=name)
+
+
+def _solve_slice(name: str, n: int, lo: int, hi: int, dtype: str) -> Tuple[float, int, int]:
+    """
+    Worker task: the closest pair of the sorted points lo..hi-1 in the
+    shared block `name`, which holds n x-coordinates followed by n
+    y-coordinates of the given dtype (int64 or float64).
+
+    Returns:
+    - (Tuple[float, int, int]): The distance and the positions of the pair
+      in the sorted order.
+    """
+    shm = _attach(name)
+    try:
+        coords = np.ndarray((2, n), dtype=dtype, buffer=shm.buf)
+        d, i, j = _closest_pair_arrays(coords[0, lo:hi], coords[1, lo:hi])
+    finally:
+        coords = None
+        shm.close()
+    return d, lo + i, lo + j
+
+
+def _slice_bounds(n: int, slices: int) -> List[int]:
+    """Splits range(n) into `slices` halves-of-halves, like the recursion does."""
+    bounds = [0, n]
+    while len(bounds) - 1 < slices:
+        split = [bounds[0]]
+        for lo, hi in zip(bounds, bounds[1:]):
+            split += [lo + (hi - lo) // 2, hi]
+        bounds = split
+    return bounds
+
+
+def closest_pair_parallel(points: Union[List[Point], PointArray],
+                          workers: Optional[int] = None,
+                          executor: Optional[Executor] = None,
+                          min_size: int = PARALLEL_MIN_SIZE) -> Optional[ClosestPair]:
+    """
+    Finds the closest pair of points with the top recursion levels of the
+    divide and conquer running in a process pool.
+
+    Parameters:
+    - points (List[Point] | PointArray): The points.
+    - workers (int | None): Number of worker processes (default: CPU count).
+    - executor (Executor | None): An existing process pool to submit to;
+      a temporary one is created if None.
+    - min_size (int): Inputs smaller than this are solved serially, and so
+      are coordinates held in object arrays and points that all share one
+      x-coordinate.
+
+    Returns:
+    - (ClosestPair | None): The closest pair, with engine "parallel" (or
+      "dc" when solved serially), or None if there are fewer than two points.
+    """
+    array = _as_point_array(points)
+    n = len(array)
+    if n < 2:
+        return None
+    if workers is None:
+        workers = getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+
+    # Unroll the top levels: 2^k slices, at least one per worker.
+    slices = 1 << (workers - 1).bit_length()
+    while slices > 1 and n < 2 * slices:
+        slices //= 2
+
+    # Object arrays (see geometry.PointArray) cannot live in shared memory.
+    if n < min_size or slices < 2 or array.dtype == object or array.x.min() == array.x.max():
+        d, i, j = _closest_pair_arrays(array.x, array.y)
+        i, j = sorted((i, j))
+        return ClosestPair(d, i, j, points[i], points[j], 'dc')
+
+    # Integer points keep their int64 coordinates, so the slices compare
+    # exact squared distances like the serial engine.
+    order = np.argsort(array.x)
+    shm = shared_memory.SharedMemory(create=True, size=2 * n * 8)
+    try:
+        coords = np.ndarray((2, n), dtype=array.dtype, buffer=shm.buf)
+        coords[0] = array.x[order]
+        coords[1] = array.y[order]
+        xs, ys = coords
+
+        bounds = _slice_bounds(n, slices)
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [pool.submit(_solve_slice, shm.name, n, lo, hi, array.dtype.str)
+                       for lo, hi in zip(bounds, bounds[1:])]
+            best = None
+            for future in futures:
+                result = future.result()
+                if best is None or _closer(xs, ys, result, best):
+                    best = result
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+        # Combine: a closer pair crossing a slice boundary has both points in
+        # the strip within d of that boundary (widened by one unit for
+        # integers, whose d is rounded). Strips are ranges of the sorted
+        # order; overlapping ones are merged and solved once.
+        strips = []
+        for mid in bounds[1:-1]:
+            if array.dtype.kind == 'f':
+                low, high = xs[mid] - best[0], xs[mid] + best[0]
+            else:
+                reach = math.floor(best[0]) + 1
+                low = max(int(xs[mid]) - reach, _INT64.min)
+                high = min(int(xs[mid]) + reach, _INT64.max)
+            lo = int(np.searchsorted(xs, low, side='right'))
+            hi = int(np.searchsorted(xs, high, side='left'))
+            if hi - lo < 2:
+                continue
+            if strips and lo < strips[-1][1]:
+                strips[-1][1] = max(strips[-1][1], hi)
+            else:
+                strips.append([lo, hi])
+
+        if any(hi - lo >= STRIP_SERIAL_SHARE * n for lo, hi in strips):
+            best = _closest_pair_arrays(xs, ys)
+            strips = []
+        for lo, hi in strips:
+            d_strip, i, j = _closest_pair_arrays(xs[lo:hi], ys[lo:hi])
+            if _closer(xs, ys, (d_strip, lo + i, lo + j), best):
+                best = (d_strip, lo + i, lo + j)
+        d, a, b = best
+    finally:
+        # Views into the block must be released before it can be closed.
+        coords = xs = ys = None
+        shm.close()
+        shm.unlink()
+
+    i, j = sorted((int(order[a]), int(order[b])))
+    return ClosestPair(d, i, j, points[i], points[j], 'parallel')
@@ -0,0 +1,289 @@
+"""
+pointfile.py
+
+These modules read and write point sets in a compact binary file, so large
+datasets can be loaded without building one Python object per point.
+
+File layout (little endian):
+- a 64-byte header: magic, version, flags, coordinate dtype (int64 or
+  float64), point count, and the offset and length of the color dictionary;
+- the x-coordinates of all points, packed;
+- the y-coordinates of all points, packed;
+- if the file has colors, one uint32 color code per point;
+- if the file has colors, the color dictionary: a JSON list of the color
+  names, indexed by code.
+
+The coordinate arrays start at fixed, aligned offsets, so open_points()
+maps them with numpy.memmap and wraps them in a PointArray without copying:
+the engines of algorithms.py run directly on the mapped pages, which the
+operating system loads on demand. Files are written and read chunk by chunk,
+so neither side ever needs the whole dataset in memory.
+
+Key functions:
+- write_points(path, points): writes a PointArray or a list of (Colored)Point.
+- PointFileWriter(path, count, dtype): streaming writer, fed chunk by chunk.
+- open_points(path): maps a file as a PointFile (PointArray plus colors).
+- iter_points(path, chunk_size): reads a file chunk by chunk.
+"""
+
+import json
+import struct
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .geometry import ColoredPoint, Point, PointArray
+
+MAGIC = b'CPOPPTS\x00'
+VERSION = 1
+FLAG_COLORS = 1
+
+# magic, version, flags, dtype, count, color dictionary offset and length
+_HEADER = struct.Struct('<8sHH4sQQQ')
+HEADER_SIZE = 64
+
+_DTYPES = {b'<i8': np.dtype('<i8'), b'<f8': np.dtype('<f8')}
+_CODE_DTYPE = np.dtype('<u4')
+
+# Number of points write_points() and iter_points() handle per chunk.
+CHUNK_SIZE = 1 << 20
+
+
+class PointFile:
+    """
+    A point file mapped into memory.
+
+    Attributes:
+    - points (PointArray): The coordinates, backed by the mapped file.
+    - codes (np.ndarray | None): The color code of every point (mapped), or None.
+    - palette (List[str]): The color names, indexed by code.
+    """
+    __slots__ = ('path', 'points', 'codes', 'palette')
+
+    def __init__(self, path: str, points: PointArray, codes: Optional[np.ndarray], palette: List[str]):
+        self.path = path
+        self.points = points
+        self.codes = codes
+        self.palette = palette
+
+    def __len__(self):
+        return len(self.points)
+
+    def colors(self) -> Optional[List[str]]:
+        """The color name of every point, or None if the file has no colors."""
+        if self.codes is None:
+            return None
+        return [self.palette[code] for code in self.codes.tolist()]
+
+    def to_points(self) -> List[Point]:
+        """Converts the file into Point objects, or ColoredPoint objects if it has colors."""
+        colors = self.colors()
+        if colors is None:
+            return self.points.to_points()
+        return [ColoredPoint(color, x, y)
+                for color, x, y in zip(colors, self.points.x.tolist(), self.points.y.tolist())]
+
+    def __repr__(self):
+        return f"PointFile({self.path!r}, n={len(self)}, dtype={self.points.dtype}, colors={len(self.palette)})"
+
+
+def _read_header(f) -> Tuple[np.dtype, int, bool, int, int]:
+    """Reads and validates a header: (dtype, count, has colors, palette offset, palette length)."""
+    raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError("not a point file: truncated header")
+    magic, version, flags, dtype, count, palette_offset, palette_length = _HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError("not a point file: bad magic")
+    if version != VERSION:
+        raise ValueError(f"unsupported point file version {version}")
+    dtype = dtype.rstrip(b'\x00')
+    if dtype not in _DTYPES:
+        raise ValueError(f"unsupported coordinate dtype {dtype!r}")
+    return _DTYPES[dtype], count, bool(flags & FLAG_COLORS), palette_offset, palette_length
+
+
+class PointFileWriter:
+    """
+    Writes a point file chunk by chunk. The number of points must be known
+    up front, so both coordinate arrays can be written in place as the
+    chunks arrive. Use as a context manager, or call close().
+    """
+
+    def __init__(self, path: str, count: int, dtype: Union[str, np.dtype] = 'float64', colors: bool = False):
+        """
+        Initialize a PointFileWriter instance.
+
+        Parameters:
+        - path (str): The file to create (overwritten if it exists).
+        - count (int): The total number of points that will be written.
+        - dtype (str | np.dtype): int64 or float64 coordinates.
+        - colors (bool): Whether every chunk comes with color names.
+        """
+        self.dtype = np.dtype(dtype).newbyteorder('<')
+        if self.dtype.str.encode() not in _DTYPES:
+            raise ValueError("dtype must be int64 or float64")
+        self.path = path
+        self.count = count
+        self.written = 0
+        self._colors = colors
+        self._palette: Dict[str, int] = {}
+        self._file = open(path, 'wb')
+        self._file.truncate(self._data_end())
+
+    def _data_end(self) -> int:
+        """The offset just past the coordinate (and color code) arrays."""
+        per_point = 2 * self.dtype.itemsize + (_CODE_DTYPE.itemsize if self._colors else 0)
+        return HEADER_SIZE + self.count * per_point
+
+    def write(self, x, y, colors: Optional[Sequence[str]] = None) -> None:
+        """
+        Appends a chunk of points.
+
+        Parameters:
+        - x, y (array-like): The coordinates of the chunk.
+        - colors (Sequence[str] | None): The color of every point of the
+          chunk; required exactly when the writer was created with colors=True.
+        """
+        x = np.asarray(x, dtype=self.dtype)
+        y = np.asarray(y, dtype=self.dtype)
+        n = len(x)
+        if len(y) != n:
+            raise ValueError("x and y must have the same length")
+        if self.written + n > self.count:
+            raise ValueError(f"more than the declared {self.count} points written")
+        if (colors is not None) != self._colors:
+            raise ValueError("colors must be given exactly when the file has colors")
+
+        itemsize = self.dtype.itemsize
+        f = self._file
+        f.seek(HEADER_SIZE + self.written * itemsize)
+        f.write(x.tobytes())
+        f.seek(HEADER_SIZE + (self.count + self.written) * itemsize)
+        f.write(y.tobytes())
+        if colors is not None:
+            if len(colors) != n:
+                raise ValueError("colors must give one color per point")
+            codes = np.fromiter((self._palette.setdefault(c, len(self._palette)) for c in colors),
+                                dtype=_CODE_DTYPE, count=n)
+            f.seek(HEADER_SIZE + 2 * self.count * itemsize + self.written * _CODE_DTYPE.itemsize)
+            f.write(codes.tobytes())
+        self.written += n
+
+    def close(self) -> None:
+        """Writes the color dictionary and the header, and closes the file."""
+        if self._file.closed:
+            return
+        try:
+            if self.written != self.count:
+                raise ValueError(f"{self.written} points written, {self.count} declared")
+            palette_offset = palette_length = 0
+            if self._colors:
+                palette = json.dumps(list(self._palette)).encode()
+                palette_offset, palette_length = self._data_end(), len(palette)
+                self._file.seek(palette_offset)
+                self._file.write(palette)
+            header = _HEADER.pack(MAGIC, VERSION, FLAG_COLORS if self._colors else 0,
+                                  self.dtype.str.encode(), self.count, palette_offset, palette_length)
+            self._file.seek(0)
+            self._file.write(header.ljust(HEADER_SIZE, b'\x00'))
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+def write_points(path: str, points: Union[List[Point], PointArray],
+                 colors: Optional[Sequence[str]] = None) -> None:
+    """
+    Writes points to a point file.
+
+    Parameters:
+    - path (str): The file to create.
+    - points (List[Point] | PointArray): The points. The colors of a list
+      of ColoredPoint are stored automatically.
+    - colors (Sequence[str] | None): The color of every point, overriding
+      the colors of ColoredPoint objects.
+    """
+    if not isinstance(points, PointArray):
+        if colors is None and points and all(isinstance(p, ColoredPoint) for p in points):
+            colors = [p.color for p in points]
+        points = PointArray.from_points(points)
+    if colors is not None and len(colors) != len(points):
+        raise ValueError("colors must give one color per point")
+
+    n = len(points)
+    with PointFileWriter(path, n, points.dtype, colors is not None) as writer:
+        for lo in range(0, n, CHUNK_SIZE):
+            hi = min(n, lo + CHUNK_SIZE)
+            writer.write(points.x[lo:hi], points.y[lo:hi], None if colors is None else colors[lo:hi])
+
+
+def _read_palette(f, offset: int, length: int) -> List[str]:
+    """Reads the JSON color dictionary of a file."""
+    f.seek(offset)
+    return json.loads(f.read(length).decode())
+
+
+def open_points(path: str) -> PointFile:
+    """
+    Maps a point file into memory without reading it.
+
+    Parameters:
+    - path (str): The point file.
+
+    Returns:
+    - (PointFile): The points, whose x and y arrays are read-only views of
+      the file, and the colors if the file has any.
+    """
+    with open(path, 'rb') as f:
+        dtype, count, has_colors, palette_offset, palette_length = _read_header(f)
+        palette = _read_palette(f, palette_offset, palette_length) if has_colors else []
+
+    if count == 0:
+        empty = np.empty(0, dtype=dtype)
+        return PointFile(path, PointArray(empty, empty), np.empty(0, _CODE_DTYPE) if has_colors else None, palette)
+
+    coords = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(2, count))
+    codes = None
+    if has_colors:
+        codes = np.memmap(path, dtype=_CODE_DTYPE, mode='r',
+                          offset=HEADER_SIZE + 2 * count * dtype.itemsize, shape=(count,))
+    return PointFile(path, PointArray(coords[0], coords[1]), codes, palette)
+
+
+def iter_points(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[PointArray, Optional[List[str]]]]:
+    """
+    Reads a point file chunk by chunk with plain reads, holding one chunk in
+    memory at a time.
+
+    Parameters:
+    - path (str): The point file.
+    - chunk_size (int): The number of points per chunk.
+
+    Returns:
+    - (Iterator[Tuple[PointArray, List[str] | None]]): The chunks in file
+      order, each with the color names of its points (None without colors).
+    """
+    with open(path, 'rb') as f:
+        dtype, count, has_colors, palette_offset, palette_length = _read_header(f)
+        palette = _read_palette(f, palette_offset, palette_length) if has_colors else []
+        itemsize = dtype.itemsize
+        for lo in range(0, count, chunk_size):
+            n = min(chunk_size, count - lo)
+            f.seek(HEADER_SIZE + lo * itemsize)
+            x = np.fromfile(f, dtype=dtype, count=n)
+            f.seek(HEADER_SIZE + (count + lo) * itemsize)
+            y = np.fromfile(f, dtype=dtype, count=n)
+            colors = None
+            if has_colors:
+                f.seek(HEADER_SIZE + 2 * count * itemsize + lo * _CODE_DTYPE.itemsize)
+                colors = [palette[code] for code in np.fromfile(f, dtype=_CODE_DTYPE, count=n).tolist()]
+            yield PointArray(x, y), colors
@@ -0,0 +1,144 @@
+"""
+spatial.py
+
+This module provides SpatialIndex, a spatial index built once over a static
+set of points and then queried many times, instead of sorting the points
+from scratch for every closest_pair_distance call.
+
+The index is the array-backed KDTree of kdtree.py: the points live in flat
+NumPy arrays in tree order, and every query method takes a whole batch of
+probes and answers them together, one tree level at a time. Like the
+tree, the queries compute in float64; only closest_pair_in_box() runs the
+exact engines of algorithms.py on the points it collects.
+
+Key classes:
+- SpatialIndex(points): nearest(probes), within(probes, radius),
+  in_box(...), closest_pair_in_box(...), closest_pair() and all_nearest().
+"""
+
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .algorithms import ClosestPair, _as_point_array, _run_engine
+from .geometry import Point, PointArray
+from .kdtree import KDTree
+
+
+class SpatialIndex:
+    """
+    A static KD-tree index over a set of points.
+
+    Indices returned by the queries refer to the points the index was
+    built from.
+    """
+
+    def __init__(self, points: Union[List[Point], PointArray]):
+        """
+        Initialize a SpatialIndex instance.
+
+        Parameters:
+        - points (List[Point] | PointArray): The points to index. They are
+          not copied into the index, so a list of points must not change
+          while the index is used.
+        """
+        self.points = points
+        self._array = _as_point_array(points)
+        self._tree = KDTree(self._array.x, self._array.y)
+        self._closest: Optional[ClosestPair] = None
+
+    def __len__(self):
+        return len(self._array)
+
+    def __repr__(self):
+        return f"SpatialIndex(n={len(self)})"
+
+    def _pair(self, d: float, i: int, j: int, engine: str) -> ClosestPair:
+        """Builds a ClosestPair from the input indices of its points."""
+        i, j = sorted((i, j))
+        return ClosestPair(d, i, j, self.points[i], self.points[j], engine)
+
+    def nearest(self, probes: Union[List[Point], PointArray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the nearest indexed point of every probe.
+
+        Parameters:
+        - probes (List[Point] | PointArray): The query points.
+
+        Returns:
+        - (Tuple[np.ndarray, np.ndarray]): For every probe, the distance to
+          its nearest point and that point's index (inf and -1 if the index
+          is empty).
+        """
+        probes = _as_point_array(probes)
+        return self._tree.nearest(probes.x, probes.y)
+
+    def within(self, probes: Union[List[Point], PointArray],
+               radius: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds all indexed points within a radius of every probe.
+
+        Parameters:
+        - probes (List[Point] | PointArray): The query points.
+        - radius (float | np.ndarray): The radius (distance at most radius),
+          or one radius per probe.
+
+        Returns:
+        - (Tuple[np.ndarray, np.ndarray]): The probe position and the point
+          index of every match, sorted by probe and then by point.
+        """
+        probes = _as_point_array(probes)
+        return self._tree.within(probes.x, probes.y, radius)
+
+    def in_box(self, x_min: float, y_min: float, x_max: float, y_max: float) -> np.ndarray:
+        """
+        Finds the indexed points inside an axis-aligned box, borders included.
+
+        Returns:
+        - (np.ndarray): The indices of the points, in increasing order.
+        """
+        return self._tree.in_box(x_min, y_min, x_max, y_max)
+
+    def closest_pair_in_box(self, x_min: float, y_min: float,
+                            x_max: float, y_max: float) -> Optional[ClosestPair]:
+        """
+        Finds the closest pair among the indexed points inside a box.
+
+        The points in the box are collected from the index and solved with
+        the engine closest_pair() would choose for them.
+
+        Returns:
+        - (ClosestPair | None): The closest pair, or None if the box holds
+          fewer than two points.
+        """
+        inside = self.in_box(x_min, y_min, x_max, y_max)
+        if len(inside) < 2:
+            return None
+        info = {}
+        d, i, j = _run_engine(PointArray(self._array.x[inside], self._array.y[inside]), 'auto', info)
+        return self._pair(d, int(inside[i]), int(inside[j]), info['engine'])
+
+    def closest_pair(self) -> Optional[ClosestPair]:
+        """
+        Finds the closest pair of all indexed points from the tree, without
+        sorting the points again. The answer is computed once and cached.
+
+        Returns:
+        - (ClosestPair | None): The closest pair, or None if there are fewer
+          than two points.
+        """
+        if self._closest is None and len(self) >= 2:
+            d, i, j = self._tree.closest_pair()
+            self._closest = self._pair(d, i, j, 'kdtree')
+        return self._closest
+
+    def all_nearest(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the nearest other indexed point of every indexed point, as
+        neighbors.all_nearest_neighbors() does.
+
+        Returns:
+        - (Tuple[np.ndarray, np.ndarray]): For every point, the distance to
+          its nearest neighbour and the neighbour's index.
+        """
+        return self._tree.all_nearest()
@@ -0,0 +1,493 @@
+# frames.py
+"""
+Renders the figures of a traced closest pair run in parallel.
+FrameRecorder is a trace sink that turns events into frame descriptions:
+small tuples naming the points involved by index, recorded during the run
+without drawing anything. render_frames() draws them afterwards in a
+process pool. Every worker receives the points once, builds one scatter
+figure and one array figure, and for each frame only updates the artists
+that change (highlighted points, compared pair, lines, strip, title) before
+saving it. Frames can be decimated or capped to a budget, and written as
+numbered PNGs or combined into one animation.
+"""
+
+import math
+import os
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .trace import EventKind, TraceEvent
+
+# The scatter frames show this square of the plane, as the report always did.
+PLOT_LIMIT = 64
+
+
+class PointsFrame(NamedTuple):
+    """A scatter plot of all points. Indices refer to the points sorted by x."""
+    title: str
+    best: Optional[Tuple[int, int, float]]         # The global minimum pair so far.
+    dividers: int                                  # How many dividing lines of the run to draw.
+    δ: Optional[float] = None                      # The local minimum.
+    pairs: Tuple[Tuple[int, int, float], ...] = ()
+    highlight: Tuple[int, int] = (0, 0)            # Half-open index range.
+    vertical_line_x: Optional[float] = None
+    divide_label: Optional[int] = None
+    strip: Optional[Tuple[float, float]] = None
+
+
+class ArrayFrame(NamedTuple):
+    """A row of cells showing some points, in the given order."""
+    title: str
+    best_dist: float
+    cells: Sequence[int]
+    left_size: Optional[int] = None                # Draw the divide after this many cells.
+    arrow_index: Optional[int] = None              # Point at the mid cell.
+
+
+Frame = Union[PointsFrame, ArrayFrame]
+
+
+class FrameRecorder:
+    """
+    A trace sink that records the frames of a run: the figures the
+    step-by-step report shows, one scatter and one array frame per step.
+    """
+
+    def __init__(self):
+        self.frames: List[Frame] = []
+        self.points: Sequence = ()
+        self.dividers: List[Tuple[float, int]] = []
+        self._reset()
+
+    def _reset(self):
+        self.best = None
+        self.subset: Sequence[int] = ()    # Subset brute forced, or strip sorted by y.
+        self.in_strip = False
+        self.local_dist = math.inf
+
+    def _points(self, title, δ=None, **options):
+        self.frames.append(PointsFrame(title, self.best, len(self.dividers), δ, **options))
+
+    def _array(self, cells, title, **options):
+        best_dist = self.best[2] if self.best else math.inf
+        self.frames.append(ArrayFrame(title, best_dist, cells, **options))
+
+    def __call__(self, event: TraceEvent, points: Sequence) -> None:
+        kind, depth, a, b, c, value = event
+        if kind == EventKind.START:
+            self.frames = []
+            self.points = points
+            self.dividers = []
+            self._reset()
+            self._points("Initial Set of Points")
+            self._array(range(len(points)), "Initial Sorted Array")
+
+        elif kind == EventKind.DIVIDE:
+            self._array(range(a, b), f"Array at depth {depth}")
+            self.dividers.append((value, depth))
+            self._points("Divide Step", δ=math.inf, vertical_line_x=value, divide_label=depth)
+            self._array(range(a, b), f"Divide Step Array (depth {depth})", left_size=c - a, arrow_index=c - a)
+
+        elif kind == EventKind.BRUTE_FORCE:
+            self.subset = range(a, b)
+            self.in_strip = False
+            self.local_dist = math.inf
+            self._array(self.subset, f"Array at depth {depth}")
+            self._points("Brute Force on Small Subset", δ=self.local_dist, highlight=(a, b))
+            self._array(self.subset, "Brute Force Subset Array")
+
+        elif kind == EventKind.STRIP:
+            self.subset = tuple(sorted(range(a, b), key=lambda i: points[i].y))
+            self.in_strip = True
+            self.local_dist = value
+            if b > a:
+                mid_x = points[c].x
+                self._points("Strip Construction", δ=value, strip=(mid_x - value, mid_x + value))
+                self._array(range(a, b), f"Strip Array (depth {depth})")
+                self._points("Checking Strip for Closer Pairs", δ=value)
+                self._array(self.subset, "Strip Array (after sorting by y)")
+
+        elif kind == EventKind.COMPARE:
+            pairs = ((a, b, value),)
+            highlight = (0, 0) if self.in_strip else (self.subset.start, self.subset.stop)
+            prefix = "Strip" if self.in_strip else "Brute Force"
+            self._points(f"{prefix} Comparison", δ=self.local_dist, pairs=pairs, highlight=highlight)
+            self._array(self.subset, f"{prefix} Comparison Array")
+            if value >= self.local_dist:
+                # Otherwise a NEW_MIN event follows.
+                title = "Strip Comparison No Improvement" if self.in_strip else "Brute Force No Improvement"
+                self._points(title, δ=self.local_dist, pairs=pairs, highlight=highlight)
+                self._array(self.subset, f"{prefix} No Improvement Array")
+
+        elif kind == EventKind.NEW_MIN:
+            self.local_dist = value
+            if self.best is None or value < self.best[2]:
+                self.best = (a, b, value)
+            pairs = ((a, b, value),)
+            if self.in_strip:
+                self._points("Strip New Minimum Found", δ=value, pairs=pairs)
+                self._array(self.subset, "Strip New Minimum Array")
+            else:
+                self._points("Brute Force New Minimum Found", δ=value, pairs=pairs,
+                             highlight=(self.subset.start, self.subset.stop))
+                self._array(self.subset, "Brute Force New Min Array")
+
+        elif kind == EventKind.RESULT:
+            self._points("Subproblem Result", δ=value)
+            self._array(range(a, b), f"Subproblem Result Array (depth {depth})")
+
+        elif kind == EventKind.FINISH:
+            self._points("Final Result", δ=value)
+            self._array(range(len(points)), "Final Array Result")
+
+    def render(self, output_dir: str, **options) -> List[Optional[str]]:
+        """Renders the recorded frames; see render_frames for the options."""
+        return render_frames(self.frames, self.points, self.dividers, output_dir, **options)
+
+
+def select_frames(n: int, every: int = 1, max_frames: Optional[int] = None) -> List[int]:
+    """
+    Picks the frames to render.
+
+    Parameters:
+    - n (int): The number of frames.
+    - every (int): Keep every `every`-th frame (the last frame is always kept).
+    - max_frames (int | None): Keep at most this many frames, evenly spread
+      over the decimated ones, first and last included.
+
+    Returns:
+    - (List[int]): The positions of the kept frames, in order.
+    """
+    if every < 1:
+        raise ValueError("every must be at least 1")
+    kept = list(range(0, n, every))
+    if n and kept[-1] != n - 1:
+        kept.append(n - 1)
+    if max_frames is not None and len(kept) > max_frames:
+        if max_frames < 1:
+            return []
+        if max_frames == 1:
+            return [kept[-1]]
+        step = (len(kept) - 1) / (max_frames - 1)
+        kept = [kept[round(k * step)] for k in range(max_frames)]
+    return kept
+
+
+# Per-process rendering state, set up by _init_worker.
+_worker: Dict[str, object] = {}
+
+
+def _init_worker(xs: List[float], ys: List[float], colors: List[Optional[str]],
+                 dividers: List[Tuple[float, int]], dpi: int) -> None:
+    """Pool initializer: keeps the points of the run; the canvases are built on first use."""
+    _worker.clear()
+    _worker.update(xs=xs, ys=ys, colors=colors, dividers=dividers, dpi=dpi)
+
+
+def _render_frame(task: Tuple[Frame, str]) -> str:
+    """Worker task: draws one frame on the worker's figure and saves it."""
+    frame, path = task
+    kind = _PointsCanvas if isinstance(frame, PointsFrame) else _ArrayCanvas
+    if kind not in _worker:
+        _worker[kind] = kind(_worker['xs'], _worker['ys'], _worker['colors'], _worker['dpi'])
+    canvas = _worker[kind]
+    canvas.draw(frame, _worker['dividers'])
+    canvas.save(path)
+    return path
+
+
+def _face(color: Optional[str]) -> str:
+    return color if color else 'white'
+
+
+class _Canvas:
+    """A figure drawn with the Agg backend directly, without pyplot."""
+
+    def __init__(self, xs, ys, colors, figsize, dpi):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.xs, self.ys, self.colors = xs, ys, colors
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+
+    def save(self, path: str):
+        """Saves what was last drawn as a PNG file."""
+        import numpy as np
+        from PIL import Image
+
+        # Fast zlib level: these files are written once and mostly flat colour.
+        Image.fromarray(np.asarray(self.canvas.buffer_rgba())).save(path, compress_level=1)
+
+
+class _PointsCanvas(_Canvas):
+    """
+    One scatter figure for all PointsFrames. The axes, grid and points are
+    drawn once and kept as a background; every frame restores it and draws
+    only its own artists (animated, so a full draw leaves them out) on top.
+    """
+
+    def __init__(self, xs, ys, colors, dpi):
+        from matplotlib.patches import Rectangle
+
+        super().__init__(xs, ys, colors, (8, 8), dpi)
+        ax = self.ax
+
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, color in enumerate(colors):
+            groups.setdefault(color, []).append(i)
+        self.base = [ax.scatter([xs[i] for i in members], [ys[i] for i in members], c=_face(color), s=30,
+                                edgecolors='black', linewidths=0.5, zorder=2, alpha=0.3, label=f"{color} points")
+                     for color, members in groups.items()]
+
+        self.strip = ax.add_patch(Rectangle((0, 0), 0, 1, transform=ax.get_xaxis_transform(), color='yellow',
+                                            alpha=0.2, label='Strip Region', zorder=0))
+        self.divide_line = ax.axvline(0, color='red', linestyle='--', linewidth=1.5, label='Dividing Line',
+                                      zorder=1, alpha=1.0)
+        self.divide_text = ax.text(0, PLOT_LIMIT, "", color='red', fontsize=12, ha='center', va='top', alpha=1.0)
+        self.highlight = ax.scatter([], [], s=100, edgecolors='black', linewidths=1, zorder=3, alpha=1.0,
+                                    label='Highlighted Points')
+        self.compared = ax.scatter([], [], s=100, edgecolors='black', linewidths=1, zorder=5, alpha=1.0,
+                                   label='Compared Points')
+        self.best_line, = ax.plot([], [], 'r-', linewidth=3.0, zorder=6, alpha=1.0, label='Global Minimum Pair')
+        self.best_text = ax.text(0, 0, "", color='red', fontsize=10, ha='center', va='top')
+        self.pair_lines = []        # (line, text) per drawn comparison pair, reused.
+        self.divider_lines = []     # (line, text) per dividing line of the run, reused.
+
+        ax.set_xlim(0, PLOT_LIMIT)
+        ax.set_ylim(0, PLOT_LIMIT)
+        ax.set_xticks(range(0, 61, 10))
+        ax.set_yticks(range(0, 61, 10))
+        ax.grid(which='major', color='black', linestyle='-', linewidth=1)
+        ax.minorticks_on()
+        ax.grid(which='minor', color='grey', linestyle=':', linewidth=0.5)
+        ax.set_xlabel('X')
+        ax.set_ylabel('Y')
+        self.title = ax.set_title("")
+        for artist in (self.strip, self.divide_line, self.divide_text, self.highlight, self.compared,
+                       self.best_line, self.best_text, self.title):
+            artist.set_animated(True)
+
+        # Lay out for the tallest title, then keep everything else as the background.
+        self.title.set_text("\n\n")
+        self.figure.tight_layout()
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+    def _scatter(self, collection, indices):
+        import numpy as np
+
+        indices = list(indices)
+        collection.set_visible(bool(indices))
+        collection.set_offsets(np.array([[self.xs[i], self.ys[i]] for i in indices]).reshape(-1, 2))
+        collection.set_facecolor([_face(self.colors[i]) for i in indices])
+
+    def _line(self, pool, **options):
+        """A new animated (line, text) pair, added to a pool."""
+        line, = self.ax.plot([], [], **options)
+        text = self.ax.text(0, 0, "")
+        line.set_animated(True)
+        text.set_animated(True)
+        pool.append((line, text))
+        return line, text
+
+    def draw(self, frame: PointsFrame, dividers: List[Tuple[float, int]]):
+        ax, xs, ys = self.ax, self.xs, self.ys
+        self._scatter(self.highlight, range(*frame.highlight))
+
+        while len(self.pair_lines) < len(frame.pairs):
+            _, text = self._line(self.pair_lines, color='g', linestyle='--', linewidth=1.5, zorder=4, alpha=1.0,
+                                 label='Comparison Pair')
+            text.update(dict(color='black', fontsize=10, ha='center', va='bottom'))
+        compared = []
+        for k, (line, text) in enumerate(self.pair_lines):
+            visible = k < len(frame.pairs)
+            line.set_visible(visible)
+            text.set_visible(visible)
+            if visible:
+                i, j, d = frame.pairs[k]
+                line.set_data([xs[i], xs[j]], [ys[i], ys[j]])
+                text.set_position(((xs[i] + xs[j]) / 2, (ys[i] + ys[j]) / 2))
+                text.set_text(f"δ={d:.4f}")
+                compared.extend(p for p in (i, j) if p not in compared)
+        self._scatter(self.compared, compared)
+
+        self.best_line.set_visible(frame.best is not None)
+        self.best_text.set_visible(frame.best is not None)
+        best_dist = math.inf
+        if frame.best is not None:
+            i, j, best_dist = frame.best
+            self.best_line.set_data([xs[i], xs[j]], [ys[i], ys[j]])
+            self.best_text.set_position(((xs[i] + xs[j]) / 2, (ys[i] + ys[j]) / 2))
+            self.best_text.set_text(f"Global Min δ={best_dist:.4f}")
+
+        while len(self.divider_lines) < frame.dividers:
+            x, label = dividers[len(self.divider_lines)]
+            line, text = self._line(self.divider_lines, color='red', linestyle='--', linewidth=1.5, zorder=1,
+                                    alpha=0.3, transform=ax.get_xaxis_transform())
+            line.set_data([x, x], [0, 1])
+            text.update(dict(x=x, y=PLOT_LIMIT, text=f"$n_{{{label}}}$", color='red', fontsize=12, ha='center',
+                             va='top', alpha=0.3))
+        for k, (line, text) in enumerate(self.divider_lines):
+            line.set_visible(k < frame.dividers)
+            text.set_visible(k < frame.dividers)
+
+        self.divide_line.set_visible(frame.vertical_line_x is not None)
+        self.divide_text.set_visible(frame.vertical_line_x is not None and frame.divide_label is not None)
+        if frame.vertical_line_x is not None:
+            self.divide_line.set_xdata([frame.vertical_line_x, frame.vertical_line_x])
+            self.divide_text.set_x(frame.vertical_line_x)
+            self.divide_text.set_text(f"$n_{{{frame.divide_label}}}$")
+
+        self.strip.set_visible(frame.strip is not None)
+        if frame.strip is not None:
+            left_x, right_x = frame.strip
+            self.strip.set_x(left_x)
+            self.strip.set_width(right_x - left_x)
+
+        if frame.δ is not None:
+            self.title.set_text(f"{frame.title}\nLocal minimal δ: {frame.δ:.4f}\nGlobal minimal δ: {best_dist:.4f}")
+        elif best_dist < math.inf:
+            self.title.set_text(f"{frame.title}\nGlobal minimal δ: {best_dist:.4f}")
+        else:
+            self.title.set_text(frame.title)
+
+        handles = {}
+        for artist in self.base + [self.highlight, self.compared] + [line for line, _ in self.pair_lines] + \
+                [self.best_line, self.divide_line, self.strip]:
+            if artist.get_visible():
+                handles.setdefault(artist.get_label(), artist)
+        legend = ax.legend(handles.values(), handles.keys(), loc='best')
+        legend.set_animated(True)
+
+        self.canvas.restore_region(self.background)
+        artists = [self.strip, self.divide_line, self.divide_text, self.highlight, self.compared,
+                   self.best_line, self.best_text, self.title, legend]
+        artists += [artist for pair in self.divider_lines + self.pair_lines for artist in pair]
+        for artist in sorted(artists, key=lambda a: a.get_zorder()):
+            if artist.get_visible():
+                ax.draw_artist(artist)
+
+
+class _ArrayCanvas(_Canvas):
+    """One figure for all ArrayFrames; the table of every row length is built once and reused."""
+
+    def __init__(self, xs, ys, colors, dpi):
+        super().__init__(xs, ys, colors, (10, 2), dpi)
+        self.ax.set_axis_off()
+        self.tables = {}
+        self.divide_line, = self.ax.plot([0, 0], [1.2, -0.2], color='red', linestyle='--', linewidth=2)
+        self.mid_arrow = self.ax.annotate("← mid", xy=(0.5, 0.5), xycoords=('data', 'axes fraction'),
+                                          xytext=(0.5, 1.2), textcoords=('data', 'axes fraction'),
+                                          arrowprops=dict(facecolor='blue', shrink=0.05),
+                                          ha='center', va='bottom', color='blue', fontsize=10)
+        self.title = self.ax.set_title("")
+        self.figure.tight_layout()
+
+    def _table(self, n: int):
+        from matplotlib.table import table
+
+        if n not in self.tables:
+            cells = table(self.ax, cellText=[["" for _ in range(n)]], cellLoc='center', loc='center',
+                          edges='closed')
+            for i in range(n):
+                cells.auto_set_column_width(i)
+            self.tables[n] = cells
+        return self.tables[n]
+
+    def draw(self, frame: ArrayFrame, dividers):
+        n = len(frame.cells)
+        cells = self._table(n)
+        for size, other in self.tables.items():
+            other.set_visible(size == n)
+        for k, i in enumerate(frame.cells):
+            cell = cells[0, k]
+            color = self.colors[i]
+            cell.get_text().set_text(f"{self.xs[i]},{self.ys[i]}")
+            cell.set_facecolor(_face(color))
+            cell.get_text().set_color('white' if color == 'black' else 'black')
+        self.ax.set_xlim(0, max(n, 1))
+        self.ax.set_ylim(-0.2, 1.2)
+
+        self.divide_line.set_visible(frame.left_size is not None and frame.left_size < n)
+        if frame.left_size is not None:
+            self.divide_line.set_xdata([frame.left_size, frame.left_size])
+        self.mid_arrow.set_visible(frame.arrow_index is not None and frame.arrow_index < n)
+        if frame.arrow_index is not None:
+            self.mid_arrow.xy = (frame.arrow_index + 0.5, 0.5)
+            self.mid_arrow.xyann = (frame.arrow_index + 0.5, 1.2)
+
+        if frame.best_dist < math.inf:
+            self.title.set_text(f"{frame.title}\nGlobal minimum δ: {frame.best_dist:.4f}")
+        else:
+            self.title.set_text(frame.title)
+        self.canvas.draw()
+
+
+def _save_animation(paths: List[str], path: str, fps: float) -> None:
+    """Combines rendered PNG frames into one animation (any format Pillow writes, e.g. GIF)."""
+    from PIL import Image
+
+    images = [Image.open(p) for p in paths]
+    try:
+        images[0].save(path, save_all=True, append_images=images[1:], duration=round(1000 / fps), loop=0)
+    finally:
+        for image in images:
+            image.close()
+
+
+def render_frames(frames: Sequence[Frame], points: Sequence, dividers: Sequence[Tuple[float, int]],
+                  output_dir: str, workers: Optional[int] = None, every: int = 1,
+                  max_frames: Optional[int] = None, animation: Optional[str] = None,
+                  fps: float = 2, dpi: int = 150) -> List[Optional[str]]:
+    """
+    Renders frames recorded by a FrameRecorder in a process pool.
+
+    Parameters:
+    - frames (Sequence[Frame]): The frames.
+    - points (Sequence): The points of the run, sorted by x (with a color
+      attribute for ColoredPoints).
+    - dividers (Sequence[Tuple[float, int]]): The dividing lines of the run
+      (x, depth), as recorded by the FrameRecorder.
+    - output_dir (str): Directory of the PNG files, created if needed.
+    - workers (int | None): Number of rendering processes (default: CPU
+      count); 1 renders in this process.
+    - every, max_frames: Decimation and frame budget; see select_frames.
+    - animation (str | None): If given, only the scatter frames are rendered
+      and then combined into this animation file (e.g. "run.gif").
+    - fps (float): Frames per second of the animation.
+    - dpi (int): Resolution of the PNG files.
+
+    Returns:
+    - (List[Optional[str]]): The PNG file of every frame, None for frames
+      that were not rendered; with animation, just the animation file.
+    """
+    candidates = [k for k, frame in enumerate(frames) if not animation or isinstance(frame, PointsFrame)]
+    chosen = [candidates[k] for k in select_frames(len(candidates), every, max_frames)]
+    paths: List[Optional[str]] = [None] * len(frames)
+    if not chosen:
+        return [] if animation else paths
+
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(frames[k], os.path.join(output_dir, f"frame_{k:05d}.png")) for k in chosen]
+    initargs = ([p.x for p in points], [p.y for p in points],
+                [getattr(p, 'color', None) for p in points], list(dividers), dpi)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+
+    if workers <= 1:
+        _init_worker(*initargs)
+        rendered = [_render_frame(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            rendered = list(pool.map(_render_frame, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+    if animation:
+        _save_animation(rendered, animation, fps)
+        return [animation]
+    for k, path in zip(chosen, rendered):
+        paths[k] = path
+    return paths
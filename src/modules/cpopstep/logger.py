@@ -1,9 +0,0 @@
-# logger.py
-import sys
-from docx import Document
-
-doc = Document()
-
-def log_message(message: str):
-    print(message)
-    doc.add_paragraph(message)
@@ -0,0 +1,225 @@
+# trace.py
+"""
+Records what the step-by-step closest pair algorithm does as
+structured trace events, instead of formatting a log message for every step.
+
+Events are appended to a Trace, a compact columnar buffer holding one
+array.array per field, and refer to points by their index in the x-sorted
+input. Recording an event therefore builds no strings and keeps no Python
+object per event. Turning events into text or figures is the job of sinks:
+every sink attached to a Tracer is called with each event as it happens,
+and nothing is formatted when no sink is attached. Without a Tracer, the
+algorithm skips recording altogether.
+
+Key classes:
+- EventKind: the event types and the meaning of their fields.
+- TraceEvent: one event, as handed to sinks or read back from a Trace.
+- Trace: the compact event buffer.
+- Tracer: records events into a Trace and forwards them to sinks.
+- ConsoleSink: prints every event as human-readable messages.
+
+Key functions:
+- format_event(event, points): the messages describing an event.
+"""
+
+import math
+import sys
+from array import array
+from enum import IntEnum
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO
+
+from .geometry import Point
+
+
+class EventKind(IntEnum):
+    """
+    The types of trace events. Indices i, j, lo, hi and mid refer to the
+    points sorted by x; ranges are half-open.
+
+    - START: a run begins; a = number of points.
+    - DIVIDE: points lo..hi are split at mid; a, b, c = lo, hi, mid and
+      value = x of the dividing line.
+    - BRUTE_FORCE: points lo..hi are brute forced; a, b = lo, hi.
+    - COMPARE: the distance of a pair is computed; a, b = i, j, value = distance.
+    - NEW_MIN: that pair is closer than the subproblem's minimum so far;
+      a, b = i, j, value = distance.
+    - STRIP: the strip around the dividing line holds points lo..hi; a, b,
+      c = lo, hi, mid and value = the minimum of both halves.
+    - STRIP_STOP: the strip scan of i stops at j; a, b = i, j and value =
+      their vertical distance.
+    - RESULT: the subproblem lo..hi is solved; a, b = lo, hi, value = its minimum.
+    - FINISH: the run ends; value = the closest pair distance.
+    """
+    START = 0
+    DIVIDE = 1
+    BRUTE_FORCE = 2
+    COMPARE = 3
+    NEW_MIN = 4
+    STRIP = 5
+    STRIP_STOP = 6
+    RESULT = 7
+    FINISH = 8
+
+
+class TraceEvent(NamedTuple):
+    """One trace event; see EventKind for the meaning of the fields."""
+    kind: EventKind
+    depth: int          # Recursion depth of the subproblem.
+    a: int
+    b: int
+    c: int
+    value: float
+
+
+Sink = Callable[[TraceEvent, Sequence[Point]], None]
+
+
+class Trace:
+    """
+    A compact buffer of trace events, stored column by column.
+    """
+    __slots__ = ('kinds', 'depths', 'a', 'b', 'c', 'values')
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.depths = array('i')
+        self.a = array('q')
+        self.b = array('q')
+        self.c = array('q')
+        self.values = array('d')
+
+    def append(self, kind: int, depth: int, a: int, b: int, c: int, value: float) -> None:
+        """Appends one event."""
+        self.kinds.append(kind)
+        self.depths.append(depth)
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, k: int) -> TraceEvent:
+        return TraceEvent(EventKind(self.kinds[k]), self.depths[k], self.a[k], self.b[k],
+                          self.c[k], self.values[k])
+
+    def __iter__(self) -> Iterator[TraceEvent]:
+        for k in range(len(self)):
+            yield self[k]
+
+    def count(self, kind: EventKind) -> int:
+        """The number of events of one kind."""
+        return self.kinds.count(kind)
+
+    def replay(self, sink: Sink, points: Sequence[Point]) -> None:
+        """Feeds every recorded event to a sink, as if it were attached during the run."""
+        for event in self:
+            sink(event, points)
+
+
+class Tracer:
+    """
+    Records the events of a run and forwards them to the attached sinks.
+    """
+
+    def __init__(self, sinks: Iterable[Sink] = (), record: bool = True):
+        """
+        Initialize a Tracer instance.
+
+        Parameters:
+        - sinks (Iterable[Callable]): Called with (event, points) for every
+          event, where points are the input sorted by x.
+        - record (bool): Whether to keep the events in self.trace.
+        """
+        self.sinks: List[Sink] = list(sinks)
+        self.trace: Optional[Trace] = Trace() if record else None
+        self.points: Sequence[Point] = ()
+
+    def attach(self, sink: Sink) -> None:
+        """Attaches another sink."""
+        self.sinks.append(sink)
+
+    def start(self, points: Sequence[Point]) -> None:
+        """Begins a run over points sorted by x."""
+        self.points = points
+        self.emit(EventKind.START, 0, len(points))
+
+    def emit(self, kind: EventKind, depth: int = 0, a: int = -1, b: int = -1, c: int = -1,
+             value: float = math.nan) -> None:
+        """Records one event and hands it to the sinks."""
+        if self.trace is not None:
+            self.trace.append(kind, depth, a, b, c, value)
+        if self.sinks:
+            event = TraceEvent(EventKind(kind), depth, a, b, c, float(value))
+            for sink in self.sinks:
+                sink(event, self.points)
+
+
+def format_event(event: TraceEvent, points: Sequence[Point]) -> List[str]:
+    """
+    Describes an event in the words of the step-by-step log.
+
+    Parameters:
+    - event (TraceEvent): The event.
+    - points (Sequence[Point]): The points of the run, sorted by x.
+
+    Returns:
+    - (List[str]): One or more messages.
+    """
+    kind, depth, a, b, c, value = event
+    if kind == EventKind.START:
+        return ["[closest_pair_distance] Initiating closest pair computation.",
+                f"[closest_pair_distance] {a} points, sorted by x-coordinate:"] + \
+               [f"                       {p}" for p in points]
+    if kind == EventKind.DIVIDE:
+        return [f"[closest_pair_util] Divide and Conquer step at depth {depth}: {b - a} points.",
+                f"[closest_pair_util] Mid index: {c - a}, Mid point: {points[c]}, dividing line x = {value}",
+                f"[closest_pair_util] Left subset: {c - a} points, right subset: {b - c} points."]
+    if kind == EventKind.BRUTE_FORCE:
+        return [f"[brute_force] Brute forcing the closest pair of {b - a} points at depth {depth}:"] + \
+               [f"             {p}" for p in points[a:b]]
+    if kind == EventKind.COMPARE:
+        p, q = points[a], points[b]
+        dx = p.x - q.x
+        dy = p.y - q.y
+        d_squared = dx**2 + dy**2
+        return [f"[compare] Checking pair: {p} and {q}",
+                f"[compare] δx = {p.x} - {q.x} = {dx}",
+                f"[compare] δy = {p.y} - {q.y} = {dy}",
+                f"[compare] δ² = ({dx})² + ({dy})² = {d_squared}",
+                f"[compare] δ = sqrt({d_squared}) = {value}"]
+    if kind == EventKind.NEW_MIN:
+        return [f"[new_min] Found a smaller local distance: {value} between {points[a]} and {points[b]}"]
+    if kind == EventKind.STRIP:
+        return [f"[strip_closest] Checking the strip |x - {points[c].x}| < {value} at depth {depth}: "
+                f"{b - a} points."]
+    if kind == EventKind.STRIP_STOP:
+        return [f"[strip_closest] For {points[a]} and {points[b]}, vertical dist {value} >= current δ. "
+                f"Stop inner loop."]
+    if kind == EventKind.RESULT:
+        return [f"[closest_pair_util] Minimum distance of the subproblem at depth {depth}: {value}"]
+    if kind == EventKind.FINISH:
+        return [f"[closest_pair_distance] Closest pair distance result: {value}"]
+    return [str(event)]
+
+
+class ConsoleSink:
+    """
+    A sink that prints the messages of every event.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        """
+        Initialize a ConsoleSink instance.
+
+        Parameters:
+        - stream (TextIO | None): Where to write (default: sys.stdout at the
+          time of every event).
+        """
+        self.stream = stream
+
+    def __call__(self, event: TraceEvent, points: Sequence[Point]) -> None:
+        stream = self.stream or sys.stdout
+        for message in format_event(event, points):
+            print(message, file=stream)
@@ -0,0 +1,87 @@
+"""
+client.py
+
+This module is a small blocking client for the JSON-lines closest pair
+server of server.py. It only needs the standard library, so a short-lived
+client does not import NumPy at all.
+
+Key classes:
+- ServiceClient(host, port, path): one connection, with closest_pair(),
+  closest_pair_by_group(), stats() and request() for raw requests.
+"""
+
+import itertools
+import json
+import socket
+from typing import Hashable, Optional, Sequence
+
+
+class ServiceError(Exception):
+    """An error answered by the server."""
+
+
+class ServiceClient:
+    """
+    A connection to a closest pair server. Requests are sent one at a time
+    and wait for their answer.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, path: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        """
+        Initialize a ServiceClient instance and connect.
+
+        Parameters:
+        - host, port: The TCP address of the server.
+        - path (str | None): Connect to this Unix socket instead.
+        - timeout (float | None): Socket timeout in seconds.
+        """
+        if path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._file = self._socket.makefile('rb')
+        self._ids = itertools.count()
+
+    def request(self, request: dict) -> dict:
+        """
+        Sends one request and returns its answer.
+
+        Raises:
+        - ServiceError: If the server answers with an error.
+        """
+        request = dict(request, id=next(self._ids))
+        self._socket.sendall(json.dumps(request).encode() + b'\n')
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("the server closed the connection")
+        answer = json.loads(line)
+        if 'error' in answer:
+            raise ServiceError(answer['error'])
+        return answer
+
+    def closest_pair(self, points: Sequence[Sequence[float]], engine: str = 'auto') -> dict:
+        """The closest pair of the points: a dict with distance, i, j and engine."""
+        return self.request({'op': 'closest_pair', 'points': [list(p) for p in points], 'engine': engine})
+
+    def closest_pair_by_group(self, points: Sequence[Sequence[float]], groups: Sequence[Hashable]) -> dict:
+        """The closest pair of every group, as a dict from group to a pair dict."""
+        answer = self.request({'op': 'closest_pair_by_group', 'points': [list(p) for p in points],
+                               'groups': list(groups)})
+        return {label: pair for label, pair in answer['groups']}
+
+    def stats(self) -> dict:
+        """The statistics of the server."""
+        return self.request({'op': 'stats'})['stats']
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> 'ServiceClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
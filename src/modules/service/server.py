@@ -0,0 +1,456 @@
+"""
+server.py
+
+This module serves closest pair queries over a local socket, so that many
+short-lived clients share one warm interpreter instead of each paying for
+the interpreter start-up and the NumPy import.
+
+The protocol is JSON lines over TCP or a Unix socket: every request is one
+JSON object on one line and is answered by one JSON object on one line,
+carrying the request's "id". A client may send several requests without
+waiting; the answers come back as they are ready, not necessarily in order.
+
+Requests:
+- {"id": 1, "op": "closest_pair", "points": [[x, y], ...], "engine": "auto"}
+  -> {"id": 1, "distance": d, "i": i, "j": j, "engine": "dc"}
+- {"id": 2, "op": "closest_pair_by_group", "points": [[x, y], ...], "groups": [g, ...]}
+  -> {"id": 2, "groups": [[g, {"distance": d, "i": i, "j": j}], ...]}
+- {"id": 3, "op": "stats"} -> {"id": 3, "stats": {...}} (see ServiceStats)
+Without a pair (fewer than two points, or a group of one), distance, i and
+j are null; closest_pair answers always carry the engine. A request that
+cannot be served is answered {"id": ..., "error": message}.
+
+Small requests are not solved one at a time. The requests that arrive
+while a batch is being solved (or within batch_window seconds) are
+coalesced, and every batch is solved by one call of the per-group engine
+of groups.py, with every request (or every group of every request) as one
+group: a hundred small requests cost about one array pass instead of a
+hundred. That engine is the vectorized divide and conquer, so only
+closest_pair requests for "auto" or "dc" are batched; those asking for
+another engine are solved one by one with it, in the batch of their
+engine. Batches run on a helper thread, so the event loop keeps reading
+requests meanwhile. Requests of more than pool_min_points points are sent
+to a process pool instead, where they run closest_pair() with the
+requested engine or closest_pair_by_group().
+
+Key classes:
+- ClosestPairServer(...): the server, with start(), serve_forever(),
+  close() and stats().
+- ServiceStats: request counts, batch sizes, throughput and latencies.
+
+Key functions:
+- serve(...): runs a server until it is interrupted.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..cpop.algorithms import ENGINES, closest_pair
+from ..cpop.geometry import PointArray
+from ..cpop.groups import _closest_pair_per_group, closest_pair_by_group
+
+# Requests with more points than this run in the process pool.
+POOL_MIN_POINTS = 50_000
+
+# A batch stops taking requests once it holds this many points.
+BATCH_MAX_POINTS = 1_000_000
+
+# Longest request line accepted, in bytes.
+MAX_LINE_BYTES = 256 * 2**20
+
+# Number of recent requests the latency percentiles are computed over.
+LATENCY_WINDOW = 10_000
+
+OPS = ('closest_pair', 'closest_pair_by_group', 'stats')
+
+
+class _Request:
+    """A parsed point request waiting for its answer."""
+    __slots__ = ('op', 'points', 'groups', 'engine', 'future')
+
+    def __init__(self, op: str, points: PointArray, groups: Optional[list], engine: str,
+                 future: asyncio.Future):
+        self.op = op
+        self.points = points
+        self.groups = groups
+        self.engine = engine
+        self.future = future
+
+
+def _pair_json(d: float, i: int, j: int) -> dict:
+    """The JSON form of a pair; no pair (an infinite distance) is all null."""
+    if d == math.inf:
+        return {'distance': None, 'i': None, 'j': None}
+    i, j = sorted((int(i), int(j)))
+    return {'distance': float(d), 'i': i, 'j': j}
+
+
+def _parse_points(request: dict) -> PointArray:
+    """
+    The points of a request as a PointArray (int64 when all coordinates are
+    integers, object when neither int64 nor float64 holds them exactly).
+    """
+    raw = request.get('points')
+    if not isinstance(raw, list):
+        raise ValueError("points must be a list of [x, y] pairs")
+    if not raw:
+        return PointArray([], [])
+    array = np.asarray(raw)
+    if array.dtype.kind == 'f' and np.abs(array).max() >= 2**53:
+        # Large integers mixed with floats were rounded; keep the numbers
+        # themselves so that PointArray can hold them exactly.
+        array = np.asarray(raw, dtype=object)
+    if array.ndim != 2 or array.shape[1] != 2:
+        raise ValueError("points must be a list of [x, y] pairs")
+    if array.dtype.kind not in 'iufbO':
+        raise ValueError("coordinates must be numbers")
+    return PointArray(array[:, 0], array[:, 1])
+
+
+def _solve_batch(requests: Sequence[_Request]) -> List[dict]:
+    """
+    Solves small requests of one op, coordinate type and engine together,
+    every request (or every group of every request) being one group of a
+    single _closest_pair_per_group() call. closest_pair requests for an
+    engine other than "auto" and "dc" are solved one by one with it.
+
+    Returns:
+    - (List[dict]): The answer of every request, in order.
+    """
+    if requests[0].op == 'closest_pair' and requests[0].engine not in ('auto', 'dc'):
+        return [_solve_one(r.op, r.points, r.groups, r.engine) for r in requests]
+
+    sizes = np.array([len(r.points) for r in requests])
+    offsets = np.cumsum(sizes) - sizes
+    x = np.concatenate([r.points.x for r in requests])
+    y = np.concatenate([r.points.y for r in requests])
+
+    if requests[0].op == 'closest_pair':
+        group = np.repeat(np.arange(len(requests)), sizes)
+        if not len(x):
+            return [dict(_pair_json(math.inf, 0, 0), engine='dc') for _ in requests]
+        best_d, best_a, best_b = _closest_pair_per_group(x, y, group, len(requests))
+        return [dict(_pair_json(best_d[k], best_a[k] - offsets[k], best_b[k] - offsets[k]), engine='dc')
+                for k in range(len(requests))]
+
+    # Groups are numbered per (request, label), in order of first appearance.
+    codes: Dict[Tuple[int, Hashable], int] = {}
+    group = np.fromiter((codes.setdefault((k, label), len(codes))
+                         for k, r in enumerate(requests) for label in r.groups),
+                        dtype=np.int64, count=len(x))
+    answers = [{'groups': []} for _ in requests]
+    if not codes:
+        return answers
+    best_d, best_a, best_b = _closest_pair_per_group(x, y, group, len(codes))
+    for (k, label), code in codes.items():
+        pair = _pair_json(best_d[code], best_a[code] - offsets[k], best_b[code] - offsets[k])
+        answers[k]['groups'].append([label, pair])
+    return answers
+
+
+def _solve_one(op: str, points: PointArray, groups: Optional[list], engine: str) -> dict:
+    """Solves one request on its own; large requests run it in a worker process."""
+    if op == 'closest_pair':
+        pair = closest_pair(points, engine)
+        if pair is None:
+            return dict(_pair_json(math.inf, 0, 0), engine=engine)
+        return dict(_pair_json(pair.distance, pair.i, pair.j), engine=pair.engine)
+    pairs = closest_pair_by_group(points, groups)
+    return {'groups': [[label, _pair_json(math.inf, 0, 0) if pair is None
+                        else _pair_json(pair.distance, pair.i, pair.j)]
+                       for label, pair in pairs.items()]}
+
+
+class ServiceStats:
+    """
+    Counters of a running server. snapshot() reports them as a dict:
+    uptime_s, requests (per op), errors, points, batches, batched_requests,
+    mean_batch_size, pool_jobs, throughput_rps (requests per second since
+    the start), recent_rps (over the last 10 seconds) and latency_ms (mean,
+    p50, p90, p99 and max over the last LATENCY_WINDOW requests, from the
+    request line being read to the answer being written).
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests: Dict[str, int] = {op: 0 for op in OPS}
+        self.errors = 0
+        self.points = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.pool_jobs = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.finished = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.finished.append(time.monotonic())
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        uptime = now - self.started
+        total = sum(self.requests.values())
+        recent = sum(1 for t in self.finished if t >= now - 10)
+        latency = None
+        if self.latencies:
+            ms = np.array(self.latencies) * 1000
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            latency = {'mean': float(ms.mean()), 'p50': float(p50), 'p90': float(p90),
+                       'p99': float(p99), 'max': float(ms.max())}
+        return {
+            'uptime_s': uptime,
+            'requests': dict(self.requests),
+            'errors': self.errors,
+            'points': self.points,
+            'batches': self.batches,
+            'batched_requests': self.batched_requests,
+            'mean_batch_size': self.batched_requests / self.batches if self.batches else None,
+            'pool_jobs': self.pool_jobs,
+            'throughput_rps': total / uptime if uptime > 0 else None,
+            'recent_rps': recent / min(10.0, uptime) if uptime > 0 else None,
+            'latency_ms': latency,
+        }
+
+
+class ClosestPairServer:
+    """
+    An asyncio JSON-lines server for closest pair queries.
+    """
+
+    def __init__(self, host: Optional[str] = '127.0.0.1', port: int = 0, path: Optional[str] = None,
+                 workers: Optional[int] = None, pool_min_points: int = POOL_MIN_POINTS,
+                 batch_window: float = 0.0, batch_max_points: int = BATCH_MAX_POINTS,
+                 executor: Optional[Executor] = None):
+        """
+        Initialize a ClosestPairServer instance.
+
+        Parameters:
+        - host, port: The TCP address to listen on (port 0 picks a free
+          port, see address).
+        - path (str | None): Listen on this Unix socket instead of TCP.
+        - workers (int | None): Number of pool processes (default: CPU count).
+        - pool_min_points (int): Requests with more points run in the pool.
+        - batch_window (float): Seconds a batch waits for more requests
+          after its first one (0: only take what has already arrived).
+        - batch_max_points (int): A batch stops growing at this many points.
+        - executor (Executor | None): An existing process pool to use; by
+          default one is started on the first large request.
+        """
+        self.host = host
+        self.port = port
+        self.path = path
+        self.workers = workers
+        self.pool_min_points = pool_min_points
+        self.batch_window = batch_window
+        self.batch_max_points = batch_max_points
+        self._pool = executor
+        self._own_pool = executor is None
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='closest-pair-batch')
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        # The tasks serving the open connections.
+        self._handlers: Set[asyncio.Task] = set()
+        self._stats = ServiceStats()
+
+    @property
+    def address(self):
+        """The address the server listens on: (host, port), or the Unix socket path."""
+        if self.path is not None:
+            return self.path
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self) -> None:
+        """Starts listening."""
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, self.path, limit=MAX_LINE_BYTES)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE_BYTES)
+
+    async def serve_forever(self) -> None:
+        """Starts listening if needed and serves until cancelled."""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Stops listening, closes the open connections (requests still being
+        solved are not answered) and shuts the batch thread and the pool down.
+        """
+        if self._server is not None:
+            self._server.close()
+        handlers = list(self._handlers)
+        for handler in handlers:
+            handler.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+        self._thread.shutdown()
+        if self._own_pool and self._pool is not None:
+            self._pool.shutdown()
+
+    def stats(self) -> dict:
+        """The statistics of the server; see ServiceStats."""
+        return self._stats.snapshot()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves one connection: every line is answered by its own task."""
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line exceeded MAX_LINE_BYTES; the stream cannot be resynchronized.
+                    self._stats.errors += 1
+                    writer.write(b'{"id": null, "error": "request line too long"}\n')
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(self._respond(line, writer, time.perf_counter()))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled by close(): end like a closed connection (the stream
+            # protocol would log a cancelled handler as an error), dropping
+            # the requests still running.
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, received: float) -> None:
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+            request_id = request.get('id')
+            answer = await self._answer(request)
+        except Exception as error:
+            self._stats.errors += 1
+            answer = {'error': str(error) or type(error).__name__}
+        answer['id'] = request_id
+        writer.write(json.dumps(answer).encode() + b'\n')
+        await writer.drain()
+        self._stats.record(time.perf_counter() - received)
+
+    async def _answer(self, request: dict) -> dict:
+        op = request.get('op')
+        if op not in OPS:
+            raise ValueError(f"unknown op {op!r}, expected one of {OPS}")
+        self._stats.requests[op] += 1
+        if op == 'stats':
+            return {'stats': self.stats()}
+
+        points = _parse_points(request)
+        groups = None
+        if op == 'closest_pair_by_group':
+            groups = request.get('groups')
+            if not isinstance(groups, list) or len(groups) != len(points):
+                raise ValueError("groups must be a list with the group of every point")
+            if not all(isinstance(g, Hashable) for g in groups):
+                raise ValueError("groups must be strings, numbers, booleans or null")
+        engine = request.get('engine', 'auto')
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {ENGINES}")
+        self._stats.points += len(points)
+
+        if len(points) > self.pool_min_points:
+            self._stats.pool_jobs += 1
+            return await asyncio.get_running_loop().run_in_executor(
+                self._process_pool(), _solve_one, op, points, groups, engine)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Request(op, points, groups, engine, future))
+        return await future
+
+    def _process_pool(self) -> Executor:
+        if self._pool is None:
+            # Imported here so that servers that never see a large request
+            # do not pay for it.
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def _run_batches(self) -> None:
+        """Coalesces queued requests into batches and solves them, one batch at a time."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            if self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+            else:
+                # Let the requests already read from the sockets queue up.
+                await asyncio.sleep(0)
+            points = len(batch[0].points)
+            while not self._queue.empty() and points < self.batch_max_points:
+                request = self._queue.get_nowait()
+                batch.append(request)
+                points += len(request.points)
+
+            # Integer and float coordinates are kept apart, so integer
+            # requests are still compared exactly, and so are the engines
+            # requested ("auto" and "dc" share the batched engine).
+            parts: Dict[Tuple[str, bool, Optional[str]], List[_Request]] = {}
+            for request in batch:
+                engine = None
+                if request.op == 'closest_pair':
+                    engine = 'dc' if request.engine == 'auto' else request.engine
+                parts.setdefault((request.op, request.points.x.dtype.kind == 'f', engine), []).append(request)
+            for part in parts.values():
+                self._stats.batches += 1
+                self._stats.batched_requests += len(part)
+                try:
+                    answers = await loop.run_in_executor(self._thread, _solve_batch, part)
+                except Exception as error:
+                    for request in part:
+                        if not request.future.done():
+                            request.future.set_exception(error)
+                    continue
+                for request, answer in zip(part, answers):
+                    if not request.future.done():
+                        request.future.set_result(answer)
+
+
+def serve(host: Optional[str] = '127.0.0.1', port: int = 8765, path: Optional[str] = None, **options) -> None:
+    """
+    Runs a ClosestPairServer until it is interrupted.
+
+    Parameters:
+    - host, port, path: Where to listen; see ClosestPairServer.
+    - options: The other ClosestPairServer parameters.
+    """
+    async def main():
+        server = ClosestPairServer(host, port, path, **options)
+        await server.start()
+        print(f"Serving closest pair queries on {server.address}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
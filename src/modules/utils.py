@@ -7,8 +7,6 @@ and visualizing points on a 2D grid.
 from collections import defaultdict
 from typing import List, Tuple
 
-from matplotlib import pyplot as plt
-
 from .cpop.geometry import ColoredPoint
 
 def parse_data(data: List[Tuple[str, int, int]]) -> List[ColoredPoint]:
@@ -24,6 +22,9 @@ def group_by_color(points: List[ColoredPoint]) -> defaultdict:
 
 def plot_points(points: List[ColoredPoint]) -> None:
     """Visualizes the points on a 2D grid, colored by their assigned color."""
+    # Imported here: parsing and grouping should not pay for matplotlib.
+    from matplotlib import pyplot as plt
+
     groups = group_by_color(points)
     fig, ax = plt.subplots(figsize=(8, 8))
     for color, pts in groups.items():